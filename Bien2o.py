@@ -1,5 +1,22 @@
-from time import sleep
+"""Scraper de cómputos 2024 (diputaciones) de computo24.ieepcnl.mx
+
+Uso:
+    python Bien2o.py                                   # un navegador
+    python Bien2o.py --workers 4 --headless            # 4 navegadores en paralelo
+    python Bien2o.py --url file://$PWD/replica_computo/R02D.htm --workers 2
+
+Los distritos se reparten entre los workers; cada worker usa su propio
+navegador y su propio checkpoint (checkpoint_<worker>.txt). Las casillas se
+guardan en el almacén consolidado de casillas.py, que también sirve de índice
+de casillas ya raspadas.
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
 from selenium import webdriver
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
@@ -7,209 +24,259 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from webdriver_manager.chrome import ChromeDriverManager
 import pandas as pd
-import os
+
+from casillas import (RUTA_ALMACEN, armar_fila, casillas_guardadas, conectar_almacen, guardar_filas,
+                      lista_partidos)
 
 
-lista_partidos = [
-    'PAN','PRI','p3','p4','p5','p6','p7','p8','p9','p10','p11','p12','p13','p14','p15','p16'
-]
-lista2 = ['v_acumulados', 'no_registrados', 'nulos']  # votos extra
+URL_COMPUTO = os.environ.get('URL_COMPUTO', 'https://computo24.ieepcnl.mx/R02D.htm')
+TIEMPO_ESPERA = 10
 
+XPATH_OPCIONES = '//a[@class="dropdown-item"]'
+XPATH_VOTOS = '//p[@class="votos"]'
+XPATH_EXTRAS = '//p[@class="col-12 cantidad"]'
 
-def guardar_checkpoint(distrito, seccion, casilla):
-    with open("checkpoint.txt", "w") as f:
+
+def ruta_checkpoint(worker=0, total_workers=1):
+    return "checkpoint.txt" if total_workers == 1 else f"checkpoint_{worker}.txt"
+
+
+def guardar_checkpoint(distrito, seccion, casilla, ruta="checkpoint.txt"):
+    with open(ruta, "w") as f:
         f.write(f"{distrito}|{seccion}|{casilla}")
 
 
-def leer_checkpoint():
+def leer_checkpoint(ruta="checkpoint.txt"):
     try:
-        with open("checkpoint.txt", "r") as f:
+        with open(ruta, "r") as f:
             return f.read().strip().split("|")
     except FileNotFoundError:
         return None, None, None
 
 
-def casilla_ya_guardada(distrito, seccion, casilla):
-    nombre_archivo = f"Elecciones_2024_{distrito.replace(' ', '_')}_{seccion.replace(' ', '_')}_{casilla.replace(' ', '_')}.csv"
-    return os.path.exists(nombre_archivo)
+def crear_driver(headless=False):
+    opts = Options()
+    opts.add_argument(
+        "user-agent=Mozilla/5.0 (iPhone; CPU iPhone OS 15_4 like Mac OS X) "
+        "AppleWebKit/605.1.15 (KHTML, like Gecko) CriOS/101.0.4951.44 Mobile/15E148 Safari/604.1"
+    )
+    if headless:
+        opts.add_argument("--headless=new")
+    return webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=opts)
 
 
-opts = Options()
-opts.add_argument(
-    "user-agent=Mozilla/5.0 (iPhone; CPU iPhone OS 15_4 like Mac OS X) "
-    "AppleWebKit/605.1.15 (KHTML, like Gecko) CriOS/101.0.4951.44 Mobile/15E148 Safari/604.1"
-)
-driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=opts)
-wait = WebDriverWait(driver, 10)
+def abrir_pagina(driver, wait, url):
+    """Abrir la página y esperar a que el dropdown de distritos esté listo"""
+    driver.get(url)
+    wait.until(EC.element_to_be_clickable((By.ID, "dDistrito")))
 
 
-driver.get('https://computo24.ieepcnl.mx/R02D.htm')
-sleep(5)
+def _textos_visibles(driver, xpath):
+    return [e.text.strip() for e in driver.find_elements(By.XPATH, xpath) if e.text.strip() != '']
 
 
-def seleccionar_opcion_dropdown(id_dropdown, texto_opcion):
+def listar_opciones(driver, wait, id_dropdown):
+    """Abrir un dropdown, esperar a que se vean sus opciones y leerlas"""
     dropdown = wait.until(EC.element_to_be_clickable((By.ID, id_dropdown)))
     dropdown.click()
-    sleep(1)
-    opciones = driver.find_elements(By.XPATH, '//a[@class="dropdown-item"]')
+    wait.until(EC.visibility_of_any_elements_located((By.XPATH, XPATH_OPCIONES)))
+    opciones = _textos_visibles(driver, XPATH_OPCIONES)
+    dropdown.click()
+    return opciones
+
+
+def seleccionar_opcion_dropdown(driver, wait, id_dropdown, texto_opcion):
+    dropdown = wait.until(EC.element_to_be_clickable((By.ID, id_dropdown)))
+    dropdown.click()
+    opciones = wait.until(EC.visibility_of_any_elements_located((By.XPATH, XPATH_OPCIONES)))
     for op in opciones:
         if op.text.strip() == texto_opcion:
             op.click()
             return True
+    dropdown.click()
     return False
 
 
-dropdown_distrito = wait.until(EC.element_to_be_clickable((By.ID, "dDistrito")))
-dropdown_distrito.click()
-sleep(1)
-distritos = [
-    op.text.strip() for op in driver.find_elements(By.XPATH, '//a[@class="dropdown-item"]')
-    if op.text.strip() and op.text.strip().lower() != 'todos'
-]
-dropdown_distrito.click()
-
-
-ultimo_distrito, ultima_seccion, ultima_casilla = leer_checkpoint()
-saltando = bool(ultimo_distrito)
+def esperar_resultados(driver, previos):
+    """Esperar a que la página quite los resultados anteriores (`previos`) y los votos nuevos estén completos
 
-datos_generales = []
-casillas_fallidas = []
+    Se espera a que los elementos anteriores dejen de existir y no a que cambien los
+    números (dos casillas pueden tener los mismos votos). Si no se reemplazan a tiempo
+    se lanza TimeoutException: nunca se leen los votos de la casilla anterior.
+    """
+    def completos(d):
+        votos = _textos_visibles(d, XPATH_VOTOS)
+        return votos if len(votos) == len(lista_partidos) else False
 
+    if previos:
+        try:
+            WebDriverWait(driver, TIEMPO_ESPERA).until(EC.staleness_of(previos[0]))
+        except TimeoutException:
+            raise TimeoutException("La página sigue mostrando los resultados de la casilla anterior")
 
-for distrito in distritos:
-    print(f"\nSeleccionando distrito: {distrito}")
+    # La página puede volver a pintar los resultados mientras se leen
+    return WebDriverWait(driver, TIEMPO_ESPERA, ignored_exceptions=(StaleElementReferenceException,)).until(
+        completos
+    )
 
-    if not seleccionar_opcion_dropdown("dDistrito", distrito):
-        print(f"Error al seleccionar distrito {distrito}")
-        continue
 
-    sleep(1)
+def leer_casilla(driver, distrito, seccion, casilla, previos):
+    """Leer los votos de la casilla seleccionada y armar la fila"""
+    lista_votos = esperar_resultados(driver, previos)
+    lista_extras = _textos_visibles(driver, XPATH_EXTRAS)
+    return armar_fila(distrito, seccion, casilla, lista_votos, lista_extras)
 
 
+def listar_distritos(url=URL_COMPUTO, headless=False):
+    driver = crear_driver(headless)
     try:
-        dropdown_seccion = wait.until(EC.element_to_be_clickable((By.ID, "dSeccion")))
-    except Exception:
-        print(f"No hay dropdown de secciones para el distrito {distrito}, saltando...")
-        continue
+        wait = WebDriverWait(driver, TIEMPO_ESPERA)
+        abrir_pagina(driver, wait, url)
+        return [op for op in listar_opciones(driver, wait, "dDistrito") if op.lower() != 'todos']
+    finally:
+        driver.quit()
 
-    dropdown_seccion.click()
-    sleep(1)
-    secciones = [
-        op.text.strip() for op in driver.find_elements(By.XPATH, '//a[@class="dropdown-item"]')
-        if op.text.strip()
-    ]
-    dropdown_seccion.click()
 
-    for seccion in secciones:
-        print(f"  📘 Seleccionando sección: {seccion}")
+def raspar_distritos(distritos, worker=0, total_workers=1, url=URL_COMPUTO, headless=False,
+                     ruta_almacen=RUTA_ALMACEN):
+    """Recorrer secciones y casillas de los distritos asignados a un worker"""
+    prefijo = f"[w{worker}] " if total_workers > 1 else ""
+    checkpoint = ruta_checkpoint(worker, total_workers)
 
-        if not seleccionar_opcion_dropdown("dSeccion", seccion):
-            print(f"Error al seleccionar sección {seccion}")
-            continue
+    ultimo_distrito, ultima_seccion, ultima_casilla = leer_checkpoint(checkpoint)
+    # Un checkpoint de otra repartición (otro número de workers) no aplica a este worker
+    saltando = ultimo_distrito in distritos
 
-        sleep(1)
+    datos_generales = []
+    casillas_fallidas = []
 
+    almacen = conectar_almacen(ruta_almacen)
+    guardadas = casillas_guardadas(almacen)
 
-        try:
-            dropdown_casilla = wait.until(EC.element_to_be_clickable((By.ID, "dCasilla")))
-        except Exception:
-            print(f"No hay dropdown de casillas para la sección {seccion} en distrito {distrito}, saltando...")
-            continue
-
-        dropdown_casilla.click()
-        sleep(1)
-        casillas = [
-            op.text.strip() for op in driver.find_elements(By.XPATH, '//a[@class="dropdown-item"]')
-            if op.text.strip()
-        ]
-        dropdown_casilla.click()
-
-        for casilla in casillas:
-
-            if saltando:
-                if distrito == ultimo_distrito and seccion == ultima_seccion and casilla == ultima_casilla:
-                    saltando = False
-                else:
-                    print(f"Saltando {distrito} - {seccion} - {casilla}")
-                    continue
+    driver = crear_driver(headless)
+    wait = WebDriverWait(driver, TIEMPO_ESPERA)
 
-            print(f"    Seleccionando casilla: {casilla}")
+    try:
+        abrir_pagina(driver, wait, url)
 
-            if casilla_ya_guardada(distrito, seccion, casilla):
-                print(f"📂 Ya existe archivo para {casilla}, saltando...")
-                continue
+        for distrito in distritos:
+            print(f"\n{prefijo}Seleccionando distrito: {distrito}")
 
-            if not seleccionar_opcion_dropdown("dCasilla", casilla):
-                print(f"Error al seleccionar casilla {casilla}")
-                casillas_fallidas.append((distrito, seccion, casilla))
+            if not seleccionar_opcion_dropdown(driver, wait, "dDistrito", distrito):
+                print(f"{prefijo}Error al seleccionar distrito {distrito}")
                 continue
 
-            sleep(1)
-
             try:
+                secciones = listar_opciones(driver, wait, "dSeccion")
+            except TimeoutException:
+                print(f"{prefijo}No hay dropdown de secciones para el distrito {distrito}, saltando...")
+                continue
 
-                votos = driver.find_elements(By.XPATH, '//p[@class="votos"]')
-                extras = driver.find_elements(By.XPATH, '//p[@class="col-12 cantidad"]')
-                lista_votos = [v.text.strip() for v in votos if v.text.strip() != '']
-                lista_extras = [j.text.strip() for j in extras if j.text.strip() != '']
+            for seccion in secciones:
+                print(f"{prefijo}  📘 Seleccionando sección: {seccion}")
 
-                esperado_partidos = len(lista_partidos)
-                if len(lista_votos) != esperado_partidos:
-                    print(f"Mismatch en número de votos: esperados {esperado_partidos}, recibidos {len(lista_votos)}")
-                    casillas_fallidas.append((distrito, seccion, casilla))
+                if not seleccionar_opcion_dropdown(driver, wait, "dSeccion", seccion):
+                    print(f"{prefijo}Error al seleccionar sección {seccion}")
                     continue
 
-                votos_partidos = lista_votos[:esperado_partidos]
-                esperado_extras = len(lista2)
+                try:
+                    casillas = listar_opciones(driver, wait, "dCasilla")
+                except TimeoutException:
+                    print(f"{prefijo}No hay dropdown de casillas para la sección {seccion} en distrito {distrito}, saltando...")
+                    continue
 
-                if len(lista_extras) < esperado_extras:
-                    print(f"Faltan votos extra: completando con ceros.")
-                    lista_extras += ['0'] * (esperado_extras - len(lista_extras))
-                elif len(lista_extras) > esperado_extras:
-                    lista_extras = lista_extras[:esperado_extras]
+                for casilla in casillas:
 
-                votos_extra = lista_extras
+                    if saltando:
+                        if distrito == ultimo_distrito and seccion == ultima_seccion and casilla == ultima_casilla:
+                            saltando = False
+                        else:
+                            print(f"{prefijo}Saltando {distrito} - {seccion} - {casilla}")
+                            continue
 
-                fila = {'distrito': distrito, 'sección': seccion, 'casilla': casilla}
+                    print(f"{prefijo}    Seleccionando casilla: {casilla}")
 
-                for i, partido in enumerate(lista_partidos):
-                    fila[partido] = votos_partidos[i]
+                    if (distrito, seccion, casilla) in guardadas:
+                        print(f"{prefijo}📂 Ya está en el almacén {casilla}, saltando...")
+                        continue
 
-                for i, campo in enumerate(lista2):
-                    fila[campo] = votos_extra[i]
+                    # Resultados en pantalla antes de elegir la casilla: deben desaparecer antes de leer
+                    previos = driver.find_elements(By.XPATH, XPATH_VOTOS)
+                    if not seleccionar_opcion_dropdown(driver, wait, "dCasilla", casilla):
+                        print(f"{prefijo}Error al seleccionar casilla {casilla}")
+                        casillas_fallidas.append((distrito, seccion, casilla))
+                        continue
 
-                datos_generales.append(fila)
+                    try:
+                        fila = leer_casilla(driver, distrito, seccion, casilla, previos)
+                        datos_generales.append(fila)
 
+                        guardar_filas(almacen, [fila])
+                        print(f"{prefijo}💾 Datos guardados en {ruta_almacen}")
 
-                df_final = pd.DataFrame([fila])
-                nombre_archivo = f"Elecciones_2024_diputaciones_{distrito.replace(' ', '_')}_{seccion.replace(' ', '_')}_{casilla.replace(' ', '_')}.csv"
-                df_final.to_csv(nombre_archivo, index=False, encoding='utf-8')
-                print(f"💾 Datos guardados en {nombre_archivo}")
+                        guardar_checkpoint(distrito, seccion, casilla, checkpoint)
 
+                    except Exception as e:
+                        print(f"{prefijo}Error al procesar casilla {casilla}: {e}")
+                        casillas_fallidas.append((distrito, seccion, casilla))
+                        continue
+    finally:
+        driver.quit()
+        almacen.close()
 
-                guardar_checkpoint(distrito, seccion, casilla)
+    return datos_generales, casillas_fallidas
 
-            except Exception as e:
-                print(f"Error al procesar casilla {casilla}: {e}")
-                casillas_fallidas.append((distrito, seccion, casilla))
-                continue
 
+def raspar(workers=1, url=URL_COMPUTO, headless=False, ruta_almacen=RUTA_ALMACEN):
+    """Repartir los distritos entre workers (un navegador por proceso) y juntar los resultados"""
+    inicio = time.perf_counter()
+    distritos = listar_distritos(url, headless)
+    workers = max(1, min(workers, len(distritos)))
+
+    # Reparto intercalado: los distritos contiguos suelen tener tamaños parecidos
+    repartos = [distritos[i::workers] for i in range(workers)]
+
+    if workers == 1:
+        resultados = [raspar_distritos(distritos, url=url, headless=headless, ruta_almacen=ruta_almacen)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futuros = [
+                pool.submit(raspar_distritos, reparto, i, workers, url, headless, ruta_almacen)
+                for i, reparto in enumerate(repartos)
+            ]
+            resultados = [futuro.result() for futuro in futuros]
+
+    datos_generales = [fila for filas, _ in resultados for fila in filas]
+    casillas_fallidas = [casilla for _, fallidas in resultados for casilla in fallidas]
+
+    segundos = time.perf_counter() - inicio
+    print(f"\n⏱️ {len(datos_generales)} casillas en {segundos:.1f} s con {workers} worker(s) "
+          f"({len(datos_generales) / max(segundos, 1e-9) * 60:.1f} casillas/min)")
+
+    return datos_generales, casillas_fallidas
 
-if datos_generales:
-    df_general = pd.DataFrame(datos_generales)
-    df_general.to_csv("Elecciones_2024_todos_los_distritos_secciones_casillas_diputaciones.csv", index=False, encoding='utf-8')
-    print("\nArchivo general guardado: Elecciones_2024_todos_los_distritos_secciones_casillas_diputaciones.csv")
 
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Scraper de cómputos 2024 (diputaciones)")
+    parser.add_argument('--workers', type=int, default=1, help="Navegadores en paralelo")
+    parser.add_argument('--url', default=URL_COMPUTO, help="URL de R02D.htm (o réplica local file://...)")
+    parser.add_argument('--headless', action='store_true', help="Navegadores sin ventana")
+    parser.add_argument('--almacen', default=RUTA_ALMACEN, help="Base SQLite donde se guardan las casillas")
+    args = parser.parse_args()
 
-if casillas_fallidas:
-    pd.DataFrame(casillas_fallidas, columns=['distrito', 'seccion', 'casilla']).to_csv("casillas_fallidas.csv", index=False)
-    print("Algunas casillas fallaron. Ver archivo: casillas_fallidas.csv")
+    datos_generales, casillas_fallidas = raspar(args.workers, args.url, args.headless, args.almacen)
 
+    if datos_generales:
+        df_general = pd.DataFrame(datos_generales)
+        df_general.to_csv("Elecciones_2024_todos_los_distritos_secciones_casillas_diputaciones.csv", index=False, encoding='utf-8')
+        print("\nArchivo general guardado: Elecciones_2024_todos_los_distritos_secciones_casillas_diputaciones.csv")
 
-driver.quit()
+    if casillas_fallidas:
+        pd.DataFrame(casillas_fallidas, columns=['distrito', 'seccion', 'casilla']).to_csv("casillas_fallidas.csv", index=False)
+        print("Algunas casillas fallaron. Ver archivo: casillas_fallidas.csv")
 
 #Instalar las siguientes librerias:
 
 #selenium
 #webdriver-manager
-#pandas
\ No newline at end of file
+#pandas
@@ -1,6 +1,8 @@
 import sqlite3
 import pandas as pd
 
+from tablas_derivadas import actualizar_derivadas
+
 
 def analizar_problema_gobernador():
     """Analizar el problema de los candidatos a gobernador"""
@@ -85,29 +87,8 @@ def corregir_datos_gobernador():
     # OPCIÓN 2: Crear una nueva tabla corregida
     print("\n🔄 Creando tabla corregida...")
 
-    # Eliminar tabla si existe
-    conn.execute("DROP TABLE IF EXISTS gobernador_corregido")
-
-    # Crear nueva tabla corregida
-    conn.execute("""
-    CREATE TABLE gobernador_corregido AS
-    SELECT 
-        MIN(candidato_id) as candidato_id,
-        2021 as anno,
-        nombre_candidato,
-        SUM(numero_de_votos) as numero_de_votos,
-        'Nuevo León' as division_territorial,
-        nombre_normalizado,
-        partido_ci,
-        'GOBERNADOR' as tipo_eleccion,
-        CURRENT_TIMESTAMP as created_at
-    FROM resultados_electorales 
-    WHERE tipo_eleccion = 'GOBERNADOR'
-    GROUP BY nombre_candidato, nombre_normalizado, partido_ci
-    ORDER BY numero_de_votos DESC;
-    """)
-
-    conn.commit()
+    # Definición canónica compartida con la carga (versionada en tablas_derivadas.py)
+    actualizar_derivadas(conn)
 
     # Verificar la nueva tabla
     query_verificar = "SELECT * FROM gobernador_corregido;"
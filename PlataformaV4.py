@@ -107,23 +107,13 @@ class DashboardSimple:
         """Obtener los ganadores por cada división territorial"""
         with self.conectar(año) as conn:
             query = """
-            WITH ranked_candidates AS (
-                SELECT 
-                    division_territorial,
-                    nombre_candidato,
-                    partido_ci,
-                    numero_de_votos,
-                    ROW_NUMBER() OVER (PARTITION BY division_territorial ORDER BY numero_de_votos DESC) as rank
-                FROM resultados_electorales 
-                WHERE tipo_eleccion = ?
-            )
             SELECT 
                 division_territorial,
                 nombre_candidato,
                 partido_ci,
                 numero_de_votos
-            FROM ranked_candidates 
-            WHERE rank = 1
+            FROM ganadores 
+            WHERE tipo_eleccion = ?
             ORDER BY division_territorial;
             """
             return pd.read_sql_query(query, conn, params=(tipo_eleccion,))
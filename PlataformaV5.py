@@ -1,10 +1,14 @@
 import streamlit as st
 import pandas as pd
-import sqlite3
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
+import base_datos
+from analisis_electoral import eficiencia_por_division
+import cubo_votos
+from partidos import ID_PARTIDO, colores_partidos
+
 # Configurar la página
 st.set_page_config(
     page_title="Elecciones NL 2021 & 2024",
@@ -12,6 +16,13 @@ st.set_page_config(
     layout="wide"
 )
 
+# Las bases derivadas no se versionan: sin ellas la página no puede consultar nada
+faltantes = base_datos.bases_faltantes()
+if faltantes:
+    for año in faltantes:
+        st.error(f"❌ {base_datos.mensaje_base_faltante(año)}")
+    st.stop()
+
 # CSS simple
 st.markdown("""
 <style>
@@ -31,35 +42,12 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# PALETA DE COLORES COMPLETA PARA PARTIDOS (2021 + 2024)
-COLORES_PARTIDOS = {
-    # Partidos principales
-    'PAN': '#0F6BB6',  # Azul
-    'PRI': '#009640',  # Verde
-    'PRD': '#FFDE00',  # Amarillo
-    'PVEM': '#00A650',  # Verde claro
-    'PT': '#EE3D44',  # Rojo
-    'MC': '#F58220',  # Naranja
-    'MORENA': '#B52E6E',  # Magenta
-    'PES': '#8EC641',  # Verde lima
-    'RSP': '#FFD100',  # Amarillo oro
-    'FXM': '#8B008B',  # Púrpura oscuro
-
-    # Partidos locales NL
-    'FCXNL': '#6A1E55',  # Morado
-    'SHHNL': '#00A2B8',  # Turquesa
-    'VIDA': '#FF6B00',  # Naranja fuerte
-    'ESO': '#8B4513',  # Café
-    'PL': '#FF69B4',  # Rosa
-    'PJ': '#800080',  # Púrpura
-
-    # Candidaturas independientes y especiales
-    'CAND_IND_1': '#A9A9A9',  # Gris
+# Los colores de los partidos vienen de la dimensión de partidos (partidos.py) de cada base;
+# aquí solo las etiquetas que no son partidos
+COLORES_ESPECIALES = {
     'CAND_IND_2': '#808080',  # Gris medio
     'CAND_IND_3': '#696969',  # Gris oscuro
     'INDEPENDIENTE': '#A9A9A9',  # Gris
-
-    # Estados especiales
     'Registro cancelado': '#666666',  # Gris oscuro
     'NULO': '#000000',  # Negro
     'NO REGISTRADO': '#CCCCCC'  # Gris claro
@@ -74,41 +62,47 @@ COLORES_POR_DEFECTO = [
 ]
 
 
+def formato_porcentaje(valor):
+    """Porcentaje con un decimal; 'N/D' si no hay dato (sin lista nominal o sin votos)"""
+    return "N/D" if pd.isna(valor) else f"{valor:.1%}"
+
+
 class DashboardSimple:
     def __init__(self):
-        self.dbs = {
-            '2021': 'elecciones_nl_2021.db',
-            '2024': 'elecciones_nl_2024.db'
-        }
+        self.dbs = base_datos.BASES_DATOS
         self._cache_partidos = {}  # Cache para partidos por año
 
-    def conectar(self, año):
-        return sqlite3.connect(self.dbs[año])
+    def consultar(self, año, query, params=None):
+        """Ejecutar consulta usando el pool y cache compartidos"""
+        return base_datos.consultar(año, query, params)
 
     def obtener_datos(self, año, tipo_eleccion):
-        with self.conectar(año) as conn:
-            query = "SELECT * FROM resultados_electorales WHERE tipo_eleccion = ? ORDER BY numero_de_votos DESC"
-            return pd.read_sql_query(query, conn, params=(tipo_eleccion,))
+        query = "SELECT * FROM resultados_electorales WHERE tipo_eleccion = ? ORDER BY numero_de_votos DESC"
+        return self.consultar(año, query, (tipo_eleccion,))
 
     def obtener_todos_los_partidos(self, año):
         """Obtener todos los partidos únicos de un año específico"""
         if año in self._cache_partidos:
             return self._cache_partidos[año]
 
-        with self.conectar(año) as conn:
-            query = "SELECT DISTINCT partido_ci FROM resultados_electorales ORDER BY partido_ci"
-            partidos = pd.read_sql_query(query, conn)['partido_ci'].tolist()
-            self._cache_partidos[año] = partidos
-            return partidos
+        query = "SELECT DISTINCT partido_ci FROM resultados_electorales ORDER BY partido_ci"
+        partidos = self.consultar(año, query)['partido_ci'].tolist()
+        self._cache_partidos[año] = partidos
+        return partidos
+
+    def obtener_colores_partidos(self, año):
+        """Colores de la dimensión de partidos del año (siglas y nombres de la fuente) y etiquetas especiales"""
+        return {**colores_partidos(año), **COLORES_ESPECIALES}
 
     def obtener_colores_para_partidos(self, partidos, año):
         """Obtener colores para una lista de partidos, asignando colores por defecto si es necesario"""
+        colores_partidos_año = self.obtener_colores_partidos(año)
         colores_map = {}
         color_index = 0
 
         for partido in partidos:
-            if partido in COLORES_PARTIDOS:
-                colores_map[partido] = COLORES_PARTIDOS[partido]
+            if partido in colores_partidos_año:
+                colores_map[partido] = colores_partidos_año[partido]
             else:
                 # Asignar color por defecto
                 colores_map[partido] = COLORES_POR_DEFECTO[color_index % len(COLORES_POR_DEFECTO)]
@@ -120,6 +114,7 @@ class DashboardSimple:
         """Obtener la leyenda de colores para los partidos de un año específico"""
         partidos_año = self.obtener_todos_los_partidos(año)
         colores_map = self.obtener_colores_para_partidos(partidos_año, año)
+        colores_partidos_año = self.obtener_colores_partidos(año)
 
         leyenda = []
         for partido in partidos_año:
@@ -127,47 +122,31 @@ class DashboardSimple:
             leyenda.append({
                 'partido': partido,
                 'color': color,
-                'es_default': partido not in COLORES_PARTIDOS
+                'es_default': partido not in colores_partidos_año
             })
 
         return leyenda
 
 
+ID_MC = ID_PARTIDO['MC']
+
+
 class AnalisisMC:
     def __init__(self, dashboard):
         self.dashboard = dashboard
 
-    def obtener_nombre_mc_por_año(self, año):
-        """Obtener el nombre correcto de MC según el año"""
-        if año == '2021':
-            return 'Movimiento Ciudadano'
-        else:
-            return 'MC'
-
     def obtener_ganadores_por_division(self, año, tipo_eleccion):
         """Obtener ganadores por división territorial"""
-        with self.dashboard.conectar(año) as conn:
-            query = f"""
-            WITH ranked_candidates AS (
-                SELECT 
-                    division_territorial,
-                    nombre_candidato,
-                    partido_ci,
-                    numero_de_votos,
-                    ROW_NUMBER() OVER (PARTITION BY division_territorial ORDER BY numero_de_votos DESC) as rank
-                FROM resultados_electorales 
-                WHERE tipo_eleccion = ?
-            )
-            SELECT division_territorial, nombre_candidato, partido_ci, numero_de_votos
-            FROM ranked_candidates 
-            WHERE rank = 1
-            ORDER BY numero_de_votos DESC;
-            """
-            return pd.read_sql_query(query, conn, params=(tipo_eleccion,))
+        query = """
+        SELECT division_territorial, nombre_candidato, partido_ci, partido_id, numero_de_votos
+        FROM ganadores 
+        WHERE tipo_eleccion = ?
+        ORDER BY numero_de_votos DESC;
+        """
+        return self.dashboard.consultar(año, query, (tipo_eleccion,))
 
     def analizar_desempeno_mc(self, año):
-        """Análisis completo del desempeño de MC"""
-        nombre_mc = self.obtener_nombre_mc_por_año(año)
+        """Análisis completo del desempeño de MC (por partido_id: el mismo en 2021 y 2024)"""
 
         # Obtener datos de ambos tipos de elección
         datos_municipales = self.dashboard.obtener_datos(año, 'MUNICIPAL')
@@ -178,16 +157,16 @@ class AnalisisMC:
         ganadores_distrito = self.obtener_ganadores_por_division(año, 'DIPUTADO')
 
         # Municipios donde MC ganó
-        mc_gana_municipio = ganadores_municipio[ganadores_municipio['partido_ci'] == nombre_mc]
+        mc_gana_municipio = ganadores_municipio[ganadores_municipio['partido_id'] == ID_MC]
 
         # Municipios donde MC perdió
-        mc_pierde_municipio = ganadores_municipio[ganadores_municipio['partido_ci'] != nombre_mc]
+        mc_pierde_municipio = ganadores_municipio[ganadores_municipio['partido_id'] != ID_MC]
 
         # Distritos donde MC ganó
-        mc_gana_distrito = ganadores_distrito[ganadores_distrito['partido_ci'] == nombre_mc]
+        mc_gana_distrito = ganadores_distrito[ganadores_distrito['partido_id'] == ID_MC]
 
         # Distritos donde MC perdió
-        mc_pierde_distrito = ganadores_distrito[ganadores_distrito['partido_ci'] != nombre_mc]
+        mc_pierde_distrito = ganadores_distrito[ganadores_distrito['partido_id'] != ID_MC]
 
         # Análisis de correlación: dónde ganó municipio pero perdió diputación
         municipios_mc_gana = set(mc_gana_municipio['division_territorial'])
@@ -196,31 +175,14 @@ class AnalisisMC:
         conflicto_municipio_gana_diputacion_pierde = municipios_mc_gana.intersection(distritos_mc_pierde)
 
         # Análisis de votos promedio
-        votos_mc_municipales = datos_municipales[datos_municipales['partido_ci'] == nombre_mc]['numero_de_votos']
-        votos_mc_diputados = datos_diputados[datos_diputados['partido_ci'] == nombre_mc]['numero_de_votos']
-
-        # Eficiencia por división territorial
-        eficiencia_municipio = []
-        for municipio in datos_municipales['division_territorial'].unique():
-            datos_mun = datos_municipales[datos_municipales['division_territorial'] == municipio]
-            if nombre_mc in datos_mun['partido_ci'].values:
-                votos_mc = datos_mun[datos_mun['partido_ci'] == nombre_mc]['numero_de_votos'].iloc[0]
-                votos_totales = datos_mun['numero_de_votos'].sum()
-                porcentaje = (votos_mc / votos_totales) * 100
-                ganador = \
-                ganadores_municipio[ganadores_municipio['division_territorial'] == municipio]['partido_ci'].iloc[0]
-                eficiencia_municipio.append({
-                    'municipio': municipio,
-                    'votos_mc': votos_mc,
-                    'porcentaje_mc': porcentaje,
-                    'ganador': ganador,
-                    'mc_es_ganador': ganador == nombre_mc
-                })
-
-        eficiencia_municipio_df = pd.DataFrame(eficiencia_municipio)
+        votos_mc_municipales = datos_municipales[datos_municipales['partido_id'] == ID_MC]['numero_de_votos']
+        votos_mc_diputados = datos_diputados[datos_diputados['partido_id'] == ID_MC]['numero_de_votos']
+
+        # Eficiencia por división territorial (todas las divisiones en una sola pasada)
+        eficiencia_municipio_df = eficiencia_por_division(datos_municipales, ganadores_municipio, ID_MC,
+                                                          columna_partido='partido_id')
 
         return {
-            'nombre_mc': nombre_mc,
             'gana_municipio': mc_gana_municipio,
             'pierde_municipio': mc_pierde_municipio,
             'gana_distrito': mc_gana_distrito,
@@ -239,11 +201,10 @@ class AnalisisMC:
 
     def analizar_tendencias_competencia(self, año):
         """Analizar contra qué partidos compite principalmente MC"""
-        nombre_mc = self.obtener_nombre_mc_por_año(año)
 
         # Obtener ganadores donde MC no ganó
         ganadores_municipio = self.obtener_ganadores_por_division(año, 'MUNICIPAL')
-        ganadores_sin_mc = ganadores_municipio[ganadores_municipio['partido_ci'] != nombre_mc]
+        ganadores_sin_mc = ganadores_municipio[ganadores_municipio['partido_id'] != ID_MC]
 
         # Contar frecuencia de partidos ganadores
         competencia_municipio = ganadores_sin_mc['partido_ci'].value_counts().reset_index()
@@ -257,7 +218,8 @@ dashboard = DashboardSimple()
 analisis_mc = AnalisisMC(dashboard)
 
 # CREAR PESTAÑAS
-tab1, tab2, tab3 = st.tabs(["📊 Dashboard Principal", "🗺️ Zonas Ganadas por Partido", "🔍 Análisis MC"])
+tab1, tab2, tab3, tab4 = st.tabs(["📊 Dashboard Principal", "🗺️ Zonas Ganadas por Partido", "🔍 Análisis MC",
+                                  "🧮 Casillas Federales 2021"])
 
 with tab1:
     # TÍTULO PRINCIPAL
@@ -343,6 +305,20 @@ with tab1:
         avg_votos = datos_filtrados['numero_de_votos'].mean()
         st.metric("Promedio Votos", f"{avg_votos:,.0f}")
 
+    # PARTICIPACIÓN (cómputo federal por casilla, precalculada en el cubo)
+    if año_seleccionado == '2021' and tipo_seleccionado == 'DIPUTADO' and cubo_votos.cubo_disponible():
+        estado_federal = cubo_votos.totales('estado').iloc[0]
+        st.caption("🗳️ Participación ciudadana - diputaciones federales 2021 (detalle en la pestaña de casillas)")
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Lista Nominal", f"{int(estado_federal['lista_nominal']):,}")
+        with col2:
+            st.metric("Participación", formato_porcentaje(estado_federal['participacion']))
+        with col3:
+            st.metric("Tasa de Votos Nulos", formato_porcentaje(estado_federal['tasa_nulos']))
+        with col4:
+            st.metric("Abstención", formato_porcentaje(estado_federal['abstencion']))
+
     # GRÁFICO PRINCIPAL - TOP 10 CANDIDATOS
     st.subheader(f"🏆 Top 10 Candidatos - {año_seleccionado}")
 
@@ -524,8 +500,6 @@ with tab3:
         analisis = analisis_mc.analizar_desempeno_mc(año_mc)
         competencia = analisis_mc.analizar_tendencias_competencia(año_mc)
 
-    nombre_mc = analisis['nombre_mc']
-
     # MÉTRICAS PRINCIPALES MC
     st.subheader("📈 Métricas Clave de Movimiento Ciudadano")
 
@@ -701,6 +675,115 @@ with tab3:
         - Crear programas de transferencia de conocimiento
         """)
 
+with tab4:
+    st.header("🧮 Diputaciones Federales 2021 por Casilla")
+
+    if not cubo_votos.cubo_disponible():
+        st.warning("El cubo de casillas no está construido. Ejecuta: python casillas_federales.py")
+    else:
+        # Drill-down estado -> distrito -> sección sobre los niveles precalculados
+        distritos_federales = cubo_votos.distritos()
+        col1, col2 = st.columns(2)
+        with col1:
+            distrito_cubo = st.selectbox(
+                "Distrito federal:",
+                [None] + list(distritos_federales),
+                format_func=lambda d: "Todo el estado" if d is None else f"{d}. {distritos_federales[d]}",
+                key="cubo_distrito"
+            )
+        distribuir = st.toggle(
+            "Repartir los votos de coalición entre sus partidos",
+            value=True,
+            help="Partes iguales entre los partidos de la coalición; el residuo va a los de más votos en la casilla",
+            key="cubo_distribuir"
+        )
+
+        if distrito_cubo is None:
+            nivel_cubo, detalle_nivel = 'estado', 'distrito'
+            votos_cubo = cubo_votos.votos_por_partido('estado', distribuidos=distribuir)
+            totales_cubo = cubo_votos.totales('estado')
+        else:
+            secciones_distrito = cubo_votos.totales('seccion', distrito_cubo)
+            with col2:
+                seccion_cubo = st.selectbox(
+                    "Sección:",
+                    [None] + secciones_distrito['seccion'].tolist(),
+                    format_func=lambda s: "Todo el distrito" if s is None else f"Sección {s}",
+                    key="cubo_seccion"
+                )
+
+            if seccion_cubo is None:
+                nivel_cubo, detalle_nivel = 'distrito', 'seccion'
+                votos_cubo = cubo_votos.votos_por_partido('distrito', distrito_cubo, distribuidos=distribuir)
+                totales_cubo = cubo_votos.totales('distrito', distrito_cubo)
+            else:
+                nivel_cubo, detalle_nivel = 'seccion', None
+                votos_cubo = cubo_votos.votos_por_partido('seccion', distrito_cubo, distribuidos=distribuir)
+                votos_cubo = votos_cubo[votos_cubo['seccion'] == seccion_cubo]
+                totales_cubo = secciones_distrito[secciones_distrito['seccion'] == seccion_cubo]
+
+        resumen = totales_cubo.iloc[0]
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Casillas", f"{int(resumen['casillas']):,}")
+        with col2:
+            st.metric("Total Votos", f"{int(resumen['total_votos']):,}")
+        with col3:
+            st.metric("Votos Nulos", f"{int(resumen['votos_nulos']):,}")
+        with col4:
+            st.metric("Lista Nominal", f"{int(resumen['lista_nominal']):,}")
+
+        # Participación precalculada en el cubo (participacion.py)
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Participación", formato_porcentaje(resumen['participacion']))
+        with col2:
+            st.metric("Tasa de Votos Nulos", formato_porcentaje(resumen['tasa_nulos']))
+        with col3:
+            st.metric("Abstención", formato_porcentaje(resumen['abstencion']))
+
+        votos_cubo = votos_cubo[votos_cubo['votos'] > 0]
+        fig_cubo = px.bar(
+            votos_cubo,
+            x='votos',
+            y='partido',
+            orientation='h',
+            color='partido',
+            color_discrete_map=dashboard.obtener_colores_para_partidos(votos_cubo['partido'].unique(), '2021'),
+            hover_data=['votos_propios', 'votos_coalicion'] if distribuir else None,
+            title=(f"Votos por partido, coaliciones repartidas ({nivel_cubo})" if distribuir
+                   else f"Votos por partido y coalición ({nivel_cubo})"),
+            labels={'votos': 'Votos', 'partido': 'Partido', 'votos_propios': 'Votos propios',
+                    'votos_coalicion': 'Votos de coalición'}
+        )
+        fig_cubo.update_layout(yaxis={'categoryorder': 'total ascending'}, showlegend=False)
+        st.plotly_chart(fig_cubo, use_container_width=True)
+
+        if detalle_nivel == 'distrito':
+            detalle_cubo = cubo_votos.totales('distrito').merge(cubo_votos.primeros_lugares('distrito'), how='left')
+            detalle_cubo['division'] = detalle_cubo['distrito_id'].astype(str) + '. ' + detalle_cubo['nombre']
+            st.subheader("📋 Distritos")
+        elif detalle_nivel == 'seccion':
+            detalle_cubo = secciones_distrito.merge(cubo_votos.primeros_lugares('seccion', distrito_cubo), how='left')
+            detalle_cubo['division'] = 'Sección ' + detalle_cubo['seccion'].astype(str)
+            st.subheader("📋 Secciones del distrito")
+        else:
+            detalle_cubo = cubo_votos.casillas(distrito_cubo, seccion_cubo)
+            detalle_cubo['division'] = detalle_cubo['clave_casilla']
+            st.subheader("📋 Casillas de la sección")
+
+        fig_participacion = px.bar(
+            detalle_cubo.dropna(subset=['participacion']),
+            x='division',
+            y='participacion',
+            hover_data={'tasa_nulos': ':.1%', 'abstencion': ':.1%', 'lista_nominal': ':,'},
+            title="Participación",
+            labels={'division': '', 'participacion': 'Participación'}
+        )
+        fig_participacion.update_layout(yaxis_tickformat='.0%')
+        st.plotly_chart(fig_participacion, use_container_width=True)
+        st.dataframe(detalle_cubo.drop(columns='division'), use_container_width=True, hide_index=True, height=300)
+
 # FOOTER SIMPLE
 st.markdown("---")
 st.caption("Dashboard de Elecciones NL | Análisis avanzado de Movimiento Ciudadano | Datos 2021-2024")
\ No newline at end of file
@@ -5,6 +5,9 @@ import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime
 
+from estadisticas import estadisticas_generales
+from tablas_derivadas import tablas_pendientes
+
 # Configurar la página
 st.set_page_config(
     page_title="Dashboard Electoral NL 2021 - Corregido",
@@ -42,42 +45,20 @@ st.markdown("""
 class DashboardElectoralCorregido:
     def __init__(self, db_path='elecciones_nl_2021.db'):
         self.db_path = db_path
-        self._crear_tabla_corregida()
+        self._verificar_tabla_corregida()
 
     def conectar(self):
         """Conectar a la base de datos"""
         return sqlite3.connect(self.db_path)
 
-    def _crear_tabla_corregida(self):
-        """Crear tabla corregida para gobernador si no existe"""
-        conn = self.conectar()
-
-        # Verificar si ya existe la tabla corregida
-        try:
-            conn.execute("SELECT 1 FROM gobernador_corregido LIMIT 1")
-        except:
-            # Crear tabla corregida para gobernador
-            conn.execute("""
-            CREATE TABLE gobernador_corregido AS
-            SELECT 
-                MIN(candidato_id) as candidato_id,
-                2021 as anno,
-                nombre_candidato,
-                SUM(numero_de_votos) as numero_de_votos,
-                'Nuevo León' as division_territorial,
-                MIN(nombre_normalizado) as nombre_normalizado,
-                MIN(partido_ci) as partido_ci,
-                'GOBERNADOR' as tipo_eleccion,
-                CURRENT_TIMESTAMP as created_at
-            FROM resultados_electorales 
-            WHERE tipo_eleccion = 'GOBERNADOR'
-            GROUP BY nombre_candidato
-            ORDER BY numero_de_votos DESC;
-            """)
-            conn.commit()
-            st.sidebar.success("✅ Tabla de gobernador corregida creada")
-
-        conn.close()
+    def _verificar_tabla_corregida(self):
+        """Verificar que la carga haya construido gobernador_corregido (el dashboard no escribe en la base)"""
+        if tablas_pendientes(self.db_path, ['gobernador_corregido']):
+            st.error(
+                "❌ La tabla gobernador_corregido no existe o es de una versión anterior. "
+                "Ejecuta `python tablas_derivadas.py` para construirla."
+            )
+            st.stop()
 
     def ejecutar_consulta(self, consulta, params=None):
         """Ejecutar consulta SQL"""
@@ -102,52 +83,8 @@ class DashboardElectoralCorregido:
             return self.ejecutar_consulta(consulta, (tipo_eleccion,))
 
     def obtener_estadisticas_generales(self):
-        """Obtener estadísticas generales corregidas"""
-        # Para gobernador usar tabla corregida, para otros usar tabla original
-        consulta_otros = """
-        SELECT 
-            tipo_eleccion,
-            COUNT(*) as registros,
-            COUNT(DISTINCT nombre_candidato) as candidatos_unicos,
-            SUM(numero_de_votos) as total_votos
-        FROM resultados_electorales 
-        WHERE tipo_eleccion != 'GOBERNADOR'
-        GROUP BY tipo_eleccion;
-        """
-
-        consulta_gobernador = """
-        SELECT 
-            'GOBERNADOR' as tipo_eleccion,
-            COUNT(*) as registros,
-            COUNT(DISTINCT nombre_candidato) as candidatos_unicos,
-            SUM(numero_de_votos) as total_votos
-        FROM gobernador_corregido;
-        """
-
-        stats_otros = self.ejecutar_consulta(consulta_otros)
-        stats_gobernador = self.ejecutar_consulta(consulta_gobernador)
-
-        stats_combinadas = pd.concat([stats_gobernador, stats_otros], ignore_index=True)
-
-        # Totales generales
-        total_registros = stats_combinadas['registros'].sum()
-        total_candidatos = stats_combinadas['candidatos_unicos'].sum()
-        total_votos = stats_combinadas['total_votos'].sum()
-        partidos_unicos = self.ejecutar_consulta(
-            "SELECT COUNT(DISTINCT partido_ci) as count FROM resultados_electorales;"
-        )['count'].iloc[0]
-        divisiones_unicas = self.ejecutar_consulta(
-            "SELECT COUNT(DISTINCT division_territorial) as count FROM resultados_electorales WHERE tipo_eleccion != 'GOBERNADOR';"
-        )['count'].iloc[0] + 1  # +1 por Nuevo León de gobernador
-
-        return {
-            'total_registros': total_registros,
-            'total_candidatos': total_candidatos,
-            'total_votos': total_votos,
-            'partidos_unicos': partidos_unicos,
-            'divisiones_unicas': divisiones_unicas,
-            'detalle_por_tipo': stats_combinadas
-        }
+        """Obtener estadísticas generales corregidas (precalculadas en la carga, desde cache)"""
+        return estadisticas_generales(self.db_path, fuente='corregido')
 
 
 # Instanciar el dashboard corregido
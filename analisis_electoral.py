@@ -0,0 +1,165 @@
+import numpy as np
+import pandas as pd
+
+
+def eficiencia_por_division(datos, ganadores, partido, columna_division='municipio', columna_partido='partido_ci'):
+    """Votos, porcentaje y ganador de un partido en todas las divisiones a la vez
+
+    Equivalente al recorrido división por división: solo se incluyen las divisiones
+    donde el partido tiene candidato, en el orden en que aparecen en `datos`, y se
+    toma el primer registro del partido en cada división. `partido` se compara con
+    `columna_partido` (partido_id para el id de la dimensión de partidos); el
+    ganador se muestra con su partido_ci.
+    """
+    # Total de votos por división (en orden de aparición)
+    votos_totales = datos.groupby('division_territorial', sort=False)['numero_de_votos'].sum()
+
+    # Primer registro del partido en cada división
+    votos_partido = (
+        datos.loc[datos[columna_partido] == partido, ['division_territorial', 'numero_de_votos']]
+        .drop_duplicates('division_territorial')
+        .set_index('division_territorial')['numero_de_votos']
+    )
+
+    divisiones = votos_totales.index[votos_totales.index.isin(votos_partido.index)]
+    if len(divisiones) == 0:
+        return pd.DataFrame()
+
+    votos_mc = votos_partido.loc[divisiones]
+    ganador_por_division = ganadores.drop_duplicates('division_territorial').set_index('division_territorial')
+    ganador = ganador_por_division['partido_ci'].reindex(divisiones)
+    partido_ganador = ganador_por_division[columna_partido].reindex(divisiones)
+
+    return pd.DataFrame({
+        columna_division: divisiones.to_numpy(),
+        'votos_mc': votos_mc.to_numpy(),
+        'porcentaje_mc': (votos_mc / votos_totales.loc[divisiones]).to_numpy() * 100,
+        'ganador': ganador.to_numpy(),
+        'mc_es_ganador': (partido_ganador == partido).to_numpy()
+    })
+
+
+# Umbrales estratégicos de porcentaje de votos (de mayor a menor)
+UMBRALES_OPORTUNIDAD = [
+    (40, 'Alta Oportunidad', 'Alta'),
+    (25, 'Oportunidad Media', 'Media'),
+    (15, 'Oportunidad Baja', 'Baja'),
+]
+
+
+def clasificar_divisiones(divisiones, partido_id, tipo):
+    """Clasificar divisiones por porcentaje del partido usando los umbrales estratégicos
+
+    Espera las columnas division, votos_mc, total_votos, ganador y ganador_id
+    (partido_id del ganador), una fila por división.
+    """
+    df = divisiones.copy()
+    df['ganador'] = df['ganador'].fillna('Desconocido')
+
+    # FÓRMULA: Porcentaje de votos de MC
+    total = df['total_votos'].fillna(0)
+    df['porcentaje_mc'] = np.where(total > 0, df['votos_mc'] / total.where(total > 0, 1) * 100, 0.0)
+    df['mc_es_ganador'] = df['ganador_id'] == partido_id
+
+    condiciones = [df['mc_es_ganador']] + [df['porcentaje_mc'] >= umbral for umbral, _, _ in UMBRALES_OPORTUNIDAD]
+    categorias = ['Victoria'] + [categoria for _, categoria, _ in UMBRALES_OPORTUNIDAD]
+    prioridades = ['Consolidar'] + [prioridad for _, _, prioridad in UMBRALES_OPORTUNIDAD]
+
+    df['categoria'] = np.select(condiciones, categorias, default='Base Débil')
+    df['prioridad'] = np.select(condiciones, prioridades, default='Expandir Base')
+    df['tipo'] = tipo
+
+    return df[['division', 'votos_mc', 'total_votos', 'porcentaje_mc', 'ganador', 'mc_es_ganador',
+               'categoria', 'prioridad', 'tipo']]
+
+
+def caracteristicas_basicas(df):
+    """Agregar a `df` (sin copiarlo) las características del análisis avanzado
+
+    longitud_nombre y cantidad_palabras vienen precalculadas de la carga; aquí se
+    agregan votos_normalizados (min-max por tipo de elección, 0.5 si el tipo no
+    tiene rango), percentil_votos, categoria_exito y es_exitoso.
+    """
+    votos = df['numero_de_votos']
+    por_tipo = votos.groupby(df['tipo_eleccion'], sort=False)
+
+    minimo = por_tipo.transform('min')
+    rango = por_tipo.transform('max') - minimo
+    df['votos_normalizados'] = np.where(rango > 0, (votos - minimo) / rango.where(rango > 0, 1), 0.5)
+    del minimo, rango
+
+    df['percentil_votos'] = por_tipo.rank(pct=True)
+
+    df['categoria_exito'] = pd.cut(
+        df['percentil_votos'],
+        bins=[0, 0.25, 0.75, 1],
+        labels=['Bajo', 'Medio', 'Alto'],
+        include_lowest=True
+    )
+    df['es_exitoso'] = (df['percentil_votos'] > 0.75).astype(int)
+    return df
+
+
+# Ajuste del simulador por longitud del nombre: corto (< 15), largo (> 25) y mediano
+FACTORES_LONGITUD_NOMBRE = {'corto': 0.9, 'largo': 0.95, 'mediano': 1.05}
+COLUMNAS_ESCENARIO = ['partido_ci', 'tipo_eleccion', 'division', 'factor_popularidad']
+
+
+def factor_longitud_nombre(longitudes):
+    """Factor de ajuste por longitud del nombre (datos históricos), para un arreglo de longitudes"""
+    longitudes = np.asarray(longitudes)
+    return np.select(
+        [longitudes < 15, longitudes > 25],
+        [FACTORES_LONGITUD_NOMBRE['corto'], FACTORES_LONGITUD_NOMBRE['largo']],
+        default=FACTORES_LONGITUD_NOMBRE['mediano']
+    )
+
+
+def estadisticas_simulacion(df):
+    """Estadísticas base del simulador, calculadas una sola vez sobre los datos enriquecidos
+
+    Promedio de votos y tasa de éxito por partido y por tipo de elección, más los
+    valores generales que se usan cuando el partido no tiene candidatos.
+    """
+    agregados = {'votos_base': ('numero_de_votos', 'mean'), 'prob_exito_base': ('es_exitoso', 'mean')}
+    return {
+        'por_partido': df.groupby('partido_ci', observed=True).agg(**agregados),
+        'por_tipo': df.groupby('tipo_eleccion', observed=True).agg(**agregados),
+        'general': {'votos_base': df['numero_de_votos'].mean(), 'prob_exito_base': df['es_exitoso'].mean()}
+    }
+
+
+def rejilla_escenarios(partidos, tipos_eleccion, divisiones, factores):
+    """Todas las combinaciones (partido, tipo, división, factor), una por fila"""
+    return pd.MultiIndex.from_product(
+        [list(partidos), list(tipos_eleccion), list(divisiones), list(factores)], names=COLUMNAS_ESCENARIO
+    ).to_frame(index=False)
+
+
+def simular_escenarios(estadisticas, escenarios, nombre_candidato):
+    """Proyección de votos y probabilidad de éxito para una rejilla de escenarios en una sola pasada
+
+    `escenarios` tiene las columnas de COLUMNAS_ESCENARIO (ver rejilla_escenarios).
+    Misma fórmula que el simulador individual: promedio histórico del partido
+    (o general si no tiene candidatos) por factor de popularidad y de longitud del
+    nombre; la probabilidad es la tasa de éxito del partido por popularidad * 1.1,
+    con tope de 1. votos_tipo es el promedio del tipo de elección, como referencia.
+    """
+    resultado = escenarios.reset_index(drop=True).copy()
+    general = estadisticas['general']
+
+    por_partido = estadisticas['por_partido'].reindex(resultado['partido_ci'])
+    votos_base = por_partido['votos_base'].fillna(general['votos_base']).to_numpy()
+    prob_exito_base = por_partido['prob_exito_base'].fillna(general['prob_exito_base']).to_numpy()
+
+    longitud_nombre = len(nombre_candidato)
+    factor_longitud = float(factor_longitud_nombre(longitud_nombre))
+    factor_popularidad = resultado['factor_popularidad'].to_numpy(dtype=float)
+
+    resultado['votos_base'] = votos_base
+    resultado['votos_tipo'] = estadisticas['por_tipo']['votos_base'].reindex(resultado['tipo_eleccion']).to_numpy()
+    resultado['factor_longitud'] = factor_longitud
+    resultado['longitud_nombre'] = longitud_nombre
+    resultado['votos_proyectados'] = np.trunc(votos_base * factor_popularidad * factor_longitud).astype('int64')
+    resultado['probabilidad_exito'] = np.minimum(1.0, prob_exito_base * factor_popularidad * 1.1)
+    return resultado
@@ -0,0 +1,153 @@
+"""Auditoría de planes de ejecución de las consultas SQL del proyecto
+
+Extrae todas las cadenas SELECT/WITH de la plataforma y sus páginas, ejecuta
+EXPLAIN QUERY PLAN sobre cada base de datos y marca los recorridos completos
+de tablas y los ordenamientos con B-tree temporal.
+
+Uso:
+    python auditar_consultas.py                      # plataforma y páginas, todas las bases
+    python auditar_consultas.py --año 2024 -v        # mostrar también los planes sin hallazgos
+    python auditar_consultas.py main.py plataforma.py
+
+Sale con código 1 si encuentra errores: recorridos completos de las tablas
+auditadas u ordenamientos temporales de filas sin agregar. Ordenar el
+resultado de un GROUP BY se reporta solo como advertencia, igual que las
+consultas que declaran el recorrido como intencional con el comentario
+`-- auditoria: recorrido intencional` (por ejemplo cargas completas).
+"""
+import argparse
+import ast
+import re
+import sqlite3
+import sys
+from pathlib import Path
+
+import base_datos
+
+# Tablas en las que un recorrido completo o un ordenamiento temporal se considera regresión
+TABLAS_AUDITADAS = {'resultados_electorales', 'ganadores'}
+
+# Archivos auditados por defecto (lo que ejecutan los dashboards)
+ARCHIVOS_POR_DEFECTO = ['PlataformaV5.py', 'pages/*.py']
+
+INICIO_SQL = re.compile(r'^\s*(--[^\n]*\n\s*)*(SELECT|WITH)\b', re.IGNORECASE)
+RECORRIDO_INTENCIONAL = re.compile(r'--\s*auditoria:\s*recorrido intencional', re.IGNORECASE)
+AGREGACION = re.compile(r'\b(GROUP BY|DISTINCT|COUNT|SUM|AVG|MIN|MAX)\b', re.IGNORECASE)
+RECORRIDO_COMPLETO = re.compile(r'^SCAN (\w+)(?! USING)')
+ORDEN_TEMPORAL = re.compile(r'USE TEMP B-TREE FOR (ORDER BY|GROUP BY|DISTINCT|RIGHT PART OF ORDER BY)')
+
+
+def _texto_sql(nodo):
+    """Texto de una constante o f-string (los valores interpolados se sustituyen por 0)"""
+    if isinstance(nodo, ast.Constant) and isinstance(nodo.value, str):
+        return nodo.value
+    if isinstance(nodo, ast.JoinedStr):
+        partes = []
+        for valor in nodo.values:
+            if isinstance(valor, ast.Constant):
+                partes.append(str(valor.value))
+            else:
+                partes.append('0')
+        return ''.join(partes)
+    return None
+
+
+def extraer_consultas(patrones=ARCHIVOS_POR_DEFECTO):
+    """Encontrar las consultas SQL literales en los archivos indicados"""
+    consultas = []
+    archivos = [archivo for patron in patrones for archivo in sorted(Path('.').glob(patron))]
+
+    for archivo in archivos:
+        try:
+            arbol = ast.parse(archivo.read_text(encoding='utf-8'))
+        except SyntaxError:
+            continue
+
+        for nodo in ast.walk(arbol):
+            texto = _texto_sql(nodo)
+            if texto and INICIO_SQL.match(texto):
+                consultas.append((f"{archivo}:{nodo.lineno}", texto.strip().rstrip(';')))
+
+    return consultas
+
+
+def analizar_plan(conn, consulta):
+    """Obtener el plan, los errores y las advertencias de una consulta"""
+    parametros = [None] * consulta.count('?')
+    plan = [fila[3] for fila in conn.execute(f"EXPLAIN QUERY PLAN {consulta}", parametros)]
+
+    # Los ordenamientos temporales solo importan en consultas sobre tablas auditadas
+    usa_tabla_auditada = any(re.search(rf'\b{tabla}\b', consulta) for tabla in TABLAS_AUDITADAS)
+    es_agregada = bool(AGREGACION.search(consulta))
+    es_intencional = bool(RECORRIDO_INTENCIONAL.search(consulta))
+
+    errores, advertencias = [], []
+    for paso in plan:
+        recorrido = RECORRIDO_COMPLETO.match(paso)
+        if recorrido and recorrido.group(1) in TABLAS_AUDITADAS:
+            hallazgo = f"recorrido completo de {recorrido.group(1)}"
+            (advertencias if es_intencional else errores).append(hallazgo)
+
+        orden = ORDEN_TEMPORAL.search(paso)
+        if orden and usa_tabla_auditada:
+            hallazgo = f"B-tree temporal para {orden.group(1)}"
+            # Ordenar filas ya agregadas es barato; ordenar o agrupar filas crudas no
+            if orden.group(1) == 'ORDER BY' and es_agregada:
+                advertencias.append(hallazgo)
+            else:
+                errores.append(hallazgo)
+
+    return plan, errores, advertencias
+
+
+def auditar(años, patrones=ARCHIVOS_POR_DEFECTO, verbose=False):
+    """Auditar las consultas en las bases indicadas; devuelve el número de errores"""
+    consultas = extraer_consultas(patrones)
+    total_errores = 0
+    total_advertencias = 0
+
+    for año in años:
+        print(f"\n🔍 Base {año} ({base_datos.ruta_db(año)}) - {len(consultas)} consultas")
+        print("=" * 80)
+
+        with base_datos.conectar(año) as conn:
+            for ubicacion, consulta in consultas:
+                try:
+                    plan, errores, advertencias = analizar_plan(conn, consulta)
+                except sqlite3.Error as e:
+                    if verbose:
+                        print(f"\n⏭️  {ubicacion}: no aplica ({e})")
+                    continue
+
+                total_errores += len(errores)
+                total_advertencias += len(advertencias)
+
+                if errores:
+                    print(f"\n❌ {ubicacion}")
+                elif advertencias or verbose:
+                    print(f"\n{'⚠️ ' if advertencias else '✅'} {ubicacion}")
+                else:
+                    continue
+
+                for hallazgo in errores:
+                    print(f"    - ERROR: {hallazgo}")
+                for hallazgo in advertencias:
+                    print(f"    - advertencia: {hallazgo}")
+                for paso in plan:
+                    print(f"      {paso}")
+
+    print(f"\n{'❌' if total_errores else '✅'} Errores: {total_errores} | Advertencias: {total_advertencias}")
+    return total_errores
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Auditar planes de ejecución de las consultas SQL")
+    parser.add_argument('--año', action='append', choices=list(base_datos.BASES_DATOS),
+                        help="Año a auditar (se puede repetir; por defecto todos)")
+    parser.add_argument('-v', '--verbose', action='store_true', help="Mostrar también los planes sin hallazgos")
+    parser.add_argument('archivos', nargs='*', default=ARCHIVOS_POR_DEFECTO,
+                        help="Archivos o patrones glob a auditar")
+    args = parser.parse_args()
+
+    errores = auditar(args.año or list(base_datos.BASES_DATOS), args.archivos, args.verbose)
+    sys.exit(1 if errores else 0)
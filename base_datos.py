@@ -0,0 +1,248 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from queue import Empty, LifoQueue
+
+import pandas as pd
+
+# Bases de datos por año (rutas relativas al directorio de ejecución)
+BASES_DATOS = {
+    '2021': 'elecciones_nl_2021.db',
+    '2024': 'elecciones_nl_2024.db'
+}
+
+# Comando que genera la base de cada año (elecciones_nl_2021.db no se versiona)
+COMANDOS_BASES = {
+    '2021': 'python main_2021.py',
+    '2024': 'python main.py'
+}
+
+# Configuración del pool y del cache de consultas
+CONEXIONES_POR_BASE = 4
+TTL_CACHE_SEGUNDOS = 600
+MAX_ENTRADAS_CACHE = 256
+MAX_BYTES_CACHE = 256 * 1024 * 1024  # 256 MB
+
+
+def ruta_db(año):
+    """Obtener la ruta del archivo SQLite para un año (o una ruta directa)"""
+    return BASES_DATOS.get(str(año), str(año))
+
+
+def _registrar_funciones(conn):
+    """Funciones SQL disponibles en las conexiones de lectura"""
+    # minusculas(): LOWER de SQLite solo convierte ASCII ("GARCÍA" -> "garcÍa")
+    conn.create_function(
+        'minusculas', 1, lambda texto: texto.casefold() if isinstance(texto, str) else texto, deterministic=True
+    )
+    return conn
+
+
+def mensaje_base_faltante(año):
+    """Texto para el usuario cuando la base de un año no existe"""
+    mensaje = f"No existe la base de datos {ruta_db(año)}"
+    comando = COMANDOS_BASES.get(str(año))
+    return f"{mensaje}: genérala con `{comando}`" if comando else mensaje
+
+
+def bases_faltantes(años=None):
+    """Años (todos los de BASES_DATOS si no se indican) cuya base no está en disco"""
+    return [str(año) for año in (años or BASES_DATOS) if not os.path.exists(ruta_db(año))]
+
+
+class BaseNoEncontrada(FileNotFoundError):
+    """La base de un año no existe: hay que generarla antes de consultarla"""
+
+    def __init__(self, año):
+        super().__init__(mensaje_base_faltante(año))
+        self.año = str(año)
+
+
+class PoolConexiones:
+    """Pool de conexiones de solo lectura para una base de datos SQLite"""
+
+    def __init__(self, ruta, tamaño=CONEXIONES_POR_BASE):
+        self.ruta = ruta
+        self.tamaño = tamaño
+        self._libres = LifoQueue()
+        self._creadas = 0
+        self._lock = threading.Lock()
+
+    def _crear_conexion(self):
+        uri = Path(self.ruta).resolve().as_uri() + '?mode=ro'
+        return _registrar_funciones(sqlite3.connect(uri, uri=True, check_same_thread=False))
+
+    @contextmanager
+    def conexion(self):
+        """Tomar una conexión del pool y devolverla al terminar"""
+        conn = None
+        try:
+            conn = self._libres.get_nowait()
+        except Empty:
+            with self._lock:
+                if self._creadas < self.tamaño:
+                    self._creadas += 1
+                    crear = True
+                else:
+                    crear = False
+            if crear:
+                try:
+                    conn = self._crear_conexion()
+                except Exception:
+                    with self._lock:
+                        self._creadas -= 1
+                    raise
+            else:
+                conn = self._libres.get()
+
+        try:
+            yield conn
+        finally:
+            self._libres.put(conn)
+
+    def cerrar(self):
+        """Cerrar todas las conexiones libres del pool"""
+        while True:
+            try:
+                conn = self._libres.get_nowait()
+            except Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._creadas -= 1
+
+
+class CacheConsultas:
+    """Cache LRU de resultados de consultas con TTL y límite de memoria"""
+
+    def __init__(self, ttl=TTL_CACHE_SEGUNDOS, max_entradas=MAX_ENTRADAS_CACHE, max_bytes=MAX_BYTES_CACHE):
+        self.ttl = ttl
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self._entradas = OrderedDict()  # clave -> (expira, bytes, DataFrame)
+        self._bytes_totales = 0
+        self._lock = threading.Lock()
+
+    def obtener(self, clave):
+        """Obtener un resultado vigente del cache (o None)"""
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                return None
+            expira, _, df = entrada
+            if expira < time.monotonic():
+                self._eliminar(clave)
+                return None
+            self._entradas.move_to_end(clave)
+            return df
+
+    def guardar(self, clave, df):
+        """Guardar un resultado y desalojar las entradas más antiguas si es necesario"""
+        tamaño = int(df.memory_usage(index=True, deep=True).sum())
+        if tamaño > self.max_bytes:
+            return
+
+        with self._lock:
+            if clave in self._entradas:
+                self._eliminar(clave)
+            self._entradas[clave] = (time.monotonic() + self.ttl, tamaño, df)
+            self._bytes_totales += tamaño
+
+            while self._entradas and (
+                    len(self._entradas) > self.max_entradas or self._bytes_totales > self.max_bytes):
+                self._eliminar(next(iter(self._entradas)))
+
+    def limpiar(self, año=None):
+        """Vaciar el cache completo o solo las entradas de un año"""
+        with self._lock:
+            if año is None:
+                self._entradas.clear()
+                self._bytes_totales = 0
+                return
+            for clave in [c for c in self._entradas if c[0] == str(año)]:
+                self._eliminar(clave)
+
+    def _eliminar(self, clave):
+        _, tamaño, _ = self._entradas.pop(clave)
+        self._bytes_totales -= tamaño
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+_cache = CacheConsultas()
+
+
+def obtener_pool(año):
+    """Obtener (o crear) el pool de conexiones compartido de un año"""
+    ruta = ruta_db(año)
+    # En modo ro SQLite solo diría "unable to open database file"
+    if not os.path.exists(ruta):
+        raise BaseNoEncontrada(año)
+
+    with _pools_lock:
+        if ruta not in _pools:
+            _pools[ruta] = PoolConexiones(ruta)
+        return _pools[ruta]
+
+
+@contextmanager
+def conectar(año):
+    """Conexión de solo lectura tomada del pool compartido"""
+    with obtener_pool(año).conexion() as conn:
+        yield conn
+
+
+def conectar_escritura(año):
+    """Conexión de escritura (solo para procesos de carga, nunca para la UI)"""
+    return sqlite3.connect(ruta_db(año))
+
+
+def version_datos(año):
+    """Versión de los datos de un año: cambia con cualquier escritura (incluido el WAL pendiente)"""
+    ruta = ruta_db(año)
+    version = []
+    for archivo in (ruta, ruta + '-wal'):
+        if os.path.exists(archivo):
+            estado = os.stat(archivo)
+            version.append((estado.st_mtime_ns, estado.st_size))
+    return tuple(version)
+
+
+def _clave_params(params):
+    """Parámetros como clave de cache; los nombrados (dict) con sus valores, no solo las llaves"""
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return tuple(sorted(params.items()))
+    return tuple(params)
+
+
+def consultar(año, consulta, params=None, usar_cache=True):
+    """Ejecutar una consulta SELECT con cache por (año, versión de los datos, SQL, parámetros)
+
+    Con la versión en la clave, una escritura a la base (de otro proceso o del WAL)
+    no devuelve resultados viejos; las entradas anteriores salen por TTL o LRU.
+    """
+    clave = (str(año), version_datos(año), consulta, _clave_params(params))
+
+    if usar_cache:
+        df = _cache.obtener(clave)
+        if df is not None:
+            return df.copy()
+
+    with conectar(año) as conn:
+        df = pd.read_sql_query(consulta, conn, params=params)
+
+    if usar_cache:
+        _cache.guardar(clave, df)
+        return df.copy()
+    return df
+
+
+def limpiar_cache(año=None):
+    """Invalidar los resultados en cache (por ejemplo después de una recarga)"""
+    _cache.limpiar(año)
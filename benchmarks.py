@@ -0,0 +1,526 @@
+"""Benchmarks de las rutinas vectorizadas sobre datos sintéticos
+
+Uso:
+    python benchmarks.py eficiencia
+    python benchmarks.py carga
+    python benchmarks.py mapa
+    python benchmarks.py caracteristicas
+    python benchmarks.py simulacion
+    python benchmarks.py cubo
+    python benchmarks.py participacion
+    python benchmarks.py coaliciones
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from analisis_electoral import (caracteristicas_basicas, eficiencia_por_division, estadisticas_simulacion,
+                                 rejilla_escenarios, simular_escenarios)
+from ingesta import caracteristicas_nombre, insertar_en_lotes, limpiar_votos, modo_carga_masiva
+import casillas_federales
+from coaliciones import distribuir_coaliciones, matriz_membresia
+import mapas
+from participacion import COLUMNAS_PARTICIPACION, participacion_por_nivel
+from partidos import COALICIONES
+from tablas_derivadas import CUBO, actualizar_cubo, actualizar_votos_distribuidos
+
+PARTIDOS_SINTETICOS = ['PAN', 'PRI', 'PRD', 'PVEM', 'PT', 'MC', 'MORENA', 'PES', 'RSP', 'FXM']
+
+
+def generar_resultados(filas, candidatos_por_division=10, semilla=0):
+    """Tabla sintética con el esquema de resultados_electorales"""
+    rng = np.random.default_rng(semilla)
+    divisiones = max(1, filas // candidatos_por_division)
+
+    df = pd.DataFrame({
+        'division_territorial': [f"{i}. Division" for i in rng.integers(0, divisiones, filas)],
+        'nombre_candidato': [f"Candidato {i}" for i in range(filas)],
+        'partido_ci': rng.choice(PARTIDOS_SINTETICOS, filas),
+        'numero_de_votos': rng.integers(0, 50000, filas),
+        'tipo_eleccion': 'MUNICIPAL'
+    })
+    return df.sort_values('numero_de_votos', ascending=False, kind='stable').reset_index(drop=True)
+
+
+def ganadores_de(df):
+    """Ganador por división (equivalente a ROW_NUMBER() ... WHERE rank = 1)"""
+    return df.drop_duplicates('division_territorial')[
+        ['division_territorial', 'nombre_candidato', 'partido_ci', 'numero_de_votos']
+    ].reset_index(drop=True)
+
+
+def _eficiencia_iterativa(datos, ganadores, nombre_mc):
+    """Implementación anterior (un filtro por municipio), usada como referencia"""
+    eficiencia_municipio = []
+    for municipio in datos['division_territorial'].unique():
+        datos_mun = datos[datos['division_territorial'] == municipio]
+        if nombre_mc in datos_mun['partido_ci'].values:
+            votos_mc = datos_mun[datos_mun['partido_ci'] == nombre_mc]['numero_de_votos'].iloc[0]
+            votos_totales = datos_mun['numero_de_votos'].sum()
+            porcentaje = (votos_mc / votos_totales) * 100
+            ganador = ganadores[ganadores['division_territorial'] == municipio]['partido_ci'].iloc[0]
+            eficiencia_municipio.append({
+                'municipio': municipio,
+                'votos_mc': votos_mc,
+                'porcentaje_mc': porcentaje,
+                'ganador': ganador,
+                'mc_es_ganador': ganador == nombre_mc
+            })
+    return pd.DataFrame(eficiencia_municipio)
+
+
+def _cronometrar(funcion, *args, repeticiones=3):
+    mejor = float('inf')
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion(*args)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor, resultado
+
+
+def benchmark_eficiencia():
+    """Eficiencia de MC por división: recorrido por municipio vs groupby/merge"""
+    print("📏 Eficiencia por división (MC)")
+    print(f"{'filas':>10} {'iterativo (s)':>15} {'vectorizado (s)':>17} {'µs/fila':>10}")
+
+    for filas in [5_000, 10_000, 25_000, 50_000, 100_000]:
+        datos = generar_resultados(filas)
+        ganadores = ganadores_de(datos)
+
+        t_vec, resultado = _cronometrar(eficiencia_por_division, datos, ganadores, 'MC')
+
+        # El recorrido anterior es cuadrático: solo se mide en tamaños pequeños
+        if filas <= 10_000:
+            t_iter, referencia = _cronometrar(_eficiencia_iterativa, datos, ganadores, 'MC', repeticiones=1)
+            pd.testing.assert_frame_equal(resultado, referencia)
+            texto_iter = f"{t_iter:15.3f}"
+        else:
+            texto_iter = f"{'-':>15}"
+
+        print(f"{filas:>10,} {texto_iter} {t_vec:17.4f} {t_vec / filas * 1e6:10.3f}")
+
+
+def _limpiar_voto_por_fila(voto):
+    """Limpieza anterior de main.py (apply fila por fila), usada como referencia"""
+    if isinstance(voto, str):
+        if voto.replace(',', '').isdigit():
+            return int(voto.replace(',', ''))
+        elif 'Registro cancelado' in voto:
+            return 0
+        else:
+            try:
+                return int(voto.replace(',', ''))
+            except ValueError:
+                return 0
+    elif pd.isna(voto):
+        return 0
+    else:
+        return int(voto)
+
+
+def _votos_como_texto(df, semilla=0):
+    """Votos con el formato de los CSV fuente: comas de miles, registros cancelados y vacíos"""
+    rng = np.random.default_rng(semilla)
+    texto = df['numero_de_votos'].map('{:,}'.format).astype(object)
+    texto[rng.random(len(df)) < 0.01] = 'Registro cancelado'
+    texto[rng.random(len(df)) < 0.01] = np.nan
+    return texto
+
+
+CREAR_TABLA_CARGA = """
+    CREATE TABLE resultados_electorales (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        nombre_candidato VARCHAR(300) NOT NULL,
+        numero_de_votos INTEGER,
+        division_territorial VARCHAR(150),
+        partido_ci VARCHAR(150),
+        tipo_eleccion VARCHAR(20) NOT NULL
+    )
+"""
+
+
+def _carga_anterior(ruta, df):
+    conn = sqlite3.connect(ruta)
+    df = df.assign(numero_de_votos=df['numero_de_votos'].apply(_limpiar_voto_por_fila))
+    df.to_sql('resultados_electorales', conn, if_exists='append', index=False)
+    conn.close()
+
+
+def _carga_masiva(ruta, df):
+    conn = sqlite3.connect(ruta)
+    with modo_carga_masiva(conn):
+        df = df.assign(numero_de_votos=limpiar_votos(df['numero_de_votos']))
+        insertar_en_lotes(conn, 'resultados_electorales', df)
+    conn.close()
+
+
+def benchmark_carga():
+    """Carga a SQLite: apply + to_sql vs limpieza vectorizada + executemany por lotes"""
+    print("📏 Carga de resultados a SQLite")
+    print(f"{'filas':>10} {'anterior (filas/s)':>20} {'masiva (filas/s)':>18}")
+
+    with tempfile.TemporaryDirectory() as directorio:
+        for filas in [100_000, 1_000_000]:
+            datos = generar_resultados(filas)
+            datos['numero_de_votos'] = _votos_como_texto(datos)
+
+            velocidades = []
+            for nombre, carga in [('anterior', _carga_anterior), ('masiva', _carga_masiva)]:
+                ruta = os.path.join(directorio, f"{nombre}_{filas}.db")
+                conn = sqlite3.connect(ruta)
+                conn.execute(CREAR_TABLA_CARGA)
+                conn.close()
+
+                segundos, _ = _cronometrar(carga, ruta, datos, repeticiones=1)
+                velocidades.append(filas / segundos)
+
+            # Ambas cargas deben dejar exactamente los mismos votos
+            consulta = "SELECT numero_de_votos FROM resultados_electorales ORDER BY id"
+            anterior, masiva = (
+                pd.read_sql_query(consulta, sqlite3.connect(os.path.join(directorio, f"{nombre}_{filas}.db")))
+                for nombre in ('anterior', 'masiva')
+            )
+            pd.testing.assert_frame_equal(anterior, masiva)
+
+            print(f"{filas:>10,} {velocidades[0]:20,.0f} {velocidades[1]:18,.0f}")
+
+
+def _mapa_por_fila(gdf, centro):
+    """Render anterior de Mapa Interactivo: una capa y un popup HTML con barra por municipio"""
+    import folium
+
+    m = folium.Map(location=centro, zoom_start=6, tiles="cartodb positron")
+    for _, row in gdf.iterrows():
+        color = "#FF7F00" if row["es_MC"] else "gray"
+        porcentaje = row["Porcentaje"]
+        popup_html = f"""
+        <div style="font-family:sans-serif; font-size:14px;">
+            <b>Municipio:</b> {row['NOMGEO']}<br>
+            <b>Estado:</b> {row['NOM_ENT']}<br>
+            <b>Candidato:</b> {row['nombre_can']}<br>
+            <b>Partido:</b> {row['PARTIDO_CI']}<br>
+            <b>Votos:</b> {row['numero_de_']:,}<br>
+            <b>Porcentaje:</b> {porcentaje}%<br>
+            <div style="background-color: lightgray; width: 100px; height: 10px; border-radius: 3px;">
+                <div style="width: {porcentaje}%; height: 100%; background-color: #FF7F00; border-radius: 3px;"></div>
+            </div>
+        </div>
+        """
+        folium.GeoJson(
+            row["geometry"],
+            style_function=lambda feature, color=color: {"color": color, "weight": 1.5},
+            popup=folium.Popup(popup_html, max_width=250)
+        ).add_to(m)
+    return m
+
+
+def benchmark_mapa():
+    """Tamaño del mapa serializado: capa por municipio vs una capa con popup en el navegador"""
+    import json
+
+    import geopandas as gpd
+
+    print("📏 Mapa interactivo (HTML que se envía al navegador)")
+    print(f"{'render':<40} {'KB':>10} {'tiempo (s)':>12}")
+
+    gdf = mapas.limpiar_atributos(gpd.read_file(mapas.RUTA_SHAPEFILE))
+    _, metadatos = mapas.cargar_mapa()
+    completo = json.loads(gdf[mapas.COLUMNAS_MAPA + ['es_MC', 'geometry']].to_json(drop_id=True))
+
+    casos = [('anterior: capa + popup HTML por fila', lambda: _mapa_por_fila(gdf, metadatos['centro'])),
+             ('una capa, geometría completa', lambda: mapas.mapa_coropletico(completo, metadatos))]
+    casos += [(f"una capa, detalle {nivel}", lambda nivel=nivel: mapas.mapa_coropletico(mapas.cargar_mapa(nivel)[0], metadatos))
+              for nivel in mapas.NIVELES_DETALLE]
+
+    for nombre, construir in casos:
+        segundos, tamaño = _cronometrar(lambda: mapas.tamaño_serializado(construir()))
+        print(f"{nombre:<40} {tamaño / 1024:10,.0f} {segundos:12.3f}")
+
+
+def _caracteristicas_por_tipo(data):
+    """Implementación anterior de _crear_caracteristicas_basicas (copia + máscaras por tipo)"""
+    df = data.copy()
+
+    df['longitud_nombre'] = df['nombre_candidato'].str.len().fillna(0)
+    df['cantidad_palabras'] = df['nombre_candidato'].str.split().str.len().fillna(1)
+
+    df['votos_normalizados'] = 0.5
+    for tipo in df['tipo_eleccion'].unique():
+        mask = df['tipo_eleccion'] == tipo
+        votos_tipo = df.loc[mask, 'numero_de_votos']
+        if len(votos_tipo) > 1 and votos_tipo.max() > votos_tipo.min():
+            df.loc[mask, 'votos_normalizados'] = (
+                    (votos_tipo - votos_tipo.min()) / (votos_tipo.max() - votos_tipo.min())
+            )
+
+    df['percentil_votos'] = 0.5
+    for tipo in df['tipo_eleccion'].unique():
+        mask = df['tipo_eleccion'] == tipo
+        votos_tipo = df.loc[mask, 'numero_de_votos']
+        if len(votos_tipo) > 0:
+            df.loc[mask, 'percentil_votos'] = votos_tipo.rank(pct=True)
+
+    df['categoria_exito'] = pd.cut(
+        df['percentil_votos'], bins=[0, 0.25, 0.75, 1], labels=['Bajo', 'Medio', 'Alto'], include_lowest=True
+    )
+    df['es_exitoso'] = (df['percentil_votos'] > 0.75).astype(int)
+    return df
+
+
+def _memoria_pico(funcion, *args):
+    """Segundos y pico de memoria asignada (MB) durante una llamada"""
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    resultado = funcion(*args)
+    segundos = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return segundos, pico / 2 ** 20, resultado
+
+
+def benchmark_caracteristicas():
+    """Características del análisis avanzado: copia + máscaras por tipo vs groupby-transform"""
+    print("📏 Características básicas (análisis avanzado)")
+    print(f"{'filas':>10} {'anterior (s)':>13} {'MB':>8} {'vectorizado (s)':>16} {'MB':>8} {'columnas nuevas (MB)':>21}")
+
+    for filas in [100_000, 1_000_000]:
+        rng = np.random.default_rng(0)
+        datos = generar_resultados(filas)
+        datos['tipo_eleccion'] = rng.choice(['MUNICIPAL', 'DIPUTADO', 'GOBERNADOR'], filas)
+        datos['nombre_candidato'] = datos['nombre_candidato'] + rng.choice(['', ' De La Garza', ' Núñez'], filas)
+        columnas_base = list(datos.columns)
+
+        t_anterior, mb_anterior, referencia = _memoria_pico(_caracteristicas_por_tipo, datos)
+
+        # Las columnas del nombre llegan precalculadas desde la carga
+        datos['longitud_nombre'], datos['cantidad_palabras'] = caracteristicas_nombre(datos['nombre_candidato'])
+        t_nuevo, mb_nuevo, resultado = _memoria_pico(caracteristicas_basicas, datos)
+
+        pd.testing.assert_frame_equal(resultado, referencia[resultado.columns], check_dtype=False)
+        nuevas = resultado.drop(columns=columnas_base + ['longitud_nombre', 'cantidad_palabras'])
+        mb_columnas = nuevas.memory_usage(index=False).sum() / 2 ** 20
+
+        print(f"{filas:>10,} {t_anterior:13.3f} {mb_anterior:8.1f} {t_nuevo:16.3f} {mb_nuevo:8.1f} {mb_columnas:21.1f}")
+
+
+def _simular_candidato_anterior(df, partido, factor_popularidad, nombre_candidato):
+    """Implementación anterior de simular_candidato (filtra todo el DataFrame en cada llamada)"""
+    stats_partido = df[df['partido_ci'] == partido]
+    votos_base = stats_partido['numero_de_votos'].mean() if len(stats_partido) > 0 else df['numero_de_votos'].mean()
+
+    longitud_nombre = len(nombre_candidato)
+    if longitud_nombre < 15:
+        factor_longitud = 0.9
+    elif longitud_nombre > 25:
+        factor_longitud = 0.95
+    else:
+        factor_longitud = 1.05
+
+    prob_exito_base = stats_partido['es_exitoso'].mean() if len(stats_partido) > 0 else df['es_exitoso'].mean()
+    return (int(votos_base * factor_popularidad * factor_longitud),
+            min(1.0, prob_exito_base * factor_popularidad * 1.1))
+
+
+def benchmark_simulacion():
+    """Simulador: una llamada por escenario vs rejilla completa en una pasada"""
+    print("🎮 Simulación de escenarios (partidos x factores de popularidad)")
+    print(f"{'filas':>10} {'escenarios':>11} {'por escenario (s)':>18} {'rejilla (s)':>12} {'aceleración':>12}")
+
+    nombre = "María González López"
+    partidos = PARTIDOS_SINTETICOS + ['SIN CANDIDATOS']
+    factores = np.round(np.arange(0.1, 3.05, 0.1), 1)
+
+    for filas in [100_000, 1_000_000]:
+        datos = caracteristicas_basicas(generar_resultados(filas))
+        escenarios = rejilla_escenarios(partidos, ['MUNICIPAL'], ['Nuevo Distrito'], factores)
+
+        inicio = time.perf_counter()
+        referencia = [_simular_candidato_anterior(datos, partido, factor, nombre)
+                      for partido, factor in zip(escenarios['partido_ci'], escenarios['factor_popularidad'])]
+        t_anterior = time.perf_counter() - inicio
+
+        t_rejilla, resultado = _cronometrar(
+            lambda: simular_escenarios(estadisticas_simulacion(datos), escenarios, nombre))
+
+        assert resultado['votos_proyectados'].tolist() == [votos for votos, _ in referencia]
+        np.testing.assert_allclose(resultado['probabilidad_exito'], [prob for _, prob in referencia])
+
+        print(f"{filas:>10,} {len(escenarios):>11} {t_anterior:18.3f} {t_rejilla:12.3f} "
+              f"{t_anterior / t_rejilla:11.0f}x")
+
+
+def generar_casillas(casillas, distritos=12, secciones_por_distrito=250, semilla=0):
+    """Cómputo sintético por casilla con las columnas de diputados_federales_nl_2021.csv"""
+    rng = np.random.default_rng(semilla)
+    distrito = rng.integers(1, distritos + 1, casillas)
+    votos = rng.integers(0, 120, (casillas, len(casillas_federales.PARTIDOS_CASILLA)))
+    nulos = rng.integers(0, 20, casillas)
+
+    df = pd.DataFrame(votos, columns=casillas_federales.PARTIDOS_CASILLA)
+    df.insert(0, 'casilla_id', [f"DPFED-{i:05d}-x" for i in range(1, casillas + 1)])
+    df['anno'] = 2021
+    df['CLAVE_CASILLA'] = "'190000B0100'"
+    df['CLAVE_ACTA'] = ''
+    df['ID_DISTRITO'] = distrito
+    df['NOMBRE_DISTRITO'] = [f"DISTRITO {d}" for d in distrito]
+    df['SECCION'] = distrito * 10_000 + rng.integers(0, secciones_por_distrito, casillas)
+    df['ID_CASILLA'] = 1
+    df['TIPO_CASILLA'] = 'B'
+    df['EXT_CONTIGUA'] = 0
+    df['CASILLA'] = 'Urbana'
+    df['NUM_ACTA_IMPRESO'] = '2'
+    df['CANDIDATO/A NO REGISTRADO/A'] = 0
+    df['VOTOS NULOS'] = nulos
+    df['TOTAL_VOTOS_CALCULADOS'] = votos.sum(axis=1) + nulos
+    df['LISTA_NOMINAL_CASILLA'] = 750
+    df['OBSERVACIONES'] = df['MECANISMOS_TRASLADO'] = df['FECHA_HORA'] = ''
+    return df
+
+
+def benchmark_cubo():
+    """Drill-down: sumar casillas en cada consulta vs leer el nivel precalculado del cubo"""
+    print("🧮 Cubo de votos por casilla (votos por partido de un distrito y de sus secciones)")
+    print(f"{'casillas':>10} {'filas hecho':>12} {'construir cubo (s)':>19} "
+          f"{'desde casillas (ms)':>20} {'desde cubo (ms)':>16}")
+
+    consultas = {
+        'casillas': [
+            "SELECT partido_id, SUM(votos) FROM votos_casilla WHERE distrito_id = 5 GROUP BY partido_id",
+            "SELECT seccion, partido_id, SUM(votos) FROM votos_casilla WHERE distrito_id = 5 "
+            "GROUP BY seccion, partido_id",
+        ],
+        'cubo': [
+            "SELECT partido_id, votos FROM cubo_votos_distrito WHERE distrito_id = 5",
+            "SELECT seccion, partido_id, votos FROM cubo_votos_seccion WHERE distrito_id = 5",
+        ],
+    }
+
+    for casillas in [10_000, 100_000]:
+        df = generar_casillas(casillas)
+        conn = sqlite3.connect(':memory:')
+        casillas_federales.crear_esquema(conn)
+        _, _, tabla_casillas = casillas_federales.preparar_casillas(df)
+        votos = casillas_federales.derretir_votos(df, tabla_casillas)
+        insertar_en_lotes(conn, 'casillas_federales', tabla_casillas)
+        insertar_en_lotes(conn, 'votos_casilla', votos)
+        conn.execute("ANALYZE")
+
+        inicio = time.perf_counter()
+        actualizar_votos_distribuidos(conn)  # fuente de los niveles cubo_distribuidos_*
+        for tabla in CUBO:
+            actualizar_cubo(tabla, conn)
+        t_cubo = time.perf_counter() - inicio
+
+        tiempos = {}
+        for fuente, sentencias in consultas.items():
+            tiempos[fuente], resultados = _cronometrar(
+                lambda: [sorted(conn.execute(sql).fetchall()) for sql in sentencias], repeticiones=5)
+            tiempos[fuente + '_resultado'] = resultados
+        assert tiempos['casillas_resultado'] == tiempos['cubo_resultado']
+        conn.close()
+
+        print(f"{casillas:>10,} {len(votos):>12,} {t_cubo:19.3f} "
+              f"{tiempos['casillas'] * 1000:20.2f} {tiempos['cubo'] * 1000:16.2f}")
+
+
+def _participacion_por_fila(casillas):
+    """Referencia fila por fila: acumula sumas por sección y distrito en diccionarios"""
+    def indicadores(total, nulos, lista):
+        participacion = total / lista if lista > 0 else np.nan
+        return participacion, nulos / total if total > 0 else np.nan, max(1 - participacion, 0)
+
+    niveles = {'seccion': {}, 'distrito': {}}
+    for fila in casillas.itertuples(index=False):
+        for nivel, clave in (('seccion', (fila.distrito_id, fila.seccion)), ('distrito', (fila.distrito_id,))):
+            sumas = niveles[nivel].setdefault(clave, [0, 0, 0])
+            sumas[0] += fila.total_votos
+            sumas[1] += fila.votos_nulos
+            sumas[2] += fila.lista_nominal
+
+    return {nivel: pd.DataFrame([clave + indicadores(*sumas) for clave, sumas in sorted(grupos.items())],
+                                columns=(['distrito_id', 'seccion'] if nivel == 'seccion' else ['distrito_id'])
+                                + COLUMNAS_PARTICIPACION)
+            for nivel, grupos in niveles.items()}
+
+
+def benchmark_participacion():
+    """Participación por casilla, sección y distrito: fila por fila vs NumPy (bincount)"""
+    print("🗳️ Participación, nulos y abstención")
+    print(f"{'casillas':>10} {'fila por fila (s)':>18} {'numpy (s)':>10}")
+
+    for casillas in [100_000, 1_000_000]:
+        _, _, tabla = casillas_federales.preparar_casillas(generar_casillas(casillas, secciones_por_distrito=600))
+        tabla = tabla[['distrito_id', 'seccion', 'total_votos', 'votos_nulos', 'lista_nominal']]
+
+        inicio = time.perf_counter()
+        referencia = _participacion_por_fila(tabla)
+        t_filas = time.perf_counter() - inicio
+
+        t_numpy, niveles = _cronometrar(participacion_por_nivel, tabla)
+        for nivel, esperado in referencia.items():
+            pd.testing.assert_frame_equal(niveles[nivel][esperado.columns], esperado, check_dtype=False)
+
+        print(f"{casillas:>10,} {t_filas:18.3f} {t_numpy:10.3f}")
+
+
+def _distribuir_por_casilla(votos_partidos, votos_coaliciones, partidos, coaliciones):
+    """Referencia casilla por casilla y coalición por coalición"""
+    asignados = np.zeros_like(votos_partidos)
+    for i in range(len(votos_partidos)):
+        for j, coalicion in enumerate(coaliciones):
+            columnas = [partidos.index(miembro) for miembro in COALICIONES[coalicion]]
+            parte, residuo = divmod(int(votos_coaliciones[i, j]), len(columnas))
+            por_votos = sorted(columnas, key=lambda c: -votos_partidos[i, c])  # sorted es estable
+            for lugar, columna in enumerate(por_votos):
+                asignados[i, columna] += parte + (lugar < residuo)
+    return asignados
+
+
+def benchmark_coaliciones():
+    """Reparto de votos de coalición: casilla por casilla vs matrices (casilla x coalición -> partido)"""
+    print("🤝 Reparto de votos de coalición")
+    print(f"{'casillas':>10} {'por casilla (s)':>16} {'matrices (s)':>13}")
+
+    coaliciones = [p for p in casillas_federales.PARTIDOS_CASILLA if p in COALICIONES]
+    partidos = [p for p in casillas_federales.PARTIDOS_CASILLA if p not in COALICIONES]
+    membresia = matriz_membresia(partidos, coaliciones, COALICIONES)
+
+    for casillas in [10_000, 100_000]:
+        df = generar_casillas(casillas)
+        votos_partidos = df[partidos].to_numpy(dtype='int64')
+        votos_coaliciones = df[coaliciones].to_numpy(dtype='int64')
+
+        inicio = time.perf_counter()
+        referencia = _distribuir_por_casilla(votos_partidos, votos_coaliciones, partidos, coaliciones)
+        t_casilla = time.perf_counter() - inicio
+
+        t_matrices, asignados = _cronometrar(distribuir_coaliciones, votos_partidos, votos_coaliciones, membresia)
+        np.testing.assert_array_equal(asignados, referencia)
+        assert asignados.sum() == votos_coaliciones.sum()
+
+        print(f"{casillas:>10,} {t_casilla:16.3f} {t_matrices:13.3f}")
+
+
+BENCHMARKS = {
+    'eficiencia': benchmark_eficiencia,
+    'carga': benchmark_carga,
+    'mapa': benchmark_mapa,
+    'caracteristicas': benchmark_caracteristicas,
+    'simulacion': benchmark_simulacion,
+    'cubo': benchmark_cubo,
+    'participacion': benchmark_participacion,
+    'coaliciones': benchmark_coaliciones,
+}
+
+
+if __name__ == '__main__':
+    seleccion = sys.argv[1:] or list(BENCHMARKS)
+    for nombre in seleccion:
+        BENCHMARKS[nombre]()
+        print()
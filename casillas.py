@@ -0,0 +1,138 @@
+"""Filas de casilla raspadas por Bien2o.py: esquema de la fila y almacén consolidado
+
+Las casillas se guardan en una tabla de staging en SQLite (una fila por casilla,
+con clave distrito/sección/casilla) en lugar de un CSV por casilla.
+
+Uso:
+    python casillas.py compactar            # integra los CSV por casilla de la raíz al almacén
+    python casillas.py compactar --borrar   # y borra los CSV ya integrados
+"""
+import argparse
+import glob
+import os
+import sqlite3
+
+import pandas as pd
+
+from ingesta import limpiar_votos
+
+lista_partidos = [
+    'PAN','PRI','p3','p4','p5','p6','p7','p8','p9','p10','p11','p12','p13','p14','p15','p16'
+]
+lista2 = ['v_acumulados', 'no_registrados', 'nulos']  # votos extra
+
+COLUMNAS_FILA = ['distrito', 'sección', 'casilla'] + lista_partidos + lista2
+
+
+def armar_fila(distrito, seccion, casilla, lista_votos, lista_extras):
+    """Fila de una casilla; falla si no vienen los votos de todos los partidos"""
+    esperado_partidos = len(lista_partidos)
+    if len(lista_votos) != esperado_partidos:
+        raise ValueError(f"Mismatch en número de votos: esperados {esperado_partidos}, recibidos {len(lista_votos)}")
+
+    lista_extras = list(lista_extras)
+    esperado_extras = len(lista2)
+    if len(lista_extras) < esperado_extras:
+        print(f"Faltan votos extra: completando con ceros.")
+        lista_extras += ['0'] * (esperado_extras - len(lista_extras))
+    elif len(lista_extras) > esperado_extras:
+        lista_extras = lista_extras[:esperado_extras]
+
+    fila = {'distrito': distrito, 'sección': seccion, 'casilla': casilla}
+
+    for i, partido in enumerate(lista_partidos):
+        fila[partido] = lista_votos[i]
+
+    for i, campo in enumerate(lista2):
+        fila[campo] = lista_extras[i]
+
+    return fila
+
+
+RUTA_ALMACEN = 'casillas_2024_diputaciones.db'
+PATRON_CSV_CASILLA = 'Elecciones_2024_diputaciones_*.csv'
+
+CREAR_TABLA_CASILLAS = f"""
+    CREATE TABLE IF NOT EXISTS casillas_raspadas (
+        distrito VARCHAR(150) NOT NULL,
+        seccion VARCHAR(50) NOT NULL,
+        casilla VARCHAR(100) NOT NULL,
+        {', '.join(f'{columna} INTEGER' for columna in lista_partidos + lista2)},
+        raspado_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (distrito, seccion, casilla)
+    ) WITHOUT ROWID
+"""
+
+
+def conectar_almacen(ruta=RUTA_ALMACEN):
+    """Conexión al almacén; WAL para que varios workers escriban sin bloquearse al leer"""
+    conn = sqlite3.connect(ruta, timeout=30)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute(CREAR_TABLA_CASILLAS)
+    return conn
+
+
+def casillas_guardadas(conn):
+    """Índice de casillas completas {(distrito, sección, casilla)}"""
+    return set(conn.execute("SELECT distrito, seccion, casilla FROM casillas_raspadas"))
+
+
+def guardar_filas(conn, filas):
+    """Guardar (o reemplazar) filas con el esquema de armar_fila en una sola transacción"""
+    if not len(filas):
+        return 0
+
+    df = pd.DataFrame(filas, columns=COLUMNAS_FILA).rename(columns={'sección': 'seccion'})
+    for columna in lista_partidos + lista2:
+        df[columna] = limpiar_votos(df[columna])
+
+    columnas = list(df.columns)
+    with conn:
+        conn.executemany(
+            f"INSERT OR REPLACE INTO casillas_raspadas ({', '.join(columnas)}) "
+            f"VALUES ({', '.join('?' * len(columnas))})",
+            df.astype(object).itertuples(index=False, name=None)
+        )
+    return len(df)
+
+
+def compactar(ruta_almacen=RUTA_ALMACEN, patron=PATRON_CSV_CASILLA, borrar=False):
+    """Integrar al almacén los CSV por casilla (las columnas de votos se toman por posición)"""
+    archivos = sorted(glob.glob(patron))
+    if not archivos:
+        print("📂 No hay CSV por casilla para compactar")
+        return 0
+
+    # Los CSV más viejos nombran a los partidos p1..p16: se alinean por posición con COLUMNAS_FILA
+    filas = pd.concat(
+        [pd.read_csv(archivo, dtype=str, header=0, names=COLUMNAS_FILA) for archivo in archivos],
+        ignore_index=True
+    )
+
+    conn = conectar_almacen(ruta_almacen)
+    try:
+        guardadas = guardar_filas(conn, filas)
+        total = conn.execute("SELECT COUNT(*) FROM casillas_raspadas").fetchone()[0]
+    finally:
+        conn.close()
+
+    print(f"✅ {guardadas} casillas de {len(archivos)} CSV integradas en {ruta_almacen} ({total} en total)")
+
+    if borrar:
+        for archivo in archivos:
+            os.remove(archivo)
+        print(f"🗑️ {len(archivos)} CSV por casilla eliminados")
+
+    return guardadas
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Almacén consolidado de casillas raspadas")
+    subcomandos = parser.add_subparsers(dest='comando', required=True)
+    compactar_parser = subcomandos.add_parser('compactar', help="Integrar los CSV por casilla al almacén")
+    compactar_parser.add_argument('--borrar', action='store_true', help="Borrar los CSV ya integrados")
+    compactar_parser.add_argument('--almacen', default=RUTA_ALMACEN)
+    args = parser.parse_args()
+
+    compactar(args.almacen, borrar=args.borrar)
@@ -0,0 +1,225 @@
+"""Carga a nivel casilla del cómputo de diputaciones federales 2021 (formato largo)
+
+diputados_federales_nl_2021.csv trae una fila por casilla con una columna por
+partido y coalición. Se carga en la base 2021 como un esquema estrella:
+
+    distritos_federales   distrito_id -> nombre
+    secciones_federales   (distrito_id, seccion); la sección 0 (prisión preventiva) se repite por distrito
+    partidos              dimensión de partidos (partidos.py), con los mismos ids en 2021 y 2024
+    casillas_federales    una fila por casilla: claves, tipo, nulos, no registrados, total y lista nominal
+    votos_casilla         hecho casilla x partido con distrito_id y seccion, indexado por (distrito_id, seccion)
+
+Así los dashboards agregan de casilla a sección y distrito con GROUP BY en SQL;
+las sumas por nivel quedan precalculadas en el cubo (tablas_derivadas.CUBO).
+La carga es idempotente: si el CSV no cambió (manifiesto_ingesta) no se vuelve a leer.
+
+Uso:
+    python casillas_federales.py
+    python casillas_federales.py --archivo otro_computo.csv
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+import base_datos
+from ingesta import (CREAR_TABLA_MANIFIESTO, GUARDAR_MANIFIESTO, hash_archivo, modo_carga_masiva,
+                     reemplazar_tablas)
+from partidos import ID_PARTIDO, sincronizar_catalogo
+from tablas_derivadas import actualizar_tablas_derivadas
+
+AÑO = '2021'
+ARCHIVO_CASILLAS = 'diputados_federales_nl_2021.csv'
+TIPO_ELECCION = 'DIPUTADO_FEDERAL'
+
+# Columnas de votos por partido o coalición, en el orden del cómputo
+PARTIDOS_CASILLA = [
+    'PAN', 'PRI', 'PRD', 'PVEM', 'PT', 'MC', 'MORENA', 'PES', 'RSP', 'FXM', 'CI',
+    'PAN-PRI-PRD', 'PAN-PRI', 'PAN-PRD', 'PRI-PRD',
+    'PVEM-PT-MORENA', 'PVEM-PT', 'PVEM-MORENA', 'PT-MORENA',
+]
+
+# Columna del CSV -> columna de casillas_federales
+COLUMNAS_CASILLA = {
+    'casilla_id': 'registro',
+    'anno': 'anno',
+    'CLAVE_CASILLA': 'clave_casilla',
+    'CLAVE_ACTA': 'clave_acta',
+    'ID_DISTRITO': 'distrito_id',
+    'SECCION': 'seccion',
+    'ID_CASILLA': 'id_casilla',
+    'TIPO_CASILLA': 'tipo_casilla',
+    'EXT_CONTIGUA': 'ext_contigua',
+    'CASILLA': 'ubicacion',
+    'NUM_ACTA_IMPRESO': 'num_acta_impreso',
+    'CANDIDATO/A NO REGISTRADO/A': 'no_registrados',
+    'VOTOS NULOS': 'votos_nulos',
+    'TOTAL_VOTOS_CALCULADOS': 'total_votos',
+    'LISTA_NOMINAL_CASILLA': 'lista_nominal',
+    'OBSERVACIONES': 'observaciones',
+    'MECANISMOS_TRASLADO': 'mecanismos_traslado',
+    'FECHA_HORA': 'fecha_hora',
+}
+
+ESQUEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS distritos_federales (
+        distrito_id INTEGER PRIMARY KEY,
+        nombre VARCHAR(150) NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS secciones_federales (
+        distrito_id INTEGER NOT NULL,
+        seccion INTEGER NOT NULL,
+        PRIMARY KEY (distrito_id, seccion)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS casillas_federales (
+        casilla_id INTEGER PRIMARY KEY,
+        registro VARCHAR(100) UNIQUE NOT NULL,
+        anno INTEGER NOT NULL,
+        clave_casilla VARCHAR(20) NOT NULL,
+        clave_acta VARCHAR(30),
+        distrito_id INTEGER NOT NULL,
+        seccion INTEGER NOT NULL,
+        id_casilla INTEGER,
+        tipo_casilla VARCHAR(1),
+        ext_contigua INTEGER,
+        ubicacion VARCHAR(20),
+        num_acta_impreso VARCHAR(10),
+        no_registrados INTEGER NOT NULL,
+        votos_nulos INTEGER NOT NULL,
+        total_votos INTEGER NOT NULL,
+        lista_nominal INTEGER NOT NULL,
+        observaciones VARCHAR(100),
+        mecanismos_traslado VARCHAR(20),
+        fecha_hora VARCHAR(20)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_casillas_federales_distrito_seccion "
+    "ON casillas_federales(distrito_id, seccion)",
+    """
+    CREATE TABLE IF NOT EXISTS votos_casilla (
+        casilla_id INTEGER NOT NULL,
+        partido_id INTEGER NOT NULL,
+        distrito_id INTEGER NOT NULL,
+        seccion INTEGER NOT NULL,
+        votos INTEGER NOT NULL,
+        PRIMARY KEY (casilla_id, partido_id)
+    ) WITHOUT ROWID
+    """,
+    # Agregaciones por distrito/sección (y partido) resueltas solo con el índice
+    "CREATE INDEX IF NOT EXISTS idx_votos_casilla_distrito_seccion "
+    "ON votos_casilla(distrito_id, seccion, partido_id, votos)",
+]
+
+
+def crear_esquema(conn):
+    with conn:
+        for sentencia in ESQUEMA:
+            conn.execute(sentencia)
+        sincronizar_catalogo(conn)
+
+
+def preparar_casillas(df):
+    """Tablas de dimensiones y de casillas a partir del CSV en formato ancho"""
+    faltantes = [columna for columna in PARTIDOS_CASILLA + list(COLUMNAS_CASILLA) if columna not in df.columns]
+    if faltantes:
+        raise ValueError(f"Columnas faltantes en el cómputo por casilla: {faltantes}")
+
+    casillas = df[list(COLUMNAS_CASILLA)].rename(columns=COLUMNAS_CASILLA)
+    # DPFED-00001-<hash> -> 1: id entero estable de la casilla
+    casillas.insert(0, 'casilla_id', casillas['registro'].str.split('-').str[1].astype('int64'))
+    casillas['clave_casilla'] = casillas['clave_casilla'].str.strip("'")
+
+    distritos = (
+        df[['ID_DISTRITO', 'NOMBRE_DISTRITO']].drop_duplicates('ID_DISTRITO')
+        .set_axis(['distrito_id', 'nombre'], axis=1).sort_values('distrito_id')
+    )
+    secciones = casillas[['distrito_id', 'seccion']].drop_duplicates().sort_values(['distrito_id', 'seccion'])
+    return distritos, secciones, casillas
+
+
+def derretir_votos(df, casillas):
+    """Hecho casilla x partido: una fila por cada celda de votos del formato ancho"""
+    votos = df[PARTIDOS_CASILLA].to_numpy(dtype='int64')
+    filas, partidos = votos.shape
+
+    return pd.DataFrame({
+        'casilla_id': np.repeat(casillas['casilla_id'].to_numpy(), partidos),
+        'partido_id': np.tile([ID_PARTIDO[partido] for partido in PARTIDOS_CASILLA], filas),
+        'distrito_id': np.repeat(casillas['distrito_id'].to_numpy(), partidos),
+        'seccion': np.repeat(casillas['seccion'].to_numpy(), partidos),
+        'votos': votos.ravel(),
+    })
+
+
+def _verificar_totales(casillas, votos):
+    """Avisar de casillas cuyo total calculado no cuadra con la suma de votos"""
+    por_casilla = votos.groupby('casilla_id')['votos'].sum().reindex(casillas['casilla_id']).to_numpy()
+    suma = por_casilla + casillas['no_registrados'].to_numpy() + casillas['votos_nulos'].to_numpy()
+    descuadradas = int((suma != casillas['total_votos'].to_numpy()).sum())
+    if descuadradas:
+        print(f"⚠️ {descuadradas} casillas con TOTAL_VOTOS_CALCULADOS distinto de la suma de votos")
+
+
+def cargar_casillas_federales(archivo=ARCHIVO_CASILLAS, año=AÑO):
+    """Cargar el cómputo por casilla si cambió desde la última carga"""
+    if not os.path.exists(archivo):
+        print(f"⚠️ Archivo {archivo} no encontrado")
+        return 0
+
+    conn = base_datos.conectar_escritura(año)
+    try:
+        crear_esquema(conn)
+        conn.execute(CREAR_TABLA_MANIFIESTO)
+
+        estado = os.stat(archivo)
+        huella = hash_archivo(archivo)
+        guardado = conn.execute(
+            "SELECT hash_contenido FROM manifiesto_ingesta WHERE archivo = ?", (archivo,)
+        ).fetchone()
+        if guardado and guardado[0] == huella:
+            print(f"⏭️ {archivo}: sin cambios")
+            return 0
+
+        inicio = time.perf_counter()
+        df = pd.read_csv(archivo)
+        distritos, secciones, casillas = preparar_casillas(df)
+        votos = derretir_votos(df, casillas)
+        _verificar_totales(casillas, votos)
+
+        with modo_carga_masiva(conn):
+            reemplazar_tablas(conn, {
+                'distritos_federales': distritos,
+                'secciones_federales': secciones,
+                'casillas_federales': casillas,
+                'votos_casilla': votos,
+            })
+            with conn:
+                conn.execute(GUARDAR_MANIFIESTO, (archivo, TIPO_ELECCION, estado.st_size, estado.st_mtime,
+                                                  huella, len(df)))
+        conn.execute("ANALYZE")
+
+        segundos = time.perf_counter() - inicio
+        print(f"✅ {archivo}: {len(casillas):,} casillas, {len(votos):,} votos casilla x partido "
+              f"en {segundos:.2f} s ({len(votos) / max(segundos, 1e-9):,.0f} filas/s)")
+    finally:
+        conn.close()
+
+    base_datos.limpiar_cache(año)
+    return len(votos)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Cargar el cómputo federal 2021 por casilla en formato largo")
+    parser.add_argument('--archivo', default=ARCHIVO_CASILLAS)
+    args = parser.parse_args()
+
+    cargar_casillas_federales(args.archivo)
+    # Cubo por sección/distrito/estado (solo se recalcula si cambiaron las casillas)
+    actualizar_tablas_derivadas(AÑO)
@@ -0,0 +1,88 @@
+"""Distribución de los votos de coalición entre los partidos que la integran
+
+Los votos marcados para una combinación de coalición (PAN-PRI-PRD, PT-MORENA...)
+se reparten en partes iguales entre sus partidos; el residuo (los votos que no
+alcanzan para una parte igual) se asigna de uno en uno a los partidos de la
+coalición con más votos propios en la casilla. Los empates se resuelven por el
+orden de los partidos en la boleta.
+
+Todo se calcula como operaciones de matrices: (casilla x coalición) -> (casilla x partido).
+Los integrantes de cada coalición vienen de la dimensión de partidos (partidos.py).
+"""
+import numpy as np
+import pandas as pd
+
+
+def matriz_membresia(partidos, coaliciones, miembros):
+    """Matriz (coalición x partido) con 1 donde el partido integra la coalición
+
+    `miembros` es {coalición: [partido, ...]}, con las mismas claves que `partidos`
+    y `coaliciones` (siglas o partido_id).
+    """
+    posicion = {partido: i for i, partido in enumerate(partidos)}
+    membresia = np.zeros((len(coaliciones), len(partidos)), dtype='int64')
+    for fila, coalicion in enumerate(coaliciones):
+        faltantes = [miembro for miembro in miembros[coalicion] if miembro not in posicion]
+        if faltantes:
+            raise ValueError(f"La coalición {coalicion} incluye partidos sin columna de votos: {faltantes}")
+        membresia[fila, [posicion[miembro] for miembro in miembros[coalicion]]] = 1
+    return membresia
+
+
+def distribuir_coaliciones(votos_partidos, votos_coaliciones, membresia):
+    """Votos de coalición asignados a cada partido, matriz (casilla x partido)
+
+    votos_partidos es (casilla x partido), votos_coaliciones (casilla x coalición)
+    y membresia (coalición x partido), de matriz_membresia.
+    """
+    votos_partidos = np.asarray(votos_partidos, dtype='int64')
+    votos_coaliciones = np.asarray(votos_coaliciones, dtype='int64')
+    membresia = np.asarray(membresia, dtype='int64')
+
+    integrantes = membresia.sum(axis=1)
+    partes_iguales = votos_coaliciones // integrantes
+    residuo = votos_coaliciones % integrantes
+
+    # Parte igual para cada integrante de cada coalición
+    asignados = partes_iguales @ membresia
+
+    # Lugar de cada partido dentro de su coalición en cada casilla (0 = más votos propios)
+    for coalicion in np.flatnonzero(residuo.any(axis=0)):
+        columnas = np.flatnonzero(membresia[coalicion])
+        orden = np.argsort(-votos_partidos[:, columnas], axis=1, kind='stable')
+        lugar = np.empty_like(orden)
+        np.put_along_axis(lugar, orden, np.arange(len(columnas)), axis=1)
+        asignados[:, columnas] += lugar < residuo[:, [coalicion]]
+
+    return asignados
+
+
+def distribuir_votos_casilla(votos, miembros):
+    """Votos por casilla y partido con las coaliciones ya repartidas (formato largo)
+
+    `votos` tiene casilla_id, partido_id, distrito_id, seccion y votos (votos_casilla);
+    `miembros` es {coalicion_id: [partido_id, ...]} (partidos.miembros_coaliciones).
+    Devuelve una fila por casilla y partido (sin coaliciones) con votos_propios, votos_coalicion y votos (la suma).
+    """
+    casillas, fila = np.unique(votos['casilla_id'].to_numpy(), return_inverse=True)
+    ids, columna = np.unique(votos['partido_id'].to_numpy(), return_inverse=True)
+    matriz = np.zeros((len(casillas), len(ids)), dtype='int64')
+    matriz[fila, columna] = votos['votos'].to_numpy()
+
+    es_coalicion = np.isin(ids, list(miembros))
+    partidos, coaliciones = ids[~es_coalicion], ids[es_coalicion]
+    membresia = matriz_membresia(partidos.tolist(), coaliciones.tolist(), miembros)
+
+    propios = matriz[:, ~es_coalicion]
+    de_coalicion = distribuir_coaliciones(propios, matriz[:, es_coalicion], membresia)
+
+    geografia = votos.drop_duplicates('casilla_id').set_index('casilla_id').loc[casillas]
+    return pd.DataFrame({
+        'casilla_id': np.repeat(casillas, len(partidos)),
+        'partido_id': np.tile(partidos, len(casillas)),
+        'distrito_id': np.repeat(geografia['distrito_id'].to_numpy(), len(partidos)),
+        'seccion': np.repeat(geografia['seccion'].to_numpy(), len(partidos)),
+        'votos_propios': propios.ravel(),
+        'votos_coalicion': de_coalicion.ravel(),
+        'votos': (propios + de_coalicion).ravel(),
+    })
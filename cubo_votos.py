@@ -0,0 +1,108 @@
+"""Lectura del cubo de votos por casilla (diputaciones federales 2021)
+
+Cada nivel (estado, distrito, sección) se lee de su tabla precalculada en
+tablas_derivadas.py, filtrando por el nivel superior: el drill-down cuesta lo
+que mide el nivel pedido, nunca se vuelven a sumar las casillas.
+"""
+import base_datos
+from participacion import COLUMNAS_PARTICIPACION, indicadores_participacion
+from tablas_derivadas import CUBO, tablas_pendientes
+
+AÑO_CUBO = '2021'
+
+# nivel -> columnas de la clave (de mayor a menor)
+NIVELES_CUBO = {
+    'estado': [],
+    'distrito': ['distrito_id'],
+    'seccion': ['distrito_id', 'seccion'],
+}
+
+
+def cubo_disponible(año=AÑO_CUBO):
+    """True si el cubo está construido en la versión actual y tiene casillas"""
+    if tablas_pendientes(año, list(CUBO) + ['votos_casilla_distribuidos']):
+        return False
+    return not base_datos.consultar(año, "SELECT 1 FROM cubo_totales_estado LIMIT 1").empty
+
+
+def _filtro(nivel, distrito_id):
+    if distrito_id is None or 'distrito_id' not in NIVELES_CUBO[nivel]:
+        return '', ()
+    return 'WHERE t.distrito_id = ?', (int(distrito_id),)
+
+
+def votos_por_partido(nivel, distrito_id=None, distribuidos=False, año=AÑO_CUBO):
+    """Votos por partido en cada división del nivel (una fila por división y partido)
+
+    Con distribuidos=True los votos de coalición ya están repartidos entre sus
+    partidos (coaliciones.py) y se agregan votos_propios y votos_coalicion.
+    """
+    where, params = _filtro(nivel, distrito_id)
+    claves = ''.join(f't.{columna}, ' for columna in NIVELES_CUBO[nivel])
+    tabla, columnas = (
+        (f'cubo_distribuidos_{nivel}', 't.votos_propios, t.votos_coalicion, ') if distribuidos
+        else (f'cubo_votos_{nivel}', '')
+    )
+    return base_datos.consultar(año, f"""
+        SELECT {claves}p.siglas as partido, p.es_coalicion, {columnas}t.votos
+        FROM {tabla} t
+        JOIN partidos p ON p.partido_id = t.partido_id
+        {where}
+        ORDER BY {claves}t.votos DESC
+    """, params)
+
+
+def primeros_lugares(nivel, distrito_id=None, año=AÑO_CUBO):
+    """Partido con más votos (coaliciones repartidas) y su margen sobre el segundo en cada división"""
+    where, params = _filtro(nivel, distrito_id)
+    claves = NIVELES_CUBO[nivel]
+    particion = f"PARTITION BY {', '.join(f't.{c}' for c in claves)} " if claves else ''
+    return base_datos.consultar(año, f"""
+        WITH lugares AS (
+            SELECT {''.join(f't.{c}, ' for c in claves)}p.siglas as partido, t.votos,
+                ROW_NUMBER() OVER ({particion}ORDER BY t.votos DESC, t.partido_id) as lugar,
+                t.votos - LEAD(t.votos) OVER ({particion}ORDER BY t.votos DESC, t.partido_id) as margen
+            FROM cubo_distribuidos_{nivel} t
+            JOIN partidos p ON p.partido_id = t.partido_id
+            {where}
+        )
+        SELECT {''.join(f'{c}, ' for c in claves)}partido as primer_lugar, votos as votos_primer_lugar, margen
+        FROM lugares
+        WHERE lugar = 1
+    """, params)
+
+
+def totales(nivel, distrito_id=None, año=AÑO_CUBO):
+    """Casillas, votos, nulos, lista nominal y participación de cada división del nivel"""
+    where, params = _filtro(nivel, distrito_id)
+    nombre = ', d.nombre' if 'distrito_id' in NIVELES_CUBO[nivel] else ''
+    union = 'JOIN distritos_federales d ON d.distrito_id = t.distrito_id' if nombre else ''
+    orden = f"ORDER BY {', '.join(f't.{columna}' for columna in NIVELES_CUBO[nivel])}" if nombre else ''
+    return base_datos.consultar(año, f"""
+        SELECT t.*{nombre}
+        FROM cubo_totales_{nivel} t
+        {union}
+        {where}
+        {orden}
+    """, params)
+
+
+def casillas(distrito_id, seccion, año=AÑO_CUBO):
+    """Casillas de una sección con su participación, tasa de nulos y abstención"""
+    df = base_datos.consultar(año, """
+        SELECT casilla_id, clave_casilla, tipo_casilla, distrito_id, seccion,
+               total_votos, votos_nulos, lista_nominal
+        FROM casillas_federales
+        WHERE distrito_id = ? AND seccion = ?
+        ORDER BY clave_casilla
+    """, (int(distrito_id), int(seccion)))
+    for columna, valores in zip(COLUMNAS_PARTICIPACION, indicadores_participacion(
+            df['total_votos'], df['votos_nulos'], df['lista_nominal'])):
+        df[columna] = valores
+    return df
+
+
+def distritos(año=AÑO_CUBO):
+    """Distritos federales {distrito_id: nombre} para los selectores del drill-down"""
+    df = base_datos.consultar(año, "SELECT distrito_id, nombre FROM distritos_federales ORDER BY distrito_id")
+    return dict(df.itertuples(index=False, name=None))
@@ -0,0 +1,124 @@
+"""Migraciones de esquema versionadas con PRAGMA user_version
+
+Uso:
+    python esquema.py          # aplica las migraciones pendientes a todas las bases
+"""
+import sqlite3
+
+import pandas as pd
+
+import base_datos
+from ingesta import caracteristicas_nombre
+from partidos import identificar_partidos, sincronizar_catalogo
+
+
+def _agregar_caracteristicas_nombre(conn):
+    """Columnas longitud_nombre y cantidad_palabras, calculadas para las filas existentes"""
+    columnas = {fila[1] for fila in conn.execute("PRAGMA table_info(resultados_electorales)")}
+    for columna in ('longitud_nombre', 'cantidad_palabras'):
+        if columna not in columnas:
+            conn.execute(f"ALTER TABLE resultados_electorales ADD COLUMN {columna} INTEGER")
+
+    filas = pd.read_sql_query("SELECT id, nombre_candidato FROM resultados_electorales", conn)
+    longitud, palabras = caracteristicas_nombre(filas['nombre_candidato'])
+    conn.executemany(
+        "UPDATE resultados_electorales SET longitud_nombre = ?, cantidad_palabras = ? WHERE id = ?",
+        zip(longitud.tolist(), palabras.tolist(), filas['id'].tolist())
+    )
+
+
+def _agregar_partido_id(conn):
+    """Dimensión de partidos y columna partido_id, resuelta para las filas existentes"""
+    sincronizar_catalogo(conn)
+
+    columnas = {fila[1] for fila in conn.execute("PRAGMA table_info(resultados_electorales)")}
+    if 'partido_id' not in columnas:
+        conn.execute("ALTER TABLE resultados_electorales ADD COLUMN partido_id INTEGER")
+
+    filas = pd.read_sql_query("SELECT id, anno, partido_ci FROM resultados_electorales", conn)
+    partido_id = identificar_partidos(filas['partido_ci'], filas['anno'])
+    conn.executemany(
+        "UPDATE resultados_electorales SET partido_id = ? WHERE id = ?",
+        zip(partido_id.tolist(), filas['id'].tolist())
+    )
+
+
+# (versión, descripción, sentencias). Solo se agregan al final, nunca se modifican.
+# Una sentencia puede ser SQL o una función que recibe la conexión.
+MIGRACIONES = [
+    (1, 'Índices compuestos para las consultas de los dashboards', [
+        # Filtro por tipo + orden por votos (listados por tipo de elección)
+        "CREATE INDEX IF NOT EXISTS idx_tipo_votos ON resultados_electorales(tipo_eleccion, numero_de_votos DESC)",
+        # Filtro por tipo + partido ordenado por votos (datos de MC)
+        "CREATE INDEX IF NOT EXISTS idx_tipo_partido_votos "
+        "ON resultados_electorales(tipo_eleccion, partido_ci, numero_de_votos DESC)",
+        # Filtro por tipo + partido agrupado por división (votos de MC por división), cubriente
+        "CREATE INDEX IF NOT EXISTS idx_tipo_partido_division_votos "
+        "ON resultados_electorales(tipo_eleccion, partido_ci, division_territorial, numero_de_votos)",
+        # Ranking por división (ganadores, firmas y totales por división)
+        "CREATE INDEX IF NOT EXISTS idx_tipo_division_votos "
+        "ON resultados_electorales(tipo_eleccion, division_territorial, numero_de_votos DESC, partido_ci)",
+        # Top N global por votos
+        "CREATE INDEX IF NOT EXISTS idx_votos ON resultados_electorales(numero_de_votos DESC)",
+        # idx_tipo_eleccion queda cubierto por los índices compuestos
+        "DROP INDEX IF EXISTS idx_tipo_eleccion",
+        "ANALYZE",
+    ]),
+    (2, 'Características del nombre precalculadas para el análisis avanzado', [
+        _agregar_caracteristicas_nombre,
+    ]),
+    (3, 'Dimensión de partidos compartida entre años y partido_id en cada resultado', [
+        _agregar_partido_id,
+        # Mismos filtros que los índices por partido_ci, sobre el id del catálogo
+        "CREATE INDEX IF NOT EXISTS idx_tipo_partido_id_votos "
+        "ON resultados_electorales(tipo_eleccion, partido_id, numero_de_votos DESC)",
+        "CREATE INDEX IF NOT EXISTS idx_tipo_partido_id_division_votos "
+        "ON resultados_electorales(tipo_eleccion, partido_id, division_territorial, numero_de_votos)",
+        "ANALYZE",
+    ]),
+]
+
+
+def version_esquema(conn):
+    """Versión de esquema registrada en la base"""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrar(conn):
+    """Aplicar en orden las migraciones pendientes"""
+    version_actual = version_esquema(conn)
+    aplicadas = []
+
+    for version, descripcion, sentencias in MIGRACIONES:
+        if version <= version_actual:
+            continue
+        with conn:
+            for sentencia in sentencias:
+                if callable(sentencia):
+                    sentencia(conn)
+                else:
+                    conn.execute(sentencia)
+            conn.execute(f"PRAGMA user_version = {version}")
+        aplicadas.append((version, descripcion))
+
+    return aplicadas
+
+
+def migrar_base(año):
+    """Migrar la base de datos de un año"""
+    conn = sqlite3.connect(base_datos.ruta_db(año))
+    try:
+        aplicadas = migrar(conn)
+    finally:
+        conn.close()
+
+    for version, descripcion in aplicadas:
+        print(f"🔧 {año}: migración {version} aplicada - {descripcion}")
+    if not aplicadas:
+        print(f"✅ {año}: esquema al día")
+    base_datos.limpiar_cache(año)
+
+
+if __name__ == '__main__':
+    for año in base_datos.BASES_DATOS:
+        migrar_base(año)
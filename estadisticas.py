@@ -0,0 +1,39 @@
+"""Métricas generales de una elección (registros, candidatos, votos, partidos y divisiones)
+
+Se leen de la tabla derivada estadisticas_generales, calculada en un solo
+recorrido durante la carga (tablas_derivadas.py), a través del cache de
+base_datos. Si la tabla todavía no existe se calcula al vuelo con la misma
+consulta, sin escribir en la base.
+"""
+import base_datos
+from tablas_derivadas import consulta_estadisticas, tablas_pendientes
+
+COLUMNAS_DETALLE = ['tipo_eleccion', 'registros', 'candidatos_unicos', 'total_votos',
+                    'partidos_unicos', 'divisiones_unicas']
+
+
+def estadisticas_generales(año, fuente='corregido'):
+    """Totales y detalle por tipo de elección de un año
+
+    fuente='corregido' cuenta a gobernador desde gobernador_corregido (un
+    registro por candidato); 'original' usa resultados_electorales tal cual.
+    """
+    if tablas_pendientes(año, ['estadisticas_generales']):
+        consulta, params = consulta_estadisticas(fuente), None
+    else:
+        consulta = "SELECT * FROM estadisticas_generales WHERE fuente = ?"
+        params = (fuente,)
+
+    metricas = base_datos.consultar(año, consulta, params).set_index('tipo_eleccion')
+    total = metricas.loc['TOTAL']
+    detalle = metricas.drop(index='TOTAL').reset_index()[COLUMNAS_DETALLE]
+
+    return {
+        'total_registros': int(total['registros']),
+        'total_candidatos': int(total['candidatos_unicos']),
+        'total_votos': int(total['total_votos']),
+        'partidos_unicos': int(total['partidos_unicos']),
+        'divisiones_unicas': int(total['divisiones_unicas']),
+        'tipos_eleccion': len(detalle),
+        'detalle_por_tipo': detalle
+    }
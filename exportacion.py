@@ -0,0 +1,130 @@
+"""Exportación de consultas a archivo, leyendo SQLite por bloques
+
+Los archivos se generan solo cuando se piden, se escriben en disco bloque por
+bloque (sin armar el DataFrame completo ni el CSV en memoria) y quedan en cache
+por (base, consulta, parámetros, formato) mientras la base no cambie
+(base_datos.version_datos).
+"""
+import gzip
+import hashlib
+import io
+import json
+import os
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import base_datos
+from snapshots import codificar_diccionarios
+
+TAMAÑO_BLOQUE = 50_000
+DIRECTORIO_CACHE = Path(tempfile.gettempdir()) / 'exportaciones_electorales'
+MAX_ARCHIVOS_CACHE = 32
+
+# formato -> (extensión, tipo MIME, etiqueta)
+FORMATOS = {
+    'csv': ('csv', 'text/csv', 'CSV'),
+    'csv.gz': ('csv.gz', 'application/gzip', 'CSV comprimido (gzip)'),
+    'parquet': ('parquet', 'application/vnd.apache.parquet', 'Parquet'),
+}
+
+
+def nombre_archivo(nombre_base, formato):
+    return f"{nombre_base}.{FORMATOS[formato][0]}"
+
+
+def _escribir_csv(bloques, salida):
+    encabezado = True
+    for bloque in bloques:
+        bloque.to_csv(salida, index=False, header=encabezado)
+        encabezado = False
+
+
+def _escribir_parquet(bloques, ruta):
+    escritor = None
+    try:
+        for bloque in bloques:
+            tabla = codificar_diccionarios(pa.Table.from_pandas(bloque, preserve_index=False))
+            if escritor is None:
+                escritor = pq.ParquetWriter(ruta, tabla.schema, compression='zstd')
+            else:
+                tabla = tabla.cast(escritor.schema)
+            escritor.write_table(tabla)
+    finally:
+        if escritor is not None:
+            escritor.close()
+
+
+def escribir_bloques(bloques, ruta, formato):
+    """Escribir un iterable de DataFrames en `ruta` con el formato indicado"""
+    if formato == 'csv':
+        with open(ruta, 'w', encoding='utf-8', newline='') as salida:
+            _escribir_csv(bloques, salida)
+    elif formato == 'csv.gz':
+        with gzip.open(ruta, 'wt', encoding='utf-8', newline='', compresslevel=6) as salida:
+            _escribir_csv(bloques, salida)
+    elif formato == 'parquet':
+        _escribir_parquet(bloques, ruta)
+    else:
+        raise ValueError(f"Formato de exportación no soportado: {formato}")
+
+
+def _clave_cache(año, consulta, params, formato):
+    # Los parámetros nombrados (dict) se guardan con sus valores; list(dict) dejaría solo las llaves
+    if params is not None and not isinstance(params, dict):
+        params = list(params)
+    contenido = json.dumps(
+        [str(Path(base_datos.ruta_db(año)).resolve()), base_datos.version_datos(año), consulta, params, formato],
+        default=str, sort_keys=True
+    )
+    return hashlib.sha256(contenido.encode('utf-8')).hexdigest()[:32]
+
+
+def _podar_cache():
+    """Conservar solo los archivos usados más recientemente"""
+    archivos = sorted(DIRECTORIO_CACHE.glob('*.export'), key=lambda a: a.stat().st_mtime, reverse=True)
+    for archivo in archivos[MAX_ARCHIVOS_CACHE:]:
+        archivo.unlink(missing_ok=True)
+
+
+def exportar_consulta(año, consulta, params=None, formato='csv'):
+    """Ruta del archivo con el resultado de la consulta; se genera solo si no está en cache"""
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato de exportación no soportado: {formato}")
+
+    DIRECTORIO_CACHE.mkdir(parents=True, exist_ok=True)
+    ruta = DIRECTORIO_CACHE / f"{_clave_cache(año, consulta, params, formato)}.export"
+    if ruta.exists():
+        os.utime(ruta)
+        return ruta
+
+    # Se escribe a un temporal y se renombra: una exportación a medias nunca queda en cache
+    temporal = ruta.with_suffix(f'.{os.getpid()}.tmp')
+    try:
+        with base_datos.conectar(año) as conn:
+            bloques = pd.read_sql_query(consulta, conn, params=params, chunksize=TAMAÑO_BLOQUE)
+            escribir_bloques(bloques, temporal, formato)
+        os.replace(temporal, ruta)
+    finally:
+        temporal.unlink(missing_ok=True)
+
+    _podar_cache()
+    return ruta
+
+
+def exportar_dataframe(df, formato='csv'):
+    """Bytes de un DataFrame pequeño ya calculado (resúmenes y estadísticas)"""
+    buffer = io.BytesIO()
+    if formato == 'csv':
+        buffer.write(df.to_csv(index=False).encode('utf-8'))
+    elif formato == 'csv.gz':
+        with gzip.GzipFile(fileobj=buffer, mode='wb') as salida:
+            salida.write(df.to_csv(index=False).encode('utf-8'))
+    elif formato == 'parquet':
+        df.to_parquet(buffer, index=False)
+    else:
+        raise ValueError(f"Formato de exportación no soportado: {formato}")
+    return buffer.getvalue()
@@ -0,0 +1,254 @@
+"""Carga masiva de CSV de resultados a SQLite
+
+Limpia los votos con operaciones vectorizadas e inserta en lotes con executemany,
+con los PRAGMA ajustados para carga masiva (modo_carga_masiva).
+
+sincronizar_archivos es la ingesta de main.py: registra la huella de cada CSV
+(tamaño, mtime y hash del contenido) en manifiesto_ingesta y solo vuelve a
+procesar los archivos que cambiaron, con upsert por la clave del registro.
+"""
+import hashlib
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from partidos import identificar_partidos, sincronizar_catalogo
+
+TAMAÑO_LOTE = 50_000
+
+# Nombre de la columna de división en cada archivo fuente
+COLUMNAS_DIVISION = ['municipio', 'distrito', 'nombre_distrito']
+
+# Solo enteros (con o sin comas de miles); cualquier otro texto cuenta como 0
+PATRON_ENTERO = r'[+-]?\d+'
+
+
+def limpiar_votos(votos):
+    """Convertir a entero valores como "1,132", "Registro cancelado" o NaN (estos dos valen 0)"""
+    if pd.api.types.is_numeric_dtype(votos):
+        return votos.fillna(0).astype('int64')
+
+    # Los votos se repiten mucho: se limpian solo los valores únicos y se expanden por código
+    codigos, unicos = pd.factorize(votos)
+    texto = pd.Series(unicos, dtype=object).astype(str).str.replace(',', '', regex=False).str.strip()
+    enteros = pd.to_numeric(texto.where(texto.str.fullmatch(PATRON_ENTERO)), errors='coerce')
+    limpios = np.append(enteros.fillna(0).to_numpy(dtype='int64'), 0)  # código -1 (NaN) -> 0
+
+    return pd.Series(limpios[codigos], index=votos.index, name=votos.name)
+
+
+def caracteristicas_nombre(nombres):
+    """Longitud y cantidad de palabras de cada nombre (se guardan en la carga para el análisis)
+
+    Nombres vacíos o nulos: longitud 0 y una palabra, como en el análisis avanzado.
+    """
+    codigos, unicos = pd.factorize(nombres)
+    unicos = pd.Series(unicos, dtype=object)
+    longitud = np.append(unicos.str.len().fillna(0).to_numpy(dtype='int64'), 0)  # código -1 (NaN)
+    palabras = np.append(unicos.str.split().str.len().fillna(1).to_numpy(dtype='int64'), 1)
+
+    return (pd.Series(longitud[codigos], index=nombres.index, name='longitud_nombre'),
+            pd.Series(palabras[codigos], index=nombres.index, name='cantidad_palabras'))
+
+
+def preparar_resultados(df, tipo_eleccion):
+    """Estandarizar columnas de un CSV al esquema de resultados_electorales"""
+    df = df.rename(columns={'PARTIDO_CI': 'partido_ci'})
+    for columna in COLUMNAS_DIVISION:
+        if columna in df.columns:
+            df = df.rename(columns={columna: 'division_territorial'})
+            break
+
+    df['numero_de_votos'] = limpiar_votos(df['numero_de_votos'])
+    df['longitud_nombre'], df['cantidad_palabras'] = caracteristicas_nombre(df['nombre_candidato'])
+    df['partido_id'] = identificar_partidos(df['partido_ci'], df['anno'])
+    df['tipo_eleccion'] = tipo_eleccion
+    return df
+
+
+@contextmanager
+def modo_carga_masiva(conn):
+    """PRAGMA para carga masiva; al terminar la base vuelve a un solo archivo"""
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    conn.execute("PRAGMA cache_size = -262144")  # 256 MB
+    try:
+        yield conn
+    finally:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.execute("PRAGMA journal_mode = DELETE")
+        conn.execute("PRAGMA synchronous = FULL")
+
+
+def _valores_nativos(columna):
+    """Lista de valores de Python (sqlite3 no acepta numpy.int64) con None en lugar de NaN"""
+    if pd.api.types.is_integer_dtype(columna) or pd.api.types.is_bool_dtype(columna) or not columna.hasnans:
+        return columna.tolist()
+    return columna.astype(object).where(columna.notna(), None).tolist()
+
+
+def _ejecutar_en_lotes(conn, sentencia, df, tamaño_lote):
+    """executemany por lotes sobre las columnas del DataFrame (sin manejar la transacción)"""
+    columnas = list(df.columns)
+    for inicio in range(0, len(df), tamaño_lote):
+        lote = df.iloc[inicio:inicio + tamaño_lote]
+        conn.executemany(sentencia, zip(*(_valores_nativos(lote[columna]) for columna in columnas)))
+
+
+def _sentencia_insertar(tabla, columnas):
+    return f"INSERT INTO {tabla} ({', '.join(columnas)}) VALUES ({', '.join('?' * len(columnas))})"
+
+
+def insertar_en_lotes(conn, tabla, df, tamaño_lote=TAMAÑO_LOTE):
+    """Insertar un DataFrame con executemany por lotes en una sola transacción"""
+    with conn:
+        _ejecutar_en_lotes(conn, _sentencia_insertar(tabla, df.columns), df, tamaño_lote)
+
+    return len(df)
+
+
+def reemplazar_tablas(conn, tablas, tamaño_lote=TAMAÑO_LOTE):
+    """Reemplazar el contenido de {tabla: DataFrame} en una sola transacción
+
+    Los dashboards ven las tablas completas de antes o de después, nunca a medias.
+    """
+    with conn:
+        for tabla in tablas:
+            conn.execute(f"DELETE FROM {tabla}")
+        for tabla, df in tablas.items():
+            _ejecutar_en_lotes(conn, _sentencia_insertar(tabla, df.columns), df, tamaño_lote)
+
+    return {tabla: len(df) for tabla, df in tablas.items()}
+
+
+CREAR_TABLA_MANIFIESTO = """
+    CREATE TABLE IF NOT EXISTS manifiesto_ingesta (
+        archivo TEXT PRIMARY KEY,
+        tipo_eleccion VARCHAR(20) NOT NULL,
+        tamaño INTEGER NOT NULL,
+        mtime REAL NOT NULL,
+        hash_contenido TEXT NOT NULL,
+        filas INTEGER NOT NULL,
+        cargado_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+GUARDAR_MANIFIESTO = """
+    INSERT INTO manifiesto_ingesta (archivo, tipo_eleccion, tamaño, mtime, hash_contenido, filas)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT(archivo) DO UPDATE SET
+        tipo_eleccion = excluded.tipo_eleccion,
+        tamaño = excluded.tamaño,
+        mtime = excluded.mtime,
+        hash_contenido = excluded.hash_contenido,
+        filas = excluded.filas,
+        cargado_at = CURRENT_TIMESTAMP
+"""
+
+
+def hash_archivo(archivo, tamaño_bloque=1 << 20):
+    """SHA-256 del contenido de un archivo, leído por bloques"""
+    hash_contenido = hashlib.sha256()
+    with open(archivo, 'rb') as f:
+        for bloque in iter(lambda: f.read(tamaño_bloque), b''):
+            hash_contenido.update(bloque)
+    return hash_contenido.hexdigest()
+
+
+def _sentencia_upsert(tabla, columnas, clave):
+    """INSERT ... ON CONFLICT(clave) que solo reescribe las filas cuyos valores cambiaron"""
+    actualizables = [columna for columna in columnas if columna != clave]
+    asignaciones = ', '.join(f"{columna} = excluded.{columna}" for columna in actualizables)
+    diferencias = ' OR '.join(f"{columna} IS NOT excluded.{columna}" for columna in actualizables)
+    return (
+        f"{_sentencia_insertar(tabla, columnas)} "
+        f"ON CONFLICT({clave}) DO UPDATE SET {asignaciones} WHERE {diferencias}"
+    )
+
+
+def _aplicar_archivo(conn, df, tipo_eleccion, clave, tamaño_lote):
+    """Upsert de un archivo y borrado de las claves de su tipo que ya no aparecen en él"""
+    cambios_antes = conn.total_changes
+    _ejecutar_en_lotes(conn, _sentencia_upsert('resultados_electorales', df.columns, clave), df, tamaño_lote)
+    modificadas = conn.total_changes - cambios_antes
+
+    conn.execute("DROP TABLE IF EXISTS temp.claves_archivo")
+    conn.execute("CREATE TEMP TABLE claves_archivo (clave TEXT PRIMARY KEY)")
+    conn.executemany("INSERT OR IGNORE INTO temp.claves_archivo VALUES (?)", ((c,) for c in df[clave].tolist()))
+    eliminadas = conn.execute(
+        f"DELETE FROM resultados_electorales WHERE tipo_eleccion = ? "
+        f"AND {clave} NOT IN (SELECT clave FROM temp.claves_archivo)",
+        (tipo_eleccion,)
+    ).rowcount
+    conn.execute("DROP TABLE temp.claves_archivo")
+
+    return modificadas, eliminadas
+
+
+def sincronizar_archivos(ruta_db, archivos, clave='casilla_id', tamaño_lote=TAMAÑO_LOTE):
+    """Ingesta incremental e idempotente de {archivo: tipo_eleccion}
+
+    Cada archivo se aplica en su propia transacción, así que los dashboards siempre ven
+    la base completa (antes o después del archivo). Se asume un archivo por tipo de
+    elección: las claves de ese tipo que desaparecen del archivo se eliminan.
+    """
+    conn = sqlite3.connect(ruta_db)
+    inicio_total = time.perf_counter()
+    total_modificadas = total_eliminadas = 0
+
+    try:
+        conn.execute(CREAR_TABLA_MANIFIESTO)
+        conn.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS idx_{clave}_unico ON resultados_electorales({clave})")
+        sincronizar_catalogo(conn)
+        conn.commit()
+
+        # WAL y synchronous=OFF durante la carga; cada archivo sigue en su propia transacción
+        with modo_carga_masiva(conn):
+            for archivo, tipo_eleccion in archivos.items():
+                if not os.path.exists(archivo):
+                    print(f"⚠️ Archivo {archivo} no encontrado")
+                    continue
+
+                estado = os.stat(archivo)
+                guardado = conn.execute(
+                    "SELECT tamaño, mtime, hash_contenido, filas FROM manifiesto_ingesta WHERE archivo = ?",
+                    (archivo,)
+                ).fetchone()
+
+                # Sin cambios de tamaño ni fecha: ni siquiera se lee el archivo
+                if guardado and (guardado[0], guardado[1]) == (estado.st_size, estado.st_mtime):
+                    print(f"⏭️ {archivo}: sin cambios")
+                    continue
+
+                huella = hash_archivo(archivo)
+                if guardado and guardado[2] == huella:
+                    with conn:
+                        conn.execute(GUARDAR_MANIFIESTO, (archivo, tipo_eleccion, estado.st_size, estado.st_mtime,
+                                                          huella, guardado[3]))
+                    print(f"⏭️ {archivo}: mismo contenido (solo cambió la fecha)")
+                    continue
+
+                inicio = time.perf_counter()
+                df = preparar_resultados(pd.read_csv(archivo), tipo_eleccion)
+                with conn:
+                    modificadas, eliminadas = _aplicar_archivo(conn, df, tipo_eleccion, clave, tamaño_lote)
+                    conn.execute(GUARDAR_MANIFIESTO, (archivo, tipo_eleccion, estado.st_size, estado.st_mtime,
+                                                      huella, len(df)))
+
+                segundos = time.perf_counter() - inicio
+                total_modificadas += modificadas
+                total_eliminadas += eliminadas
+                print(f"✅ {archivo}: {len(df):,} registros leídos, {modificadas:,} nuevos o modificados, "
+                      f"{eliminadas:,} eliminados en {segundos:.2f} s "
+                      f"({len(df) / max(segundos, 1e-9):,.0f} filas/s)")
+    finally:
+        conn.close()
+
+    segundos = time.perf_counter() - inicio_total
+    print(f"📦 Total: {total_modificadas:,} nuevos o modificados, {total_eliminadas:,} eliminados en {segundos:.2f} s")
+    return total_modificadas, total_eliminadas
@@ -116,19 +116,19 @@ import sqlite3
 import pandas as pd
 import os
 
+from esquema import migrar_base
+from ingesta import sincronizar_archivos
+from tablas_derivadas import actualizar_tablas_derivadas
 
-def crear_base_datos_sqlite():
-    """Crear base de datos SQLite (no necesita instalación)"""
-    # Cambiar el nombre a 2024
-    if os.path.exists('elecciones_nl_2024.db'):
-        os.remove('elecciones_nl_2024.db')
 
+def crear_base_datos_sqlite():
+    """Crear base de datos SQLite si no existe (la ingesta es incremental, nunca se borra)"""
     conn = sqlite3.connect('elecciones_nl_2024.db')
     cur = conn.cursor()
 
     # Crear tabla
     cur.execute("""
-        CREATE TABLE resultados_electorales (
+        CREATE TABLE IF NOT EXISTS resultados_electorales (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             casilla_id VARCHAR(100) NOT NULL,
             anno INTEGER NOT NULL,
@@ -138,70 +138,31 @@ def crear_base_datos_sqlite():
             nombre_normalizado VARCHAR(300),
             partido_ci VARCHAR(150),
             tipo_eleccion VARCHAR(20) NOT NULL CHECK (tipo_eleccion IN ('MUNICIPAL', 'DIPUTADO', 'GOBERNADOR')),
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            longitud_nombre INTEGER,
+            cantidad_palabras INTEGER,
+            partido_id INTEGER
         )
     """)
 
-    # Crear índices
-    cur.execute("CREATE INDEX idx_tipo_eleccion ON resultados_electorales(tipo_eleccion)")
-    cur.execute("CREATE INDEX idx_partido ON resultados_electorales(partido_ci)")
-    cur.execute("CREATE INDEX idx_division ON resultados_electorales(division_territorial)")
-    cur.execute("CREATE INDEX idx_casilla_id ON resultados_electorales(casilla_id)")
+    # Crear índices (los compuestos los agrega esquema.py y el único de casilla_id la ingesta)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_partido ON resultados_electorales(partido_ci)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_division ON resultados_electorales(division_territorial)")
 
     conn.commit()
     conn.close()
-    print("✅ Base de datos SQLite creada: elecciones_nl_2024.db")
+    print("✅ Base de datos SQLite lista: elecciones_nl_2024.db")
 
 
 def cargar_datos_sqlite():
-    """Cargar datos a SQLite"""
-    conn = sqlite3.connect('elecciones_nl_2024.db')
-
+    """Sincronizar los CSV con SQLite (solo se procesan los archivos que cambiaron)"""
     archivos = {
         '/Users/brayanalfredomurillogutierrez/Desktop/TRABAJO/Base_datos_electoral/Informacion/Modificada/2024/Ayuntamientos/ayuntamientos_con_id_anno_2024.csv': 'MUNICIPAL',
         '/Users/brayanalfredomurillogutierrez/Desktop/TRABAJO/Base_datos_electoral/Informacion/Modificada/2024/Diputaciones/diputaciones_con_id_anno_2024.csv': 'DIPUTADO'
         # Agregar 'gobernador_con_id_anno_2024.csv' si tienes ese archivo
     }
 
-    for archivo, tipo_eleccion in archivos.items():
-        if os.path.exists(archivo):
-            df = pd.read_csv(archivo)
-            print(f"📖 Cargando {archivo}: {len(df)} registros")
-
-            # Estandarizar columnas - usar 'casilla_id' en lugar de 'candidato_id'
-            if 'municipio' in df.columns:
-                df.rename(columns={'municipio': 'division_territorial'}, inplace=True)
-            elif 'distrito' in df.columns:
-                df.rename(columns={'distrito': 'division_territorial'}, inplace=True)
-
-            # Limpiar votos - manejar valores como "1,132" y "Registro cancelado"
-            def limpiar_votos(voto):
-                if isinstance(voto, str):
-                    if voto.replace(',', '').isdigit():
-                        return int(voto.replace(',', ''))
-                    elif 'Registro cancelado' in voto:
-                        return 0
-                    else:
-                        # Intentar extraer números de strings como "1,132"
-                        try:
-                            return int(voto.replace(',', ''))
-                        except:
-                            return 0
-                elif pd.isna(voto):
-                    return 0
-                else:
-                    return int(voto)
-
-            df['numero_de_votos'] = df['numero_de_votos'].apply(limpiar_votos)
-            df['tipo_eleccion'] = tipo_eleccion
-
-            # Insertar datos
-            df.to_sql('resultados_electorales', conn, if_exists='append', index=False)
-            print(f"✅ {archivo} cargado: {len(df)} registros")
-        else:
-            print(f"⚠️ Archivo {archivo} no encontrado")
-
-    conn.close()
+    sincronizar_archivos('elecciones_nl_2024.db', archivos, clave='casilla_id')
 
 
 def consultas_sqlite():
@@ -265,19 +226,9 @@ def consultas_avanzadas():
     # Ganadores por municipio
     print("\n🏆 GANADORES POR MUNICIPIO (Elecciones Municipales):")
     ganadores_municipio = """
-        WITH ranked_candidates AS (
-            SELECT 
-                division_territorial,
-                nombre_candidato,
-                partido_ci,
-                numero_de_votos,
-                ROW_NUMBER() OVER (PARTITION BY division_territorial ORDER BY numero_de_votos DESC) as rank
-            FROM resultados_electorales 
-            WHERE tipo_eleccion = 'MUNICIPAL'
-        )
         SELECT division_territorial as municipio, nombre_candidato, partido_ci, numero_de_votos
-        FROM ranked_candidates 
-        WHERE rank = 1
+        FROM ganadores 
+        WHERE tipo_eleccion = 'MUNICIPAL'
         ORDER BY numero_de_votos DESC
         LIMIT 20;
     """
@@ -287,19 +238,9 @@ def consultas_avanzadas():
     # Ganadores por distrito (diputados)
     print("\n🏆 GANADORES POR DISTRITO (Elecciones de Diputados):")
     ganadores_distrito = """
-        WITH ranked_candidates AS (
-            SELECT 
-                division_territorial,
-                nombre_candidato,
-                partido_ci,
-                numero_de_votos,
-                ROW_NUMBER() OVER (PARTITION BY division_territorial ORDER BY numero_de_votos DESC) as rank
-            FROM resultados_electorales 
-            WHERE tipo_eleccion = 'DIPUTADO'
-        )
         SELECT division_territorial as distrito, nombre_candidato, partido_ci, numero_de_votos
-        FROM ranked_candidates 
-        WHERE rank = 1
+        FROM ganadores 
+        WHERE tipo_eleccion = 'DIPUTADO'
         ORDER BY numero_de_votos DESC;
     """
     df_ganadores_distrito = pd.read_sql_query(ganadores_distrito, conn)
@@ -327,11 +268,13 @@ def consultas_avanzadas():
 # EJECUCIÓN COMPLETA
 print("🚀 INICIANDO PROCESO CON SQLite - ELECCIONES 2024...")
 crear_base_datos_sqlite()
+migrar_base('2024')  # antes de cargar: la carga escribe las columnas que agregan las migraciones
 cargar_datos_sqlite()
+actualizar_tablas_derivadas('2024')
 consultas_sqlite()
 consultas_avanzadas()
 print("\n🎯 PROCESO COMPLETADO!")
-print("📊 Base de datos creada: elecciones_nl_2024.db")
+print("📊 Base de datos actualizada: elecciones_nl_2024.db")
 print("💾 Archivos procesados:")
 print("   - ayuntamientos_con_id_anno_2024.csv")
 print("   - diputaciones_con_id_anno_2024.csv")
\ No newline at end of file
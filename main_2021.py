@@ -0,0 +1,74 @@
+"""Construir elecciones_nl_2021.db desde los CSV del repositorio
+
+La base no se versiona: se genera con este script a partir de los cómputos 2021
+(candidatos_*_2021.csv y diputados_federales_nl_2021.csv). Es idempotente: solo
+se vuelven a procesar los archivos que cambiaron.
+
+Uso:
+    python main_2021.py
+"""
+import sqlite3
+
+import base_datos
+from casillas_federales import cargar_casillas_federales
+from esquema import migrar_base
+from ingesta import sincronizar_archivos
+from tablas_derivadas import actualizar_tablas_derivadas
+
+AÑO = '2021'
+
+ARCHIVOS_2021 = {
+    'candidatos_ayuntamientos_con_id_anno_2021.csv': 'MUNICIPAL',
+    'candidatos_diputaciones_con_id_2021.csv': 'DIPUTADO',
+    'candidatos_gobernador_con_id_anno_2021.csv': 'GOBERNADOR'
+}
+
+
+def crear_base_datos_sqlite():
+    """Crear base de datos SQLite si no existe (la ingesta es incremental, nunca se borra)"""
+    ruta = base_datos.ruta_db(AÑO)
+    conn = sqlite3.connect(ruta)
+    cur = conn.cursor()
+
+    # Crear tabla
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS resultados_electorales (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            candidato_id VARCHAR(100) UNIQUE NOT NULL,
+            anno INTEGER NOT NULL,
+            nombre_candidato VARCHAR(300) NOT NULL,
+            numero_de_votos INTEGER,
+            division_territorial VARCHAR(150),
+            nombre_normalizado VARCHAR(300),
+            partido_ci VARCHAR(150),
+            tipo_eleccion VARCHAR(20) NOT NULL CHECK (tipo_eleccion IN ('MUNICIPAL', 'DIPUTADO', 'GOBERNADOR')),
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            longitud_nombre INTEGER,
+            cantidad_palabras INTEGER,
+            partido_id INTEGER
+        )
+    """)
+
+    # Crear índices (los compuestos los agrega esquema.py)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_partido ON resultados_electorales(partido_ci)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_division ON resultados_electorales(division_territorial)")
+
+    conn.commit()
+    conn.close()
+    print(f"✅ Base de datos SQLite lista: {ruta}")
+
+
+def construir_base_2021():
+    """Resultados por candidato, cómputo por casilla y tablas derivadas de 2021"""
+    crear_base_datos_sqlite()
+    migrar_base(AÑO)  # antes de cargar: la carga escribe las columnas que agregan las migraciones
+    sincronizar_archivos(base_datos.ruta_db(AÑO), ARCHIVOS_2021, clave='candidato_id')
+    cargar_casillas_federales()
+    actualizar_tablas_derivadas(AÑO)
+    base_datos.limpiar_cache(AÑO)
+
+
+if __name__ == '__main__':
+    print("🚀 CONSTRUYENDO BASE 2021...")
+    construir_base_2021()
+    print(f"\n🎯 PROCESO COMPLETADO: {base_datos.ruta_db(AÑO)}")
@@ -0,0 +1,292 @@
+"""Preprocesamiento de los polígonos de Shapes/resultados.shp para los mapas
+
+Simplifica la geometría a varios niveles de detalle y guarda cada nivel como una
+sola FeatureCollection GeoJSON en Shapes/cache/, junto con el centro y los
+límites precalculados. Las páginas leen el GeoJSON ya listo y solo se vuelve a
+procesar cuando cambia el shapefile.
+
+Uso:
+    python mapas.py          # regenera el caché de todos los niveles
+"""
+import hashlib
+import json
+from pathlib import Path
+
+import folium
+import numpy as np
+import pandas as pd
+
+from partidos import ID_PARTIDO, id_por_nombre
+
+RUTA_SHAPEFILE = Path("Shapes/resultados.shp")
+DIRECTORIO_CACHE = Path("Shapes/cache")
+
+# Tolerancia de simplificación en grados (EPSG:4326): ~50 m, ~200 m y ~1 km
+NIVELES_DETALLE = {
+    'alto': 0.0005,
+    'medio': 0.002,
+    'bajo': 0.01,
+}
+NIVEL_POR_DEFECTO = 'medio'
+DECIMALES_COORDENADAS = 5
+# Se incrementa cuando cambia el contenido del caché (no solo el shapefile)
+VERSION_CACHE = 2
+
+COLUMNAS_MAPA = ['NOMGEO', 'NOM_ENT', 'nombre_can', 'PARTIDO_CI', 'numero_de_', 'Porcentaje']
+
+# Campos de la ventana emergente (se arma en el navegador a partir de las propiedades)
+CAMPOS_POPUP = {
+    'NOMGEO': 'Municipio:',
+    'NOM_ENT': 'Estado:',
+    'nombre_can': 'Candidato:',
+    'PARTIDO_CI': 'Partido:',
+    'numero_de_': 'Votos:',
+    'Porcentaje': 'Porcentaje:',
+}
+COLOR_MC = '#FF7F00'
+
+
+def _huella_fuente(ruta_shapefile=RUTA_SHAPEFILE):
+    """Hash del contenido de los archivos del shapefile (para saber si el caché está vigente)
+
+    Se usa el contenido y no la fecha: un checkout nuevo cambia las fechas pero no el shapefile.
+    """
+    huella = {}
+    for extension in ('.shp', '.dbf', '.shx', '.prj'):
+        archivo = ruta_shapefile.with_suffix(extension)
+        if archivo.exists():
+            huella[extension] = hashlib.sha256(archivo.read_bytes()).hexdigest()
+    return huella
+
+
+def limpiar_atributos(gdf):
+    """Votos a entero, porcentaje a número y bandera de municipio ganado por MC"""
+    gdf = gdf.copy()
+    gdf['numero_de_'] = pd.to_numeric(
+        gdf['numero_de_'].astype(str).str.replace(',', '').str.strip(),
+        errors='coerce'
+    ).fillna(0).astype(int)
+
+    gdf['Porcentaje'] = pd.to_numeric(
+        gdf['Porcentaje'].astype(str).str.replace('%', '').str.strip(),
+        errors='coerce'
+    ).fillna(0)
+
+    gdf['PARTIDO_CI'] = gdf['PARTIDO_CI'].astype(str)
+    # Siglas o nombre completo de cualquier año, por el id de la dimensión de partidos
+    nombres = {nombre.upper(): partido_id for nombre, partido_id in id_por_nombre().items()}
+    gdf['es_MC'] = gdf['PARTIDO_CI'].str.upper().map(nombres) == ID_PARTIDO['MC']
+    gdf['clave'] = normalizar_nombre(gdf['NOMGEO'])
+    return gdf
+
+
+# Abreviaturas que usan las bases de resultados ("Gral. Escobedo", "Dr. Coss")
+ABREVIATURAS = {
+    r'\bgral\b\.?': 'general',
+    r'\bdr\b\.?': 'doctor',
+    r'\bcd\b\.?': 'ciudad',
+    r'\bsta\b\.?': 'santa',
+}
+
+
+def normalizar_nombre(nombres, conservar_numero=False):
+    """Clave de unión para nombres de división: sin acentos, minúsculas y sin abreviaturas
+
+    "21. Gral. Escobedo" -> "general escobedo" ("21 general escobedo" si se conserva el número,
+    necesario en distritos porque varios comparten cabecera).
+    """
+    claves = pd.Series(nombres, dtype=object).astype(str).str.strip()
+    numero = claves.str.extract(r'^(\d+)\s*\.?', expand=False)
+    claves = claves.str.replace(r'^\d+\s*\.?\s*', '', regex=True)
+    claves = (claves.str.normalize('NFKD').str.encode('ascii', 'ignore').str.decode('ascii')
+              .str.lower())
+    for patron, reemplazo in ABREVIATURAS.items():
+        claves = claves.str.replace(patron, reemplazo, regex=True)
+    claves = claves.str.replace(r'[^a-z0-9 ]', ' ', regex=True).str.split().str.join(' ')
+
+    if conservar_numero:
+        claves = (numero.fillna('') + ' ' + claves).str.strip()
+    return claves
+
+
+def preprocesar_mapa(ruta_shapefile=RUTA_SHAPEFILE, directorio=DIRECTORIO_CACHE):
+    """Simplificar, redondear y serializar cada nivel de detalle; devuelve los metadatos"""
+    import geopandas as gpd
+    import shapely
+
+    gdf = limpiar_atributos(gpd.read_file(ruta_shapefile)).to_crs(epsg=4326)
+    gdf = gdf[COLUMNAS_MAPA + ['es_MC', 'clave', 'geometry']]
+
+    oeste, sur, este, norte = gdf.total_bounds
+    # Centroide en una proyección métrica (UTM 14N) para que no dependa de la forma en grados
+    centro = gdf.to_crs(epsg=32614).geometry.union_all().centroid
+    centro = gpd.GeoSeries([centro], crs=32614).to_crs(epsg=4326).iloc[0]
+
+    directorio.mkdir(parents=True, exist_ok=True)
+    metadatos = {
+        'version': VERSION_CACHE,
+        'fuente': _huella_fuente(ruta_shapefile),
+        'centro': [centro.y, centro.x],
+        'limites': [[sur, oeste], [norte, este]],
+        'niveles': {},
+    }
+
+    for nivel, tolerancia in NIVELES_DETALLE.items():
+        geometria = gdf.geometry.simplify(tolerancia, preserve_topology=True)
+        geometria = shapely.transform(geometria.values, lambda c: np.round(c, DECIMALES_COORDENADAS))
+        simplificado = gdf.set_geometry(gpd.GeoSeries(geometria, index=gdf.index, crs=gdf.crs))
+
+        contenido = simplificado.to_json(drop_id=True, ensure_ascii=False)
+        (directorio / f"resultados_{nivel}.geojson").write_text(contenido, encoding='utf-8')
+        metadatos['niveles'][nivel] = {
+            'tolerancia': tolerancia,
+            'vertices': int(shapely.get_num_coordinates(geometria).sum()),
+            'bytes': len(contenido.encode('utf-8')),
+        }
+
+    (directorio / "metadatos.json").write_text(json.dumps(metadatos, indent=2), encoding='utf-8')
+    return metadatos
+
+
+def cache_vigente(ruta_shapefile=RUTA_SHAPEFILE, directorio=DIRECTORIO_CACHE):
+    """Metadatos del caché si corresponde al shapefile actual, o None"""
+    ruta_metadatos = directorio / "metadatos.json"
+    if not ruta_metadatos.exists():
+        return None
+
+    metadatos = json.loads(ruta_metadatos.read_text(encoding='utf-8'))
+    archivos_completos = all((directorio / f"resultados_{nivel}.geojson").exists() for nivel in NIVELES_DETALLE)
+    # Sin el shapefile (despliegue solo con el caché) se usa lo que haya
+    fuente = _huella_fuente(ruta_shapefile)
+    if metadatos.get('version') != VERSION_CACHE or not archivos_completos:
+        return None
+    if not fuente or fuente == metadatos['fuente']:
+        return metadatos
+    return None
+
+
+def cargar_mapa(nivel=NIVEL_POR_DEFECTO, ruta_shapefile=RUTA_SHAPEFILE, directorio=DIRECTORIO_CACHE):
+    """FeatureCollection simplificada (dict) y metadatos; regenera el caché si está vencido"""
+    metadatos = cache_vigente(ruta_shapefile, directorio) or preprocesar_mapa(ruta_shapefile, directorio)
+    ruta = directorio / f"resultados_{nivel}.geojson"
+    return json.loads(ruta.read_text(encoding='utf-8')), metadatos
+
+
+# Polígonos de los distritos locales, un registro por distrito con el nombre tal como viene en
+# los resultados ("1. Monterrey") en COLUMNA_DISTRITO. Shapes/ todavía no los incluye: sin el
+# archivo cada distrito se ubica como punto en su municipio cabecera (ubicar_por_cabecera).
+RUTA_DISTRITOS = Path("Shapes/distritos_locales.shp")
+COLUMNA_DISTRITO = 'NOMBRE'
+# Radio (grados) del círculo en que se reparten los distritos que comparten cabecera
+RADIO_CABECERA = 0.03
+
+
+def cargar_distritos(ruta=RUTA_DISTRITOS, nivel=NIVEL_POR_DEFECTO):
+    """FeatureCollection simplificada de distritos con su clave normalizada (con número), o None"""
+    if not Path(ruta).exists():
+        return None
+
+    import geopandas as gpd
+
+    gdf = gpd.read_file(ruta).to_crs(epsg=4326)
+    gdf['clave'] = normalizar_nombre(gdf[COLUMNA_DISTRITO], conservar_numero=True).to_numpy()
+    gdf['geometry'] = gdf.geometry.simplify(NIVELES_DETALLE[nivel], preserve_topology=True)
+    return json.loads(gdf[[COLUMNA_DISTRITO, 'clave', 'geometry']].to_json(drop_id=True))
+
+
+def indice_municipios(geojson):
+    """Una fila por municipio del GeoJSON con su clave normalizada"""
+    propiedades = pd.DataFrame([feature['properties'] for feature in geojson['features']])
+    return propiedades[['clave', 'NOMGEO']].drop_duplicates('clave').reset_index(drop=True)
+
+
+def indice_distritos(geojson):
+    """Una fila por distrito del GeoJSON con su clave normalizada; vacío si no hay polígonos"""
+    if geojson is None:
+        return pd.DataFrame({'clave': pd.Series(dtype=object)})
+    propiedades = pd.DataFrame([feature['properties'] for feature in geojson['features']])
+    return propiedades[['clave']].drop_duplicates('clave').reset_index(drop=True)
+
+
+def unir_divisiones(divisiones, indice, columna='division', conservar_numero=False):
+    """Unir divisiones con el índice espacial en un solo merge; devuelve (unidas, sin coincidencia)"""
+    divisiones = divisiones.assign(clave=normalizar_nombre(divisiones[columna], conservar_numero).to_numpy())
+    unidas = divisiones.merge(indice, on='clave', how='left', indicator=True)
+    encontradas = unidas['_merge'] == 'both'
+    sin_coincidencia = unidas.loc[~encontradas, columna].tolist()
+    return unidas[encontradas].drop(columns='_merge').reset_index(drop=True), sin_coincidencia
+
+
+def puntos_municipios(geojson):
+    """Punto representativo (dentro del polígono) de cada municipio del GeoJSON"""
+    from shapely.geometry import shape
+
+    puntos = []
+    for feature in geojson['features']:
+        punto = shape(feature['geometry']).representative_point()
+        puntos.append({'clave': feature['properties']['clave'], 'lat': punto.y, 'lon': punto.x})
+    return pd.DataFrame(puntos, columns=['clave', 'lat', 'lon']).drop_duplicates('clave').reset_index(drop=True)
+
+
+def ubicar_por_cabecera(divisiones, puntos, columna='division', radio=RADIO_CABECERA):
+    """Ubicar cada distrito en el punto de su municipio cabecera ("1. Monterrey" -> Monterrey)
+
+    Es una ubicación aproximada para cuando no hay polígonos de distritos. Los distritos
+    que comparten cabecera se reparten en un círculo alrededor del punto para que no se
+    encimen. Devuelve (unidas con lat/lon, sin coincidencia) como unir_divisiones.
+    """
+    unidas, sin_coincidencia = unir_divisiones(divisiones, puntos, columna)
+    unidas = unidas.sort_values(columna, key=lambda nombres: normalizar_nombre(nombres, conservar_numero=True))
+    posicion = unidas.groupby('clave').cumcount()
+    compartidas = unidas.groupby('clave')['clave'].transform('size')
+    angulo = 2 * np.pi * posicion / compartidas
+    desplazamiento = np.where(compartidas > 1, radio, 0.0)
+    unidas['lat'] = unidas['lat'] + desplazamiento * np.sin(angulo)
+    unidas['lon'] = unidas['lon'] + desplazamiento * np.cos(angulo)
+    return unidas.reset_index(drop=True), sin_coincidencia
+
+
+def estilo_municipio(feature):
+    """Naranja para los municipios ganados por MC, gris transparente para el resto"""
+    es_mc = feature['properties']['es_MC']
+    return {
+        'color': COLOR_MC if es_mc else 'gray',
+        'fillColor': COLOR_MC if es_mc else 'transparent',
+        'weight': 1.5,
+        'fillOpacity': 0.8 if es_mc else 0.2,
+    }
+
+
+def mapa_coropletico(geojson, metadatos, tiles='cartodb positron'):
+    """Mapa con todos los municipios en una capa; popup y tooltip se arman en el navegador"""
+    m = folium.Map(location=metadatos['centro'], zoom_start=6, tiles=tiles)
+    m.fit_bounds(metadatos['limites'])
+
+    folium.GeoJson(
+        geojson,
+        name='Municipios',
+        style_function=estilo_municipio,
+        highlight_function=lambda feature: {'weight': 3, 'color': COLOR_MC},
+        tooltip=folium.GeoJsonTooltip(fields=['NOMGEO', 'PARTIDO_CI'], aliases=['Municipio:', 'Partido:']),
+        popup=folium.GeoJsonPopup(
+            fields=list(CAMPOS_POPUP),
+            aliases=list(CAMPOS_POPUP.values()),
+            localize=True,
+            style='font-family:sans-serif; font-size:14px;',
+            max_width=300
+        )
+    ).add_to(m)
+
+    return m
+
+
+def tamaño_serializado(mapa):
+    """Bytes del HTML que st_folium envía al navegador para un mapa"""
+    return len(mapa.get_root().render().encode('utf-8'))
+
+
+if __name__ == '__main__':
+    metadatos = preprocesar_mapa()
+    for nivel, info in metadatos['niveles'].items():
+        print(f"🗺️ {nivel}: tolerancia {info['tolerancia']}°, {info['vertices']:,} vértices, "
+              f"{info['bytes'] / 1024:,.0f} KB")
@@ -1,10 +1,14 @@
 import streamlit as st
 import pandas as pd
-import sqlite3
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
+import base_datos
+import mapas
+from analisis_electoral import clasificar_divisiones
+from partidos import ID_PARTIDO
+
 # Configurar la página
 st.set_page_config(
     page_title="Análisis Movimiento Ciudadano",
@@ -12,6 +16,13 @@ st.set_page_config(
     layout="wide"
 )
 
+# Las bases derivadas no se versionan: sin ellas la página no puede consultar nada
+faltantes = base_datos.bases_faltantes()
+if faltantes:
+    for año in faltantes:
+        st.error(f"❌ {base_datos.mensaje_base_faltante(año)}")
+    st.stop()
+
 # CSS personalizado para MC
 st.markdown("""
 <style>
@@ -69,164 +80,74 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Datos geoespaciales básicos para Nuevo León (coordenadas aproximadas de municipios)
-MUNICIPIOS_NL = {
-    "Monterrey": {"lat": 25.6866, "lon": -100.3161},
-    "Guadalupe": {"lat": 25.6770, "lon": -100.2595},
-    "San Nicolás de los Garza": {"lat": 25.7417, "lon": -100.3021},
-    "San Pedro Garza García": {"lat": 25.6576, "lon": -100.4025},
-    "Santa Catarina": {"lat": 25.6734, "lon": -100.4600},
-    "Apodaca": {"lat": 25.7819, "lon": -100.1887},
-    "Escobedo": {"lat": 25.7953, "lon": -100.1417},
-    "García": {"lat": 25.8123, "lon": -100.5980},
-    "Juárez": {"lat": 25.6476, "lon": -100.0951},
-    "Santiago": {"lat": 25.4256, "lon": -100.1522},
-    "Allende": {"lat": 25.2764, "lon": -100.0144},
-    "Montemorelos": {"lat": 25.1892, "lon": -99.8236},
-    "Linares": {"lat": 24.8578, "lon": -99.5678},
-    "Hualahuises": {"lat": 24.8844, "lon": -99.6611},
-    "Rayones": {"lat": 25.0178, "lon": -100.0739},
-    "Doctor Arroyo": {"lat": 23.6714, "lon": -100.1833},
-    "Aramberri": {"lat": 24.0997, "lon": -99.8153},
-    "Galeana": {"lat": 24.8261, "lon": -100.0669},
-    "Iturbide": {"lat": 24.7250, "lon": -99.9056},
-    "Cadereyta Jiménez": {"lat": 25.5833, "lon": -100.0000},
-    "El Carmen": {"lat": 25.9361, "lon": -100.3639},
-    "Abasolo": {"lat": 25.9450, "lon": -100.3992},
-    "Higueras": {"lat": 25.9611, "lon": -100.0167},
-    "Salinas Victoria": {"lat": 26.0417, "lon": -100.2917},
-    "Ciénega de Flores": {"lat": 25.9542, "lon": -100.1833},
-    "Villaldama": {"lat": 26.5042, "lon": -100.4375},
-    "Sabinas Hidalgo": {"lat": 26.5083, "lon": -100.1819},
-    "Vallecillo": {"lat": 26.6583, "lon": -99.9875},
-    "Parás": {"lat": 26.5000, "lon": -99.5167},
-    "Agualeguas": {"lat": 26.3125, "lon": -99.5417},
-    "Mier y Noriega": {"lat": 23.4167, "lon": -100.1167},
-    "Doctor Coss": {"lat": 25.9250, "lon": -99.1417},
-    "General Bravo": {"lat": 25.7917, "lon": -99.1750},
-    "General Terán": {"lat": 25.2583, "lon": -99.6833},
-    "General Zuazua": {"lat": 25.8958, "lon": -100.1083},
-    "Marín": {"lat": 25.8792, "lon": -100.0292},
-    "Melchor Ocampo": {"lat": 25.0458, "lon": -100.0958},
-    "Los Ramones": {"lat": 25.6972, "lon": -99.6250},
-    "Los Herreras": {"lat": 25.9069, "lon": -99.4042},
-    "Los Aldamas": {"lat": 25.6000, "lon": -99.1167},
-    "General Escobedo": {"lat": 25.7953, "lon": -100.1417},
-    "Pesquería": {"lat": 25.7850, "lon": -100.0500},
-    "China": {"lat": 25.7000, "lon": -99.2333},
-    "Anáhuac": {"lat": 27.2417, "lon": -100.1333},
-    "Lampazos de Naranjo": {"lat": 27.0250, "lon": -100.5083},
-    "Bustamante": {"lat": 26.5333, "lon": -100.5000},
-    "Cerralvo": {"lat": 26.0875, "lon": -99.6292},
-    "Doctor González": {"lat": 25.8583, "lon": -99.9417},
-    "Hidalgo": {"lat": 25.8569, "lon": -100.4333},
-    "Mina": {"lat": 26.0000, "lon": -100.5333}
-}
-
-# Coordenadas aproximadas para distritos de diputaciones (centros de áreas metropolitanas)
-DISTRITOS_DIPUTACIONES = {
-    "1. Monterrey": {"lat": 25.6866, "lon": -100.3161},
-    "2. Monterrey": {"lat": 25.6700, "lon": -100.3500},
-    "3. Monterrey": {"lat": 25.6500, "lon": -100.2900},
-    "4. Salinas Victoria": {"lat": 26.0417, "lon": -100.2917},
-    "5. Apodaca": {"lat": 25.7819, "lon": -100.1887},
-    "6. Monterrey": {"lat": 25.7200, "lon": -100.3100},
-    "7. Apodaca": {"lat": 25.7900, "lon": -100.2000},
-    "8. Monterrey": {"lat": 25.6800, "lon": -100.3300},
-    "9. San Nicolás de los Garza": {"lat": 25.7417, "lon": -100.3021},
-    "10. San Nicolás de los Garza": {"lat": 25.7500, "lon": -100.2800},
-    "11. Pesquería": {"lat": 25.7850, "lon": -100.0500},
-    "12. García": {"lat": 25.8123, "lon": -100.5980},
-    "13. Guadalupe": {"lat": 25.6770, "lon": -100.2595},
-    "14. Guadalupe": {"lat": 25.6900, "lon": -100.2400},
-    "15. Guadalupe": {"lat": 25.6650, "lon": -100.2700},
-    "16. Apodaca": {"lat": 25.7700, "lon": -100.1700},
-    "17. Gral. Escobedo": {"lat": 25.7953, "lon": -100.1417},
-    "18. San Pedro Garza García": {"lat": 25.6576, "lon": -100.4025},
-    "19. Santa Catarina": {"lat": 25.6734, "lon": -100.4600},
-    "20. García": {"lat": 25.8200, "lon": -100.5800},
-    "21. Ciénega de Flores": {"lat": 25.9542, "lon": -100.1833},
-    "22. Juárez": {"lat": 25.6476, "lon": -100.0951},
-    "23. Juárez": {"lat": 25.6300, "lon": -100.1200},
-    "24. Linares": {"lat": 24.8578, "lon": -99.5678},
-    "25. Gral. Escobedo": {"lat": 25.8100, "lon": -100.1500},
-    "26. Cadereyta Jiménez": {"lat": 25.5833, "lon": -100.0000}
-}
+
+@st.cache_data(show_spinner=False)
+def obtener_poligonos_municipios():
+    """Polígonos simplificados de municipios e índice por nombre normalizado"""
+    geojson, _ = mapas.cargar_mapa()
+    return geojson, mapas.indice_municipios(geojson)
+
+
+@st.cache_data(show_spinner=False)
+def obtener_poligonos_distritos():
+    """Polígonos de distritos locales (None si no están en Shapes/) e índice por nombre con número"""
+    geojson = mapas.cargar_distritos()
+    return geojson, mapas.indice_distritos(geojson)
+
+
+@st.cache_data(show_spinner=False)
+def obtener_puntos_municipios():
+    """Punto de cada municipio, para ubicar los distritos por su cabecera si no hay polígonos"""
+    geojson, _ = obtener_poligonos_municipios()
+    return mapas.puntos_municipios(geojson)
+
+
+def mostrar_sin_coincidencia(sin_coincidencia, tipo):
+    """Avisar qué divisiones no se pudieron ubicar en el mapa"""
+    if sin_coincidencia:
+        st.warning(f"⚠️ {len(sin_coincidencia)} {tipo} sin ubicación en el mapa: {', '.join(sin_coincidencia)}")
+
+
+ID_MC = ID_PARTIDO['MC']
 
 
 class AnalisisMovimientoCiudadano:
     def __init__(self):
-        self.dbs = {
-            '2021': 'elecciones_nl_2021.db',
-            '2024': 'elecciones_nl_2024.db'
-        }
-
-    def conectar(self, año):
-        return sqlite3.connect(self.dbs[año])
+        self.dbs = base_datos.BASES_DATOS
 
-    def obtener_nombre_mc(self, año):
-        return 'Movimiento Ciudadano' if año == '2021' else 'MC'
+    def consultar(self, año, query, params=None):
+        """Ejecutar consulta usando el pool y cache compartidos"""
+        return base_datos.consultar(año, query, params)
 
     def obtener_ganadores(self, año, tipo_eleccion):
-        """Obtener ganadores por división territorial"""
-        nombre_mc = self.obtener_nombre_mc(año)
-        with self.conectar(año) as conn:
-            query = f"""
-            WITH ranked_candidates AS (
-                SELECT 
-                    division_territorial,
-                    nombre_candidato,
-                    partido_ci,
-                    numero_de_votos,
-                    ROW_NUMBER() OVER (PARTITION BY division_territorial ORDER BY numero_de_votos DESC) as rank
-                FROM resultados_electorales 
-                WHERE tipo_eleccion = ?
-            )
-            SELECT division_territorial, nombre_candidato, partido_ci, numero_de_votos
-            FROM ranked_candidates 
-            WHERE rank = 1;
-            """
-            ganadores = pd.read_sql_query(query, conn, params=(tipo_eleccion,))
-
-            # Filtrar solo los ganadores de MC con el nombre correcto
-            mc_ganadores = ganadores[ganadores['partido_ci'] == nombre_mc]
-            return mc_ganadores
+        """Obtener las divisiones ganadas por MC"""
+        query = """
+        SELECT division_territorial, nombre_candidato, partido_ci, numero_de_votos
+        FROM ganadores 
+        WHERE tipo_eleccion = ? AND partido_id = ?;
+        """
+        return self.consultar(año, query, (tipo_eleccion, ID_MC))
 
     def obtener_todos_ganadores(self, año, tipo_eleccion):
         """Obtener todos los ganadores (sin filtrar por partido)"""
-        with self.conectar(año) as conn:
-            query = f"""
-            WITH ranked_candidates AS (
-                SELECT 
-                    division_territorial,
-                    nombre_candidato,
-                    partido_ci,
-                    numero_de_votos,
-                    ROW_NUMBER() OVER (PARTITION BY division_territorial ORDER BY numero_de_votos DESC) as rank
-                FROM resultados_electorales 
-                WHERE tipo_eleccion = ?
-            )
-            SELECT division_territorial, nombre_candidato, partido_ci, numero_de_votos
-            FROM ranked_candidates 
-            WHERE rank = 1;
-            """
-            return pd.read_sql_query(query, conn, params=(tipo_eleccion,))
+        query = """
+        SELECT division_territorial, nombre_candidato, partido_ci, numero_de_votos
+        FROM ganadores 
+        WHERE tipo_eleccion = ?;
+        """
+        return self.consultar(año, query, (tipo_eleccion,))
 
     def obtener_datos_mc(self, año, tipo_eleccion):
         """Obtener todos los datos de MC para un tipo de elección"""
-        nombre_mc = self.obtener_nombre_mc(año)
-        with self.conectar(año) as conn:
-            query = """
-            SELECT * FROM resultados_electorales 
-            WHERE tipo_eleccion = ? AND partido_ci = ?
-            ORDER BY numero_de_votos DESC;
-            """
-            return pd.read_sql_query(query, conn, params=(tipo_eleccion, nombre_mc))
+        query = """
+        SELECT * FROM resultados_electorales 
+        WHERE tipo_eleccion = ? AND partido_id = ?
+        ORDER BY numero_de_votos DESC;
+        """
+        return self.consultar(año, query, (tipo_eleccion, ID_MC))
 
     def analizar_transferencia_votos(self, año):
         """Analizar patrones de transferencia de votos municipal-diputacional"""
-        nombre_mc = self.obtener_nombre_mc(año)
-
         # Obtener datos de ambos tipos de elección
         datos_municipales = self.obtener_datos_mc(año, 'MUNICIPAL')
         datos_diputados = self.obtener_datos_mc(año, 'DIPUTADO')
@@ -256,123 +177,37 @@ class AnalisisMovimientoCiudadano:
 
         return pd.DataFrame(analisis_transferencia)
 
+    def obtener_resumen_divisiones(self, año, tipo_eleccion):
+        """Totales, votos de MC y ganador de cada división en una sola consulta"""
+        query = """
+        SELECT g.division_territorial as division, mc.votos_mc, g.total_votos, g.partido_ci as ganador,
+               g.partido_id as ganador_id
+        FROM ganadores g
+        JOIN (
+            SELECT division_territorial, MAX(numero_de_votos) as votos_mc
+            FROM resultados_electorales 
+            WHERE tipo_eleccion = ? AND partido_id = ?
+            GROUP BY division_territorial
+        ) mc ON mc.division_territorial = g.division_territorial
+        WHERE g.tipo_eleccion = ?
+        ORDER BY mc.votos_mc DESC;
+        """
+        return self.consultar(año, query, (tipo_eleccion, ID_MC, tipo_eleccion))
+
+    def _identificar_divisiones_clave(self, año, tipo_eleccion, tipo):
+        """Clasificar todas las divisiones de un tipo de elección con los umbrales estratégicos"""
+        resumen = self.obtener_resumen_divisiones(año, tipo_eleccion)
+        if resumen.empty:
+            return pd.DataFrame()
+        return clasificar_divisiones(resumen, ID_MC, tipo)
+
     def identificar_municipios_clave(self, año):
         """Identificar municipios clave para crecimiento estratégico"""
-        nombre_mc = self.obtener_nombre_mc(año)
-
-        # Obtener todos los datos municipales
-        datos_municipales = self.obtener_datos_mc(año, 'MUNICIPAL')
-        ganadores_municipio = self.obtener_todos_ganadores(año, 'MUNICIPAL')
-
-        analisis_municipios = []
-
-        for municipio in datos_municipales['division_territorial'].unique():
-            datos_mun = datos_municipales[datos_municipales['division_territorial'] == municipio]
-            if len(datos_mun) > 0:
-                votos_mc = datos_mun['numero_de_votos'].iloc[0]
-
-                # Obtener total de votos del municipio
-                with self.conectar(año) as conn:
-                    query = "SELECT SUM(numero_de_votos) as total_votos FROM resultados_electorales WHERE tipo_eleccion = 'MUNICIPAL' AND division_territorial = ?"
-                    total_votos_df = pd.read_sql_query(query, conn, params=(municipio,))
-                    total_votos = total_votos_df['total_votos'].iloc[0] if not total_votos_df.empty else 0
-
-                # FÓRMULA: Porcentaje de votos de MC
-                porcentaje = (votos_mc / total_votos * 100) if total_votos > 0 else 0
-
-                # Obtener ganador del municipio
-                ganador_mun = ganadores_municipio[ganadores_municipio['division_territorial'] == municipio]
-                ganador = ganador_mun['partido_ci'].iloc[0] if not ganador_mun.empty else "Desconocido"
-
-                # Clasificar municipio usando umbrales estratégicos
-                if ganador == nombre_mc:
-                    categoria = "Victoria"
-                    prioridad = "Consolidar"
-                elif porcentaje >= 40:
-                    categoria = "Alta Oportunidad"
-                    prioridad = "Alta"
-                elif porcentaje >= 25:
-                    categoria = "Oportunidad Media"
-                    prioridad = "Media"
-                elif porcentaje >= 15:
-                    categoria = "Oportunidad Baja"
-                    prioridad = "Baja"
-                else:
-                    categoria = "Base Débil"
-                    prioridad = "Expandir Base"
-
-                analisis_municipios.append({
-                    'division': municipio,
-                    'votos_mc': votos_mc,
-                    'total_votos': total_votos,
-                    'porcentaje_mc': porcentaje,
-                    'ganador': ganador,
-                    'mc_es_ganador': ganador == nombre_mc,
-                    'categoria': categoria,
-                    'prioridad': prioridad,
-                    'tipo': 'Municipio'
-                })
-
-        return pd.DataFrame(analisis_municipios)
+        return self._identificar_divisiones_clave(año, 'MUNICIPAL', 'Municipio')
 
     def identificar_distritos_clave(self, año):
         """Identificar distritos clave para diputaciones"""
-        nombre_mc = self.obtener_nombre_mc(año)
-
-        # Obtener todos los datos de diputados
-        datos_diputados = self.obtener_datos_mc(año, 'DIPUTADO')
-        ganadores_diputados = self.obtener_todos_ganadores(año, 'DIPUTADO')
-
-        analisis_distritos = []
-
-        for distrito in datos_diputados['division_territorial'].unique():
-            datos_dip = datos_diputados[datos_diputados['division_territorial'] == distrito]
-            if len(datos_dip) > 0:
-                votos_mc = datos_dip['numero_de_votos'].iloc[0]
-
-                # Obtener total de votos del distrito
-                with self.conectar(año) as conn:
-                    query = "SELECT SUM(numero_de_votos) as total_votos FROM resultados_electorales WHERE tipo_eleccion = 'DIPUTADO' AND division_territorial = ?"
-                    total_votos_df = pd.read_sql_query(query, conn, params=(distrito,))
-                    total_votos = total_votos_df['total_votos'].iloc[0] if not total_votos_df.empty else 0
-
-                # FÓRMULA: Porcentaje de votos de MC
-                porcentaje = (votos_mc / total_votos * 100) if total_votos > 0 else 0
-
-                # Obtener ganador del distrito
-                ganador_dip = ganadores_diputados[ganadores_diputados['division_territorial'] == distrito]
-                ganador = ganador_dip['partido_ci'].iloc[0] if not ganador_dip.empty else "Desconocido"
-
-                # Clasificar distrito usando umbrales estratégicos
-                if ganador == nombre_mc:
-                    categoria = "Victoria"
-                    prioridad = "Consolidar"
-                elif porcentaje >= 40:
-                    categoria = "Alta Oportunidad"
-                    prioridad = "Alta"
-                elif porcentaje >= 25:
-                    categoria = "Oportunidad Media"
-                    prioridad = "Media"
-                elif porcentaje >= 15:
-                    categoria = "Oportunidad Baja"
-                    prioridad = "Baja"
-                else:
-                    categoria = "Base Débil"
-                    prioridad = "Expandir Base"
-
-                analisis_distritos.append({
-                    'division': distrito,
-                    'votos_mc': votos_mc,
-                    'total_votos': total_votos,
-                    'porcentaje_mc': porcentaje,
-                    'ganador': ganador,
-                    'mc_es_ganador': ganador == nombre_mc,
-                    'categoria': categoria,
-                    'prioridad': prioridad,
-                    'tipo': 'Distrito'
-                })
-
-        return pd.DataFrame(analisis_distritos)
+        return self._identificar_divisiones_clave(año, 'DIPUTADO', 'Distrito')
 
 
 # Inicializar análisis
@@ -543,7 +378,7 @@ elif tipo_analisis == '🎯 Municipios Clave':
 
         **🏆 VICTORIA (Consolidar)**
         - **Condición**: MC es el partido ganador en el municipio
-        - **Fórmula**: Ganador = 'Movimiento Ciudadano' (2021) o 'MC' (2024)
+        - **Fórmula**: Ganador = MC (partido_id de la dimensión de partidos, el mismo en 2021 y 2024)
         - **Estrategia**: Mantener y fortalecer la base electoral existente
 
         **🎯 ALTA OPORTUNIDAD (Prioridad Alta)**
@@ -621,30 +456,17 @@ elif tipo_analisis == '🎯 Municipios Clave':
         # MAPA DE PRIORIDADES
         st.subheader("🗺️ Mapa de Prioridades Estratégicas - Municipios")
 
-        # Agregar coordenadas a los datos
-        municipios_con_coords = []
-        for _, municipio in municipios_clave.iterrows():
-            nombre_mun = municipio['division']
-            if nombre_mun in MUNICIPIOS_NL:
-                coords = MUNICIPIOS_NL[nombre_mun]
-                municipios_con_coords.append({
-                    'division': nombre_mun,
-                    'lat': coords['lat'],
-                    'lon': coords['lon'],
-                    'categoria': municipio['categoria'],
-                    'prioridad': municipio['prioridad'],
-                    'porcentaje_mc': municipio['porcentaje_mc'],
-                    'votos_mc': municipio['votos_mc'],
-                    'total_votos': municipio['total_votos']
-                })
-
-        if municipios_con_coords:
-            mapa_prioridades = pd.DataFrame(municipios_con_coords)
+        # Unir con los polígonos de municipios por nombre normalizado
+        geojson_municipios, indice = obtener_poligonos_municipios()
+        mapa_prioridades, sin_coincidencia = mapas.unir_divisiones(municipios_clave, indice)
+        mostrar_sin_coincidencia(sin_coincidencia, "municipios")
 
-            fig_mapa_prioridades = px.scatter_mapbox(
+        if not mapa_prioridades.empty:
+            fig_mapa_prioridades = px.choropleth_mapbox(
                 mapa_prioridades,
-                lat="lat",
-                lon="lon",
+                geojson=geojson_municipios,
+                locations="clave",
+                featureidkey="properties.clave",
                 hover_name="division",
                 hover_data={
                     "categoria": True,
@@ -652,8 +474,7 @@ elif tipo_analisis == '🎯 Municipios Clave':
                     "porcentaje_mc": ":.1f",
                     "votos_mc": True,
                     "total_votos": True,
-                    "lat": False,
-                    "lon": False
+                    "clave": False
                 },
                 color="prioridad",
                 color_discrete_map={
@@ -663,9 +484,9 @@ elif tipo_analisis == '🎯 Municipios Clave':
                     "Consolidar": "#F58220",
                     "Expandir Base": "#CCCCCC"
                 },
-                size="porcentaje_mc",
-                size_max=20,
-                zoom=8,
+                opacity=0.7,
+                center={"lat": 25.6, "lon": -100.0},
+                zoom=6,
                 height=600,
                 title=f"Mapa de Prioridades Estratégicas - Municipios ({año_municipio})",
                 labels={
@@ -759,7 +580,7 @@ else:  # Distritos de Diputaciones
 
         **🏆 VICTORIA (Consolidar)**
         - **Condición**: MC es el partido ganador en el distrito
-        - **Fórmula**: Ganador = 'Movimiento Ciudadano' (2021) o 'MC' (2024)
+        - **Fórmula**: Ganador = MC (partido_id de la dimensión de partidos, el mismo en 2021 y 2024)
         - **Estrategia**: Mantener y fortalecer la base electoral existente
 
         **🎯 ALTA OPORTUNIDAD (Prioridad Alta)**
@@ -837,58 +658,69 @@ else:  # Distritos de Diputaciones
         # MAPA DE PRIORIDADES
         st.subheader("🗺️ Mapa de Prioridades Estratégicas - Distritos de Diputaciones")
 
-        # Agregar coordenadas a los datos
-        distritos_con_coords = []
-        for _, distrito in distritos_clave.iterrows():
-            nombre_dist = distrito['division']
-            if nombre_dist in DISTRITOS_DIPUTACIONES:
-                coords = DISTRITOS_DIPUTACIONES[nombre_dist]
-                distritos_con_coords.append({
-                    'division': nombre_dist,
-                    'lat': coords['lat'],
-                    'lon': coords['lon'],
-                    'categoria': distrito['categoria'],
-                    'prioridad': distrito['prioridad'],
-                    'porcentaje_mc': distrito['porcentaje_mc'],
-                    'votos_mc': distrito['votos_mc'],
-                    'total_votos': distrito['total_votos']
-                })
-
-        if distritos_con_coords:
-            mapa_prioridades = pd.DataFrame(distritos_con_coords)
+        # Unión con los polígonos por nombre normalizado con número (varios distritos comparten cabecera)
+        geojson_distritos, indice = obtener_poligonos_distritos()
+        if geojson_distritos is not None:
+            mapa_prioridades, sin_coincidencia = mapas.unir_divisiones(distritos_clave, indice, conservar_numero=True)
+        else:
+            # Sin polígonos de distritos: cada distrito como punto en su municipio cabecera
+            mapa_prioridades, sin_coincidencia = mapas.ubicar_por_cabecera(distritos_clave, obtener_puntos_municipios())
+        mostrar_sin_coincidencia(sin_coincidencia, "distritos")
+
+        estilo_prioridades = dict(
+            hover_name="division",
+            hover_data={
+                "categoria": True,
+                "prioridad": True,
+                "porcentaje_mc": ":.1f",
+                "votos_mc": True,
+                "total_votos": True,
+                "clave": False
+            },
+            color="prioridad",
+            color_discrete_map={
+                "Alta": "#FF4444",
+                "Media": "#FFC107",
+                "Baja": "#FF9800",
+                "Consolidar": "#F58220",
+                "Expandir Base": "#CCCCCC"
+            },
+            center={"lat": 25.6, "lon": -100.0},
+            zoom=6,
+            height=600,
+            title=f"Mapa de Prioridades Estratégicas - Distritos de Diputaciones ({año_distrito})",
+            labels={
+                "porcentaje_mc": "Porcentaje MC (%)",
+                "prioridad": "Prioridad Estratégica"
+            }
+        )
 
-            fig_mapa_prioridades = px.scatter_mapbox(
-                mapa_prioridades,
-                lat="lat",
-                lon="lon",
-                hover_name="division",
-                hover_data={
-                    "categoria": True,
-                    "prioridad": True,
-                    "porcentaje_mc": ":.1f",
-                    "votos_mc": True,
-                    "total_votos": True,
-                    "lat": False,
-                    "lon": False
-                },
-                color="prioridad",
-                color_discrete_map={
-                    "Alta": "#FF4444",
-                    "Media": "#FFC107",
-                    "Baja": "#FF9800",
-                    "Consolidar": "#F58220",
-                    "Expandir Base": "#CCCCCC"
-                },
-                size="porcentaje_mc",
-                size_max=20,
-                zoom=8,
-                height=600,
-                title=f"Mapa de Prioridades Estratégicas - Distritos de Diputaciones ({año_distrito})",
-                labels={
-                    "porcentaje_mc": "Porcentaje MC (%)",
-                    "prioridad": "Prioridad Estratégica"
-                }
-            )
+        if mapa_prioridades.empty:
+            st.info("Ningún distrito coincide con los polígonos de distritos locales")
+        else:
+            if geojson_distritos is not None:
+                fig_mapa_prioridades = px.choropleth_mapbox(
+                    mapa_prioridades,
+                    geojson=geojson_distritos,
+                    locations="clave",
+                    featureidkey="properties.clave",
+                    opacity=0.7,
+                    **estilo_prioridades
+                )
+            else:
+                st.caption(f"No hay polígonos de distritos locales ({mapas.RUTA_DISTRITOS}): cada distrito se "
+                           "muestra en su municipio cabecera (ubicación aproximada; los que comparten cabecera "
+                           "se reparten alrededor de ella).")
+                estilo_prioridades['hover_data'].update({"lat": False, "lon": False})
+                fig_mapa_prioridades = px.scatter_mapbox(
+                    mapa_prioridades,
+                    lat="lat",
+                    lon="lon",
+                    text="division",
+                    opacity=0.9,
+                    **estilo_prioridades
+                )
+                fig_mapa_prioridades.update_traces(marker={"size": 16}, textposition="top center")
 
             fig_mapa_prioridades.update_layout(
                 mapbox_style="open-street-map",
@@ -896,8 +728,6 @@ else:  # Distritos de Diputaciones
             )
 
             st.plotly_chart(fig_mapa_prioridades, use_container_width=True)
-        else:
-            st.info("No se encontraron coordenadas para mostrar el mapa de distritos")
 
         # TABLAS ESTRATÉGICAS
         st.subheader("📋 ANÁLISIS ESTRATÉGICO POR CATEGORÍA - DISTRITOS")
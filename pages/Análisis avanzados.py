@@ -1,12 +1,15 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import sqlite3
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime
 import warnings
 
+import base_datos
+from analisis_electoral import (caracteristicas_basicas, estadisticas_simulacion, rejilla_escenarios,
+                                 simular_escenarios)
+
 warnings.filterwarnings('ignore')
 
 # Configurar la página
@@ -17,6 +20,13 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Las bases derivadas no se versionan: sin ellas la página no puede consultar nada
+faltantes = base_datos.bases_faltantes()
+if faltantes:
+    for año in faltantes:
+        st.error(f"❌ {base_datos.mensaje_base_faltante(año)}")
+    st.stop()
+
 # CSS personalizado
 st.markdown("""
 <style>
@@ -58,94 +68,79 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
+CONSULTA_DATOS_COMPLETOS = """
+-- auditoria: recorrido intencional (carga completa para el análisis)
+SELECT 
+    nombre_candidato,
+    partido_ci,
+    tipo_eleccion,
+    division_territorial,
+    numero_de_votos,
+    anno,
+    longitud_nombre,
+    cantidad_palabras
+FROM resultados_electorales 
+WHERE tipo_eleccion != 'GOBERNADOR'
+UNION ALL
+SELECT 
+    nombre_candidato,
+    partido_ci,
+    tipo_eleccion,
+    division_territorial,
+    numero_de_votos,
+    anno,
+    longitud_nombre,
+    cantidad_palabras
+FROM gobernador_corregido;
+"""
+
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def obtener_datos_enriquecidos(año, version):
+    """Datos completos con características, compartidos entre sesiones y reruns
+
+    `version` (base_datos.version_datos) forma parte de la clave: cualquier
+    escritura en la base genera una entrada nueva. El DataFrame es compartido,
+    la página solo lo lee.
+    """
+    datos = base_datos.consultar(año, CONSULTA_DATOS_COMPLETOS, usar_cache=False)
+    if len(datos) == 0:
+        return datos
+    return caracteristicas_basicas(datos)
+
+
+def recargar_datos(año):
+    """Descartar los datos en cache del año (el siguiente acceso vuelve a la base)"""
+    obtener_datos_enriquecidos.clear()
+    base_datos.limpiar_cache(año)
+
+
 class AnalizadorElectoralAvanzado:
-    def __init__(self, db_path='elecciones_nl_2021.db'):
-        self.db_path = db_path
+    def __init__(self, año='2021'):
+        self.año = año
         self.data = None
         self.data_enriquecido = None
+        self._estadisticas_simulacion = None
 
-    def cargar_datos_completos(self):
-        """Cargar todos los datos electorales"""
-        try:
-            conn = sqlite3.connect(self.db_path)
-
-            query = """
-            SELECT 
-                nombre_candidato,
-                partido_ci,
-                tipo_eleccion,
-                division_territorial,
-                numero_de_votos,
-                anno
-            FROM resultados_electorales 
-            WHERE tipo_eleccion != 'GOBERNADOR'
-            UNION ALL
-            SELECT 
-                nombre_candidato,
-                partido_ci,
-                tipo_eleccion,
-                division_territorial,
-                numero_de_votos,
-                anno
-            FROM gobernador_corregido;
-            """
-
-            self.data = pd.read_sql_query(query, conn)
-            conn.close()
-
-            # Crear características básicas inmediatamente
-            self._crear_caracteristicas_basicas()
-
+    def cargar_datos_completos(self, forzar=False):
+        """Cargar todos los datos electorales (una vez por ejecución, desde el cache compartido)"""
+        if self.data_enriquecido is not None and not forzar:
             return self.data_enriquecido
 
+        try:
+            if forzar:
+                recargar_datos(self.año)
+                self._estadisticas_simulacion = None
+            self.data = obtener_datos_enriquecidos(self.año, base_datos.version_datos(self.año))
         except Exception as e:
             st.error(f"Error cargando datos: {e}")
             return pd.DataFrame()
 
-    def _crear_caracteristicas_basicas(self):
-        """Crear características básicas para análisis"""
-        if self.data is None or len(self.data) == 0:
+        if len(self.data) == 0:
             st.warning("No hay datos para analizar")
-            return
-
-        df = self.data.copy()
-
-        # 1. Características simples del nombre
-        df['longitud_nombre'] = df['nombre_candidato'].str.len().fillna(0)
-        df['cantidad_palabras'] = df['nombre_candidato'].str.split().str.len().fillna(1)
-
-        # 2. Estadísticas por grupo para normalización
-        df['votos_normalizados'] = 0.5  # Valor por defecto
-
-        for tipo in df['tipo_eleccion'].unique():
-            mask = df['tipo_eleccion'] == tipo
-            votos_tipo = df.loc[mask, 'numero_de_votos']
-            if len(votos_tipo) > 1 and votos_tipo.max() > votos_tipo.min():
-                df.loc[mask, 'votos_normalizados'] = (
-                        (votos_tipo - votos_tipo.min()) / (votos_tipo.max() - votos_tipo.min())
-                )
-
-        # 3. Percentil de votos por tipo de elección
-        df['percentil_votos'] = 0.5  # Valor por defecto
-
-        for tipo in df['tipo_eleccion'].unique():
-            mask = df['tipo_eleccion'] == tipo
-            votos_tipo = df.loc[mask, 'numero_de_votos']
-            if len(votos_tipo) > 0:
-                df.loc[mask, 'percentil_votos'] = votos_tipo.rank(pct=True)
-
-        # 4. Categorizar éxito
-        df['categoria_exito'] = pd.cut(
-            df['percentil_votos'],
-            bins=[0, 0.25, 0.75, 1],
-            labels=['Bajo', 'Medio', 'Alto'],
-            include_lowest=True
-        )
-
-        # 5. Crear columna binaria para éxito
-        df['es_exitoso'] = (df['percentil_votos'] > 0.75).astype(int)
+            return self.data
 
-        self.data_enriquecido = df
+        self.data_enriquecido = self.data
         return self.data_enriquecido
 
     def verificar_columnas(self):
@@ -257,57 +252,43 @@ class AnalizadorElectoralAvanzado:
 
         return partidos_stats.sort_values('tasa_exito', ascending=False).head(top_n)
 
-    def simular_candidato(self, partido, tipo_eleccion, division, nombre_candidato, factor_popularidad=1.0):
-        """Simular el rendimiento de un candidato hipotético"""
+    def estadisticas_simulacion(self):
+        """Estadísticas base del simulador (se calculan una vez por carga de datos)"""
         if self.data_enriquecido is None:
             self.cargar_datos_completos()
 
-        if self.data_enriquecido is None:
-            return {
-                'error': 'No hay datos disponibles para simulación'
-            }
-
-        df = self.data_enriquecido
-
-        # Obtener estadísticas base
-        stats_partido = df[df['partido_ci'] == partido]
-        stats_tipo = df[df['tipo_eleccion'] == tipo_eleccion]
-
-        # Calcular votos base
-        if len(stats_partido) > 0:
-            votos_base = stats_partido['numero_de_votos'].mean()
-        else:
-            votos_base = df['numero_de_votos'].mean()
-
-        # Ajustar por factores
-        longitud_nombre = len(nombre_candidato)
-        factor_longitud = 1.0
+        if self.data_enriquecido is None or len(self.data_enriquecido) == 0:
+            return None
 
-        # Ajuste basado en longitud del nombre (datos históricos)
-        if longitud_nombre < 15:
-            factor_longitud = 0.9
-        elif longitud_nombre > 25:
-            factor_longitud = 0.95
-        else:
-            factor_longitud = 1.05
+        if self._estadisticas_simulacion is None:
+            self._estadisticas_simulacion = estadisticas_simulacion(self.data_enriquecido)
+        return self._estadisticas_simulacion
 
-        # Calcular votos proyectados
-        votos_proyectados = votos_base * factor_popularidad * factor_longitud
+    def simular_escenarios(self, escenarios, nombre_candidato):
+        """Simular una rejilla de escenarios (ver analisis_electoral.rejilla_escenarios)"""
+        estadisticas = self.estadisticas_simulacion()
+        if estadisticas is None:
+            return pd.DataFrame()
+        return simular_escenarios(estadisticas, escenarios, nombre_candidato)
 
-        # Calcular probabilidad de éxito
-        if len(stats_partido) > 0:
-            prob_exito_base = stats_partido['es_exitoso'].mean()
-        else:
-            prob_exito_base = df['es_exitoso'].mean()
+    def simular_candidato(self, partido, tipo_eleccion, division, nombre_candidato, factor_popularidad=1.0):
+        """Simular el rendimiento de un candidato hipotético"""
+        resultado = self.simular_escenarios(
+            rejilla_escenarios([partido], [tipo_eleccion], [division], [factor_popularidad]), nombre_candidato
+        )
 
-        prob_exito_ajustada = min(1.0, prob_exito_base * factor_popularidad * 1.1)
+        if len(resultado) == 0:
+            return {
+                'error': 'No hay datos disponibles para simulación'
+            }
 
+        fila = resultado.iloc[0]
         return {
-            'votos_proyectados': int(votos_proyectados),
-            'probabilidad_exito': prob_exito_ajustada,
-            'votos_base': votos_base,
-            'factor_longitud': factor_longitud,
-            'longitud_nombre': longitud_nombre
+            'votos_proyectados': int(fila['votos_proyectados']),
+            'probabilidad_exito': fila['probabilidad_exito'],
+            'votos_base': fila['votos_base'],
+            'factor_longitud': fila['factor_longitud'],
+            'longitud_nombre': int(fila['longitud_nombre'])
         }
 
 
@@ -325,7 +306,7 @@ with st.sidebar:
     st.subheader("🔧 Acciones Rápidas")
     if st.button("🔄 Recargar y Verificar Datos"):
         with st.spinner("Cargando y verificando datos..."):
-            datos = analizador.cargar_datos_completos()
+            datos = analizador.cargar_datos_completos(forzar=True)
             ok, mensaje = analizador.verificar_columnas()
             if ok:
                 st.success("✅ " + mensaje)
@@ -639,31 +620,77 @@ st.markdown("""
 **Compara diferentes configuraciones para optimizar tu estrategia electoral**
 """)
 
-col1, col2, col3 = st.columns(3)
+# Escenarios de referencia (factor de popularidad)
+ESCENARIOS_REFERENCIA = {'Conservador': 0.8, 'Moderado': 1.0, 'Optimista': 1.5}
+
+col1, col2 = st.columns([1, 2])
 
 with col1:
-    st.subheader("Escenario Conservador")
-    if st.button("Calcular Escenario 1", key="esc1"):
-        resultado = analizador.simular_candidato(partido_sim, tipo_sim, division_sim, nombre_sim, 0.8)
-        if 'error' not in resultado:
-            st.metric("Votos Proyectados", f"{resultado['votos_proyectados']:,}")
-            st.metric("Prob. Éxito", f"{resultado['probabilidad_exito']:.1%}")
+    partidos_escenario = st.multiselect(
+        "Partidos a comparar:",
+        options=datos_completos['partido_ci'].unique(),
+        default=[partido_sim],
+        key="partidos_escenario"
+    )
+    rango_factores = st.slider(
+        "Rango del factor de popularidad:",
+        min_value=0.1,
+        max_value=3.0,
+        value=(0.5, 2.0),
+        step=0.1,
+        key="rango_factores"
+    )
 
-with col2:
-    st.subheader("Escenario Moderado")
-    if st.button("Calcular Escenario 2", key="esc2"):
-        resultado = analizador.simular_candidato(partido_sim, tipo_sim, division_sim, nombre_sim, 1.0)
-        if 'error' not in resultado:
-            st.metric("Votos Proyectados", f"{resultado['votos_proyectados']:,}")
-            st.metric("Prob. Éxito", f"{resultado['probabilidad_exito']:.1%}")
-
-with col3:
-    st.subheader("Escenario Optimista")
-    if st.button("Calcular Escenario 3", key="esc3"):
-        resultado = analizador.simular_candidato(partido_sim, tipo_sim, division_sim, nombre_sim, 1.5)
-        if 'error' not in resultado:
-            st.metric("Votos Proyectados", f"{resultado['votos_proyectados']:,}")
-            st.metric("Prob. Éxito", f"{resultado['probabilidad_exito']:.1%}")
+# Toda la rejilla (partidos x factores) se simula en una sola pasada
+factores = np.round(np.arange(rango_factores[0], rango_factores[1] + 0.05, 0.1), 1)
+factores = np.union1d(factores, list(ESCENARIOS_REFERENCIA.values()))
+escenarios = analizador.simular_escenarios(
+    rejilla_escenarios(partidos_escenario or [partido_sim], [tipo_sim], [division_sim], factores), nombre_sim
+)
+
+if len(escenarios) > 0:
+    with col1:
+        referencia = escenarios[escenarios['factor_popularidad'].isin(ESCENARIOS_REFERENCIA.values())]
+        referencia = referencia.assign(
+            escenario=referencia['factor_popularidad'].map({v: k for k, v in ESCENARIOS_REFERENCIA.items()})
+        )
+        st.dataframe(
+            referencia[['partido_ci', 'escenario', 'factor_popularidad', 'votos_proyectados', 'probabilidad_exito']],
+            hide_index=True,
+            use_container_width=True
+        )
+
+    en_rango = escenarios[escenarios['factor_popularidad'].between(*rango_factores)]
+
+    with col2:
+        vista = st.radio("Vista:", ["Curva de sensibilidad", "Mapa de calor"], horizontal=True, key="vista_escenarios")
+
+        if vista == "Curva de sensibilidad":
+            fig_sensibilidad = px.line(
+                en_rango,
+                x='factor_popularidad',
+                y='votos_proyectados',
+                color='partido_ci',
+                markers=True,
+                hover_data={'probabilidad_exito': ':.1%'},
+                title='Votos proyectados según el factor de popularidad'
+            )
+            for nombre, factor in ESCENARIOS_REFERENCIA.items():
+                if rango_factores[0] <= factor <= rango_factores[1]:
+                    fig_sensibilidad.add_vline(x=factor, line_dash='dot', annotation_text=nombre)
+            st.plotly_chart(fig_sensibilidad, use_container_width=True)
+        else:
+            matriz = en_rango.pivot(index='partido_ci', columns='factor_popularidad', values='probabilidad_exito')
+            fig_calor = px.imshow(
+                matriz,
+                labels={'x': 'Factor de popularidad', 'y': 'Partido', 'color': 'Prob. éxito'},
+                color_continuous_scale='RdYlGn',
+                zmin=0,
+                zmax=1,
+                aspect='auto',
+                title='Probabilidad de éxito por partido y factor de popularidad'
+            )
+            st.plotly_chart(fig_calor, use_container_width=True)
 
 # SECCIÓN 6: TENDENCIAS Y PATRONES
 st.header("📈 Tendencias y Patrones")
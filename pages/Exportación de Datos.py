@@ -1,10 +1,13 @@
 import streamlit as st
 import pandas as pd
-import sqlite3
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime
-import base64
+
+import base_datos
+import exportacion
+from estadisticas import estadisticas_generales
+from tablas_derivadas import tablas_pendientes
 
 # Configurar la página
 st.set_page_config(
@@ -14,6 +17,13 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Las bases derivadas no se versionan: sin ellas la página no puede consultar nada
+faltantes = base_datos.bases_faltantes()
+if faltantes:
+    for año in faltantes:
+        st.error(f"❌ {base_datos.mensaje_base_faltante(año)}")
+    st.stop()
+
 # CSS personalizado
 st.markdown("""
 <style>
@@ -45,50 +55,29 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
-class DashboardElectoralCorregido:
-    def __init__(self, db_path='elecciones_nl_2021.db'):
-        self.db_path = db_path
-        self._crear_tabla_corregida()
-
-    def conectar(self):
-        """Conectar a la base de datos"""
-        return sqlite3.connect(self.db_path)
-
-    def _crear_tabla_corregida(self):
-        """Crear tabla corregida para gobernador si no existe"""
-        conn = self.conectar()
-
-        # Verificar si ya existe la tabla corregida
-        try:
-            conn.execute("SELECT 1 FROM gobernador_corregido LIMIT 1")
-        except:
-            # Crear tabla corregida para gobernador
-            conn.execute("""
-            CREATE TABLE gobernador_corregido AS
-            SELECT 
-                MIN(candidato_id) as candidato_id,
-                2021 as anno,
-                nombre_candidato,
-                SUM(numero_de_votos) as numero_de_votos,
-                'Nuevo León' as division_territorial,
-                MIN(nombre_normalizado) as nombre_normalizado,
-                MIN(partido_ci) as partido_ci,
-                'GOBERNADOR' as tipo_eleccion,
-                CURRENT_TIMESTAMP as created_at
-            FROM resultados_electorales 
-            WHERE tipo_eleccion = 'GOBERNADOR'
-            GROUP BY nombre_candidato
-            ORDER BY numero_de_votos DESC;
-            """)
-            conn.commit()
-            st.sidebar.success("✅ Tabla de gobernador corregida creada")
+COLUMNAS_EXPORTACION = (
+    "candidato_id, anno, nombre_candidato, numero_de_votos, division_territorial, "
+    "nombre_normalizado, partido_ci, tipo_eleccion, created_at"
+)
+
 
-        conn.close()
+class DashboardElectoralCorregido:
+    def __init__(self, año='2021'):
+        self.año = año
+        self._verificar_tabla_corregida()
+
+    def _verificar_tabla_corregida(self):
+        """Verificar que la carga haya construido gobernador_corregido (la página no escribe en la base)"""
+        if tablas_pendientes(self.año, ['gobernador_corregido']):
+            st.error(
+                "❌ La tabla gobernador_corregido no existe o es de una versión anterior. "
+                "Ejecuta `python tablas_derivadas.py` para construirla."
+            )
+            st.stop()
 
     def ejecutar_consulta(self, consulta, params=None):
         """Ejecutar consulta SQL"""
-        with self.conectar() as conn:
-            return pd.read_sql_query(consulta, conn, params=params)
+        return base_datos.consultar(self.año, consulta, params)
 
     def obtener_datos_gobernador_corregidos(self):
         """Obtener datos corregidos de gobernador (7 candidatos únicos)"""
@@ -108,74 +97,81 @@ class DashboardElectoralCorregido:
             return self.ejecutar_consulta(consulta, (tipo_eleccion,))
 
     def obtener_estadisticas_generales(self):
-        """Obtener estadísticas generales corregidas"""
-        # Para gobernador usar tabla corregida, para otros usar tabla original
-        consulta_otros = """
-        SELECT 
-            tipo_eleccion,
-            COUNT(*) as registros,
-            COUNT(DISTINCT nombre_candidato) as candidatos_unicos,
-            SUM(numero_de_votos) as total_votos
-        FROM resultados_electorales 
-        WHERE tipo_eleccion != 'GOBERNADOR'
-        GROUP BY tipo_eleccion;
-        """
-
-        consulta_gobernador = """
-        SELECT 
-            'GOBERNADOR' as tipo_eleccion,
-            COUNT(*) as registros,
-            COUNT(DISTINCT nombre_candidato) as candidatos_unicos,
-            SUM(numero_de_votos) as total_votos
-        FROM gobernador_corregido;
+        """Obtener estadísticas generales corregidas (precalculadas en la carga, desde cache)"""
+        return estadisticas_generales(self.año, fuente='corregido')
+
+    def consulta_todos_los_datos(self):
+        """SQL de todos los datos combinados (gobernador corregido + diputados y municipales)"""
+        return f"""
+        SELECT {COLUMNAS_EXPORTACION}, NULL as id FROM gobernador_corregido
+        UNION ALL
+        SELECT {COLUMNAS_EXPORTACION}, id FROM resultados_electorales WHERE tipo_eleccion = 'DIPUTADO'
+        UNION ALL
+        SELECT {COLUMNAS_EXPORTACION}, id FROM resultados_electorales WHERE tipo_eleccion = 'MUNICIPAL';
         """
 
-        stats_otros = self.ejecutar_consulta(consulta_otros)
-        stats_gobernador = self.ejecutar_consulta(consulta_gobernador)
-
-        stats_combinadas = pd.concat([stats_gobernador, stats_otros], ignore_index=True)
-
-        # Totales generales
-        total_registros = stats_combinadas['registros'].sum()
-        total_candidatos = stats_combinadas['candidatos_unicos'].sum()
-        total_votos = stats_combinadas['total_votos'].sum()
-        partidos_unicos = self.ejecutar_consulta(
-            "SELECT COUNT(DISTINCT partido_ci) as count FROM resultados_electorales;"
-        )['count'].iloc[0]
-        divisiones_unicas = self.ejecutar_consulta(
-            "SELECT COUNT(DISTINCT division_territorial) as count FROM resultados_electorales WHERE tipo_eleccion != 'GOBERNADOR';"
-        )['count'].iloc[0] + 1  # +1 por Nuevo León de gobernador
-
-        return {
-            'total_registros': total_registros,
-            'total_candidatos': total_candidatos,
-            'total_votos': total_votos,
-            'partidos_unicos': partidos_unicos,
-            'divisiones_unicas': divisiones_unicas,
-            'detalle_por_tipo': stats_combinadas
-        }
-
     def obtener_todos_los_datos(self):
         """Obtener todos los datos combinados (para exportación completa)"""
-        # Datos de gobernador corregidos
-        gobernador = self.obtener_datos_gobernador_corregidos()
+        return self.ejecutar_consulta(self.consulta_todos_los_datos())
 
-        # Datos de diputados y municipales
-        diputados = self.ejecutar_consulta("SELECT * FROM resultados_electorales WHERE tipo_eleccion = 'DIPUTADO';")
-        municipales = self.ejecutar_consulta("SELECT * FROM resultados_electorales WHERE tipo_eleccion = 'MUNICIPAL';")
-
-        # Combinar todos los datos
-        todos_los_datos = pd.concat([gobernador, diputados, municipales], ignore_index=True)
-        return todos_los_datos
+    def consulta_filtrada(self, tipo_eleccion, partidos=None, busqueda=None, columnas=None, limite=None):
+        """SQL y parámetros equivalentes a los filtros de la página (para exportar desde SQLite)"""
+        if tipo_eleccion == 'GOBERNADOR':
+            tabla, condiciones, params = 'gobernador_corregido', [], []
+        else:
+            tabla, condiciones, params = 'resultados_electorales', ['tipo_eleccion = ?'], [tipo_eleccion]
+
+        if partidos:
+            condiciones.append(f"partido_ci IN ({', '.join('?' * len(partidos))})")
+            params.extend(partidos)
+        if busqueda:
+            # Búsqueda literal sin distinguir mayúsculas, también en letras acentuadas
+            condiciones.append("instr(minusculas(nombre_candidato), ?) > 0")
+            params.append(busqueda.casefold())
+
+        if columnas:
+            seleccion = ', '.join(f'{columna} as "{alias}"' for columna, alias in columnas.items())
+        else:
+            seleccion = '*'
+        consulta = f"SELECT {seleccion} FROM {tabla}"
+        if condiciones:
+            consulta += " WHERE " + " AND ".join(condiciones)
+        consulta += " ORDER BY numero_de_votos DESC"
+        if limite is not None:
+            consulta += f" LIMIT {int(limite)}"
+        return consulta + ";", tuple(params)
+
+
+def boton_exportacion(etiqueta, clave, nombre_base, consulta=None, params=None, df=None):
+    """Generar el archivo solo al hacer clic y ofrecerlo con st.download_button
+
+    Las consultas se exportan por bloques desde SQLite (con cache en disco);
+    `df` es para resúmenes pequeños ya calculados en la página.
+    """
+    if df is not None:
+        firma = (formato_exportacion, int(pd.util.hash_pandas_object(df, index=False).sum()))
+    else:
+        firma = (formato_exportacion, consulta, tuple(params or ()))
 
+    if st.button(etiqueta, key=f"preparar_{clave}"):
+        st.session_state[f"exportacion_{clave}"] = firma
+    if st.session_state.get(f"exportacion_{clave}") != firma:
+        return
 
-# Función para crear enlace de descarga CSV
-def get_csv_download_link(df, filename, button_text="📥 Descargar CSV"):
-    """Generar un enlace para descargar DataFrame como CSV"""
-    csv = df.to_csv(index=False, encoding='utf-8')
-    b64 = base64.b64encode(csv.encode()).decode()
-    href = f'<a href="data:file/csv;base64,{b64}" download="{filename}" style="background-color: #4CAF50; color: white; padding: 10px 20px; text-align: center; text-decoration: none; display: inline-block; border-radius: 5px; margin: 5px;">{button_text}</a>'
-    return href
+    with st.spinner("Preparando archivo..."):
+        if df is not None:
+            datos = exportacion.exportar_dataframe(df, formato_exportacion)
+        else:
+            datos = exportacion.exportar_consulta(dashboard.año, consulta, params, formato_exportacion).read_bytes()
+
+    archivo = exportacion.nombre_archivo(nombre_base, formato_exportacion)
+    st.download_button(
+        f"📥 {archivo}",
+        datos,
+        file_name=archivo,
+        mime=exportacion.FORMATOS[formato_exportacion][1],
+        key=f"descargar_{clave}"
+    )
 
 
 # Instanciar el dashboard corregido
@@ -183,7 +179,7 @@ dashboard = DashboardElectoralCorregido()
 
 # HEADER PRINCIPAL
 st.markdown('<h1 class="main-header">📊 Dashboard Electoral NL 2021 - Corregido</h1>', unsafe_allow_html=True)
-st.success("✅ **Base de datos corregida**: 7 candidatos únicos a gobernador | ✅ **Exportación CSV habilitada**")
+st.success("✅ **Base de datos corregida**: 7 candidatos únicos a gobernador | ✅ **Exportación CSV, CSV.gz y Parquet habilitada**")
 
 # SIDEBAR CON OPCIONES DE EXPORTACIÓN
 with st.sidebar:
@@ -193,39 +189,35 @@ with st.sidebar:
     # SECCIÓN DE EXPORTACIÓN COMPLETA
     st.subheader("📤 Exportación Completa")
 
-    if st.button("💾 Exportar Base de Datos Completa"):
-        with st.spinner("Preparando archivo..."):
-            todos_los_datos = dashboard.obtener_todos_los_datos()
-            st.markdown(get_csv_download_link(
-                todos_los_datos,
-                f"base_datos_electoral_completa_{datetime.now().strftime('%Y%m%d')}.xlsx",
-                "💾 Descargar Base de Datos Completa"
-            ), unsafe_allow_html=True)
+    formato_exportacion = st.radio(
+        "Formato de exportación:",
+        options=list(exportacion.FORMATOS),
+        format_func=lambda formato: exportacion.FORMATOS[formato][2],
+        horizontal=True
+    )
+
+    boton_exportacion(
+        "💾 Exportar Base de Datos Completa",
+        "completa",
+        f"base_datos_electoral_completa_{datetime.now().strftime('%Y%m%d')}",
+        consulta=dashboard.consulta_todos_los_datos()
+    )
 
     # Exportaciones individuales
     st.subheader("📁 Exportar por Tipo")
 
     col1, col2, col3 = st.columns(3)
     with col1:
-        if st.button("🏛️ Gobernador"):
-            datos = dashboard.obtener_datos_gobernador_corregidos()
-            st.markdown(get_csv_download_link(
-                datos, "datos_gobernador_corregidos.xlsx", "📥 Gobernador"
-            ), unsafe_allow_html=True)
+        consulta, params = dashboard.consulta_filtrada('GOBERNADOR')
+        boton_exportacion("🏛️ Gobernador", "gobernador", "datos_gobernador_corregidos", consulta, params)
 
     with col2:
-        if st.button("📊 Diputados"):
-            datos = dashboard.obtener_datos_por_tipo('DIPUTADO')
-            st.markdown(get_csv_download_link(
-                datos, "datos_diputados.csv", "📥 Diputados"
-            ), unsafe_allow_html=True)
+        consulta, params = dashboard.consulta_filtrada('DIPUTADO')
+        boton_exportacion("📊 Diputados", "diputados", "datos_diputados", consulta, params)
 
     with col3:
-        if st.button("🏘️ Municipales"):
-            datos = dashboard.obtener_datos_por_tipo('MUNICIPAL')
-            st.markdown(get_csv_download_link(
-                datos, "datos_municipales.csv", "📥 Municipales"
-            ), unsafe_allow_html=True)
+        consulta, params = dashboard.consulta_filtrada('MUNICIPAL')
+        boton_exportacion("🏘️ Municipales", "municipales", "datos_municipales", consulta, params)
 
     st.markdown("---")
 
@@ -310,11 +302,10 @@ with st.expander("📋 Ver detalle por tipo de elección"):
     # Botón de exportación para el detalle
     col1, col2 = st.columns([3, 1])
     with col2:
-        st.markdown(get_csv_download_link(
-            stats['detalle_por_tipo'],
-            "estadisticas_por_tipo_eleccion.csv",
-            "📥 Exportar Estadísticas"
-        ), unsafe_allow_html=True)
+        boton_exportacion(
+            "📥 Exportar Estadísticas", "detalle_tipos", "estadisticas_por_tipo_eleccion",
+            df=stats['detalle_por_tipo']
+        )
 
 st.markdown("---")
 
@@ -331,8 +322,11 @@ else:
     datos_filtrados = datos_tipo
 
 if candidato_busqueda:
+    # Búsqueda literal y con casefold, igual que instr(minusculas(...)) de la exportación
     datos_filtrados = datos_filtrados[
-        datos_filtrados['nombre_candidato'].str.contains(candidato_busqueda, case=False, na=False)
+        datos_filtrados['nombre_candidato'].str.casefold().str.contains(
+            candidato_busqueda.casefold(), regex=False, na=False
+        )
     ]
 
 # Mostrar resumen de filtros
@@ -345,11 +339,8 @@ with col3:
     st.metric("Partidos", datos_filtrados['partido_ci'].nunique())
 with col4:
     # Botón de exportación para datos filtrados
-    st.markdown(get_csv_download_link(
-        datos_filtrados,
-        f"datos_{tipo_seleccionado.lower()}_filtrados.csv",
-        "📥 Exportar Datos"
-    ), unsafe_allow_html=True)
+    consulta, params = dashboard.consulta_filtrada(tipo_seleccionado, partido_seleccionado, candidato_busqueda)
+    boton_exportacion("📥 Exportar Datos", "filtrados", f"datos_{tipo_seleccionado.lower()}_filtrados", consulta, params)
 
 # SECCIÓN 3: GRÁFICOS ESPECÍFICOS POR TIPO DE ELECCIÓN
 if tipo_seleccionado == 'GOBERNADOR':
@@ -411,11 +402,10 @@ else:
         st.plotly_chart(fig_partidos, use_container_width=True)
 
         # Exportar datos por partido
-        st.markdown(get_csv_download_link(
-            por_partido,
-            f"resumen_partidos_{tipo_seleccionado.lower()}.csv",
-            "📥 Exportar Resumen Partidos"
-        ), unsafe_allow_html=True)
+        boton_exportacion(
+            "📥 Exportar Resumen Partidos", "resumen_partidos", f"resumen_partidos_{tipo_seleccionado.lower()}",
+            df=por_partido
+        )
 
 # SECCIÓN 4: TABLA DETALLADA CON MÚLTIPLES OPCIONES DE EXPORTACIÓN
 st.header("📋 Tabla Detallada de Resultados")
@@ -454,29 +444,31 @@ if columnas_seleccionadas:
 
     with col1:
         # Exportar datos mostrados
-        st.markdown(get_csv_download_link(
-            datos_mostrar,
-            f"tabla_{tipo_seleccionado.lower()}_mostrada.csv",
-            "📥 Exportar Tabla Mostrada"
-        ), unsafe_allow_html=True)
+        consulta, params = dashboard.consulta_filtrada(
+            tipo_seleccionado, partido_seleccionado, candidato_busqueda,
+            columnas={columna: columnas_disponibles[columna] for columna in columnas_seleccionadas}
+        )
+        boton_exportacion(
+            "📥 Exportar Tabla Mostrada", "tabla_mostrada", f"tabla_{tipo_seleccionado.lower()}_mostrada",
+            consulta, params
+        )
 
     with col2:
         # Exportar todos los datos del tipo
-        st.markdown(get_csv_download_link(
-            datos_filtrados,
-            f"datos_completos_{tipo_seleccionado.lower()}.csv",
-            "📥 Exportar Datos Completos"
-        ), unsafe_allow_html=True)
+        consulta, params = dashboard.consulta_filtrada(tipo_seleccionado, partido_seleccionado, candidato_busqueda)
+        boton_exportacion(
+            "📥 Exportar Datos Completos", "datos_completos", f"datos_completos_{tipo_seleccionado.lower()}",
+            consulta, params
+        )
 
     with col3:
         # Exportar top 100
-        top_100 = datos_filtrados.nlargest(100, 'numero_de_votos')[columnas_seleccionadas].rename(
-            columns=columnas_disponibles)
-        st.markdown(get_csv_download_link(
-            top_100,
-            f"top_100_{tipo_seleccionado.lower()}.csv",
-            "📥 Exportar Top 100"
-        ), unsafe_allow_html=True)
+        consulta, params = dashboard.consulta_filtrada(
+            tipo_seleccionado, partido_seleccionado, candidato_busqueda,
+            columnas={columna: columnas_disponibles[columna] for columna in columnas_seleccionadas},
+            limite=100
+        )
+        boton_exportacion("📥 Exportar Top 100", "top_100", f"top_100_{tipo_seleccionado.lower()}", consulta, params)
 
     with col4:
         # Exportar resumen estadístico
@@ -485,11 +477,9 @@ if columnas_seleccionadas:
             'Estadística': resumen_estadistico.index,
             'Valor': resumen_estadistico.values
         })
-        st.markdown(get_csv_download_link(
-            resumen_df,
-            f"estadisticas_{tipo_seleccionado.lower()}.csv",
-            "📊 Exportar Estadísticas"
-        ), unsafe_allow_html=True)
+        boton_exportacion(
+            "📊 Exportar Estadísticas", "estadisticas", f"estadisticas_{tipo_seleccionado.lower()}", df=resumen_df
+        )
 
 # SECCIÓN 5: EXPORTACIÓN AVANZADA
 with st.expander("🚀 Exportación Avanzada"):
@@ -500,24 +490,22 @@ with st.expander("🚀 Exportación Avanzada"):
     with col1:
         st.write("**Por Partido Político**")
         partido_export = st.selectbox("Seleccionar partido:", partidos)
-        if st.button("📥 Exportar Datos del Partido"):
-            datos_partido = datos_filtrados[datos_filtrados['partido_ci'] == partido_export]
-            st.markdown(get_csv_download_link(
-                datos_partido,
-                f"datos_{partido_export.lower().replace(' ', '_')}.csv",
-                f"📥 Descargar {partido_export}"
-            ), unsafe_allow_html=True)
+        if partido_export is not None:
+            consulta, params = dashboard.consulta_filtrada(tipo_seleccionado, [partido_export], candidato_busqueda)
+            boton_exportacion(
+                "📥 Exportar Datos del Partido", "partido", f"datos_{partido_export.lower().replace(' ', '_')}",
+                consulta, params
+            )
 
     with col2:
         st.write("**Top N Candidatos**")
         top_n = st.slider("Número de candidatos:", 10, 100, 20)
-        if st.button(f"📥 Exportar Top {top_n}"):
-            top_n_data = datos_filtrados.nlargest(top_n, 'numero_de_votos')
-            st.markdown(get_csv_download_link(
-                top_n_data,
-                f"top_{top_n}_{tipo_seleccionado.lower()}.csv",
-                f"📥 Descargar Top {top_n}"
-            ), unsafe_allow_html=True)
+        consulta, params = dashboard.consulta_filtrada(
+            tipo_seleccionado, partido_seleccionado, candidato_busqueda, limite=top_n
+        )
+        boton_exportacion(
+            f"📥 Exportar Top {top_n}", "top_n", f"top_{top_n}_{tipo_seleccionado.lower()}", consulta, params
+        )
 
 # FOOTER
 st.markdown("---")
@@ -525,6 +513,6 @@ st.markdown(
     "**Dashboard Corregido desarrollado con Streamlit** | "
     "Datos electorales Nuevo León 2021 | "
     "✅ **Problema de gobernador corregido** | "
-    "✅ **Exportación CSV habilitada** | "
+    "✅ **Exportación CSV, CSV.gz y Parquet habilitada** | "
     f"Última actualización: {datetime.now().strftime('%d/%m/%Y %H:%M')}"
 )
\ No newline at end of file
@@ -0,0 +1,67 @@
+"""Participación, votos nulos y abstención sobre arreglos de NumPy
+
+    participacion = total_votos / lista_nominal
+    tasa_nulos    = votos_nulos / total_votos
+    abstencion    = 1 - participacion (nunca menor que 0)
+
+Los niveles superiores se calculan con las sumas del nivel (no promediando
+porcentajes de casilla). Las casillas especiales tienen lista nominal 0: su
+participación es NaN, pero sus votos sí cuentan en la sección y el distrito,
+donde la participación puede pasar de 1 por los votantes en tránsito.
+"""
+import numpy as np
+import pandas as pd
+
+COLUMNAS_PARTICIPACION = ['participacion', 'tasa_nulos', 'abstencion']
+
+
+def indicadores_participacion(total_votos, votos_nulos, lista_nominal):
+    """(participacion, tasa_nulos, abstencion) como fracciones; NaN cuando el denominador es 0"""
+    total = np.asarray(total_votos, dtype='float64')
+    nulos = np.asarray(votos_nulos, dtype='float64')
+    lista = np.asarray(lista_nominal, dtype='float64')
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        participacion = np.where(lista > 0, total / lista, np.nan)
+        tasa_nulos = np.where(total > 0, nulos / total, np.nan)
+    abstencion = np.maximum(1 - participacion, 0)
+    return participacion, tasa_nulos, abstencion
+
+
+def participacion_por_nivel(casillas):
+    """Indicadores por casilla, sección y distrito a partir de las casillas
+
+    `casillas` tiene distrito_id, seccion, total_votos, votos_nulos y
+    lista_nominal. Las sumas por nivel se hacen con np.bincount sobre los
+    códigos de cada grupo, sin recorrer filas.
+    """
+    distrito = casillas['distrito_id'].to_numpy()
+    seccion = casillas['seccion'].to_numpy()
+    valores = {columna: casillas[columna].to_numpy(dtype='int64')
+               for columna in ('total_votos', 'votos_nulos', 'lista_nominal')}
+
+    niveles = {'casilla': casillas.assign(**dict(zip(
+        COLUMNAS_PARTICIPACION,
+        indicadores_participacion(valores['total_votos'], valores['votos_nulos'], valores['lista_nominal'])
+    )))}
+
+    # (distrito, sección) en un solo entero: np.unique sobre 1-D es mucho más rápido que con axis=0
+    base = int(seccion.max()) + 1 if len(seccion) else 1
+    for nivel, clave in (('seccion', distrito.astype('int64') * base + seccion), ('distrito', distrito)):
+        grupos, codigos = np.unique(clave, return_inverse=True)
+        sumas = {columna: np.bincount(codigos, weights=arreglo, minlength=len(grupos)).astype('int64')
+                 for columna, arreglo in valores.items()}
+
+        if nivel == 'seccion':
+            df = pd.DataFrame({'distrito_id': grupos // base, 'seccion': grupos % base})
+        else:
+            df = pd.DataFrame({'distrito_id': grupos})
+        df['casillas'] = np.bincount(codigos, minlength=len(grupos))
+        for columna, suma in sumas.items():
+            df[columna] = suma
+        indicadores = indicadores_participacion(sumas['total_votos'], sumas['votos_nulos'], sumas['lista_nominal'])
+        for columna, indicador in zip(COLUMNAS_PARTICIPACION, indicadores):
+            df[columna] = indicador
+        niveles[nivel] = df
+
+    return niveles
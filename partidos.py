@@ -0,0 +1,216 @@
+"""Dimensión de partidos compartida por las bases 2021 y 2024
+
+Las fuentes nombran distinto al mismo partido: los cómputos 2021 de diputación y
+gubernatura usan el nombre completo ("Movimiento Ciudadano", "Partido Accion
+Nacional") y los demás archivos las siglas ("MC", "PAN"). Todas las bases guardan
+el mismo catálogo, con ids enteros estables:
+
+    partidos              partido_id -> siglas, nombre, color, es_coalicion
+    alias_partidos        (anno, alias) -> partido_id: nombres de la fuente de cada año que no son siglas
+    coaliciones_partidos  (coalicion_id, partido_id): partidos que integran cada coalición
+
+La ingesta guarda el partido_id de cada fila de resultados_electorales, así que los
+filtros y agrupaciones por partido comparan enteros y no dependen del año.
+"""
+import pandas as pd
+
+import base_datos
+
+# (partido_id, siglas, nombre, color). Los ids no se reutilizan: solo se agregan al final.
+# Los ids 1-19 son las columnas del cómputo federal por casilla (casillas_federales.PARTIDOS_CASILLA).
+CATALOGO_PARTIDOS = [
+    (1, 'PAN', 'Partido Acción Nacional', '#0F6BB6'),  # Azul
+    (2, 'PRI', 'Partido Revolucionario Institucional', '#009640'),  # Verde
+    (3, 'PRD', 'Partido de la Revolución Democrática', '#FFDE00'),  # Amarillo
+    (4, 'PVEM', 'Partido Verde Ecologista de México', '#00A650'),  # Verde claro
+    (5, 'PT', 'Partido del Trabajo', '#EE3D44'),  # Rojo
+    (6, 'MC', 'Movimiento Ciudadano', '#F58220'),  # Naranja
+    (7, 'MORENA', 'Morena', '#B52E6E'),  # Magenta
+    (8, 'PES', 'Partido Encuentro Solidario', '#8EC641'),  # Verde lima
+    (9, 'RSP', 'Redes Sociales Progresistas', '#FFD100'),  # Amarillo oro
+    (10, 'FXM', 'Fuerza por México', '#8B008B'),  # Púrpura oscuro
+    (11, 'CI', 'Candidatura independiente', '#A9A9A9'),  # Gris
+
+    # Coaliciones federales 2021
+    (12, 'PAN-PRI-PRD', 'Va por México', '#2F5F8A'),
+    (13, 'PAN-PRI', 'PAN-PRI', '#3A7D8C'),
+    (14, 'PAN-PRD', 'PAN-PRD', '#7FA05A'),
+    (15, 'PRI-PRD', 'PRI-PRD', '#80BA20'),
+    (16, 'PVEM-PT-MORENA', 'Juntos Hacemos Historia', '#8C2A5B'),
+    (17, 'PVEM-PT', 'PVEM-PT', '#F7714A'),
+    (18, 'PVEM-MORENA', 'PVEM-MORENA', '#5A6A5F'),
+    (19, 'PT-MORENA', 'PT-MORENA', '#D13659'),
+
+    # Partidos locales NL
+    (20, 'PANAL', 'Partido Nueva Alianza Nuevo León', '#00A3AD'),  # Turquesa oscuro
+    (21, 'FCXNL', 'Fuerza Civil', '#6A1E55'),  # Morado
+    (22, 'VIDA', 'Vida', '#FF6B00'),  # Naranja fuerte
+    (23, 'ESO', 'Esperanza Social', '#8B4513'),  # Café
+    (24, 'PL', 'Partido Liberal', '#FF69B4'),  # Rosa
+    (25, 'PJ', 'Partido Justicialista', '#800080'),  # Púrpura
+
+    # Coaliciones locales NL
+    (26, 'JHHNL', 'Juntos Haremos Historia en Nuevo León', '#9E3D6E'),
+    (27, 'VFXNL', 'Va Fuerte por Nuevo León', '#4CA64C'),
+    (28, 'SHHNL', 'Sigamos Haciendo Historia en Nuevo León', '#00A2B8'),  # Turquesa
+
+    # Candidaturas independientes
+    (29, 'CAND_IND_1', 'Candidatura independiente 1', '#A9A9A9'),  # Gris
+]
+
+# Coalición -> partidos que la integran
+COALICIONES = {
+    'PAN-PRI-PRD': ['PAN', 'PRI', 'PRD'],
+    'PAN-PRI': ['PAN', 'PRI'],
+    'PAN-PRD': ['PAN', 'PRD'],
+    'PRI-PRD': ['PRI', 'PRD'],
+    'PVEM-PT-MORENA': ['PVEM', 'PT', 'MORENA'],
+    'PVEM-PT': ['PVEM', 'PT'],
+    'PVEM-MORENA': ['PVEM', 'MORENA'],
+    'PT-MORENA': ['PT', 'MORENA'],
+    'JHHNL': ['MORENA', 'PT', 'PVEM', 'PANAL'],
+    'VFXNL': ['PRI', 'PRD'],
+    # En 2024 MORENA y PVEM no postulan por separado donde compite SHHNL (PT sí)
+    'SHHNL': ['MORENA', 'PVEM'],
+}
+
+# Nombres de la fuente que no son siglas, por año -> siglas
+ALIAS_PARTIDOS = {
+    '2021': {
+        'Partido Accion Nacional': 'PAN',
+        'Partido Verde Ecologista de Mexico': 'PVEM',
+        'Partido del Trabajo': 'PT',
+        'Movimiento Ciudadano': 'MC',
+        'Partido Encuentro Solidario': 'PES',
+        'Redes Sociales Progresistas': 'RSP',
+        'Fuerza por Mexico': 'FXM',
+        'Partido Nueva Alianza Nuevo Leon': 'PANAL',
+        'Juntos Haremos Historia en Nuevo Leon': 'JHHNL',
+        'Va Fuerte por Nuevo Leon': 'VFXNL',
+        'CANDIDATURA INDEPENDIENTE 1': 'CAND_IND_1',
+    },
+    '2024': {},
+}
+
+ID_PARTIDO = {siglas: partido_id for partido_id, siglas, _, _ in CATALOGO_PARTIDOS}
+
+CREAR_TABLAS = [
+    """
+    CREATE TABLE IF NOT EXISTS partidos (
+        partido_id INTEGER PRIMARY KEY,
+        siglas VARCHAR(50) UNIQUE NOT NULL,
+        nombre VARCHAR(150),
+        color VARCHAR(7),
+        es_coalicion INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS alias_partidos (
+        anno INTEGER NOT NULL,
+        alias VARCHAR(150) NOT NULL,
+        partido_id INTEGER NOT NULL REFERENCES partidos(partido_id),
+        PRIMARY KEY (anno, alias)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS coaliciones_partidos (
+        coalicion_id INTEGER NOT NULL REFERENCES partidos(partido_id),
+        partido_id INTEGER NOT NULL REFERENCES partidos(partido_id),
+        PRIMARY KEY (coalicion_id, partido_id)
+    ) WITHOUT ROWID
+    """,
+]
+
+GUARDAR_PARTIDO = """
+    INSERT INTO partidos (partido_id, siglas, nombre, color, es_coalicion) VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(partido_id) DO UPDATE SET
+        siglas = excluded.siglas,
+        nombre = excluded.nombre,
+        color = excluded.color,
+        es_coalicion = excluded.es_coalicion
+"""
+
+
+def sincronizar_catalogo(conn):
+    """Crear las tablas de la dimensión y dejarlas igual al catálogo (sin manejar la transacción)
+
+    La tabla partidos de las bases con cómputo por casilla es anterior a nombre y
+    color: se agregan las columnas y se conservan sus ids.
+    """
+    for sentencia in CREAR_TABLAS:
+        conn.execute(sentencia)
+    columnas = {fila[1] for fila in conn.execute("PRAGMA table_info(partidos)")}
+    for columna, tipo in (('nombre', 'VARCHAR(150)'), ('color', 'VARCHAR(7)')):
+        if columna not in columnas:
+            conn.execute(f"ALTER TABLE partidos ADD COLUMN {columna} {tipo}")
+
+    conn.executemany(GUARDAR_PARTIDO, (
+        (partido_id, siglas, nombre, color, int(siglas in COALICIONES))
+        for partido_id, siglas, nombre, color in CATALOGO_PARTIDOS
+    ))
+
+    conn.execute("DELETE FROM alias_partidos")
+    conn.executemany(
+        "INSERT INTO alias_partidos (anno, alias, partido_id) VALUES (?, ?, ?)",
+        ((int(año), alias, ID_PARTIDO[siglas])
+         for año, alias_año in ALIAS_PARTIDOS.items() for alias, siglas in alias_año.items())
+    )
+
+    conn.execute("DELETE FROM coaliciones_partidos")
+    conn.executemany(
+        "INSERT INTO coaliciones_partidos (coalicion_id, partido_id) VALUES (?, ?)",
+        ((ID_PARTIDO[coalicion], ID_PARTIDO[miembro])
+         for coalicion, miembros in COALICIONES.items() for miembro in miembros)
+    )
+
+
+def id_por_nombre(año=None):
+    """{nombre de la fuente: partido_id} con las siglas y los alias del año (de todos los años si es None)"""
+    nombres = dict(ID_PARTIDO)
+    for año_alias, alias_año in ALIAS_PARTIDOS.items():
+        if año is None or str(año) == año_alias:
+            nombres.update({alias: ID_PARTIDO[siglas] for alias, siglas in alias_año.items()})
+    return nombres
+
+
+def identificar_partidos(nombres, años):
+    """partido_id de cada fila a partir del nombre de la fuente y el año
+
+    Se resuelven solo los pares (año, nombre) únicos. Un nombre que no está en el
+    catálogo es un error: ninguna fila entra a la base sin partido.
+    """
+    if nombres.empty:  # base recién creada: MultiIndex no acepta arreglos vacíos
+        return pd.Series(dtype='int64', index=nombres.index, name='partido_id')
+
+    codigos, pares = pd.factorize(pd.MultiIndex.from_arrays([pd.Series(años, index=nombres.index).astype(str),
+                                                             nombres]))
+    nombres_por_año = {año: id_por_nombre(año) for año in pares.get_level_values(0).unique()}
+    ids = [nombres_por_año[año].get(nombre) for año, nombre in pares]
+
+    faltantes = sorted({f"{nombre} ({año})" for (año, nombre), partido_id in zip(pares, ids) if partido_id is None})
+    if faltantes:
+        raise ValueError(f"Partidos sin registro en el catálogo (partidos.py): {faltantes}")
+
+    return pd.Series(pd.Series(ids, dtype='int64').to_numpy()[codigos], index=nombres.index, name='partido_id')
+
+
+def colores_partidos(año):
+    """{nombre de la fuente: color} para los partidos de la base de un año (siglas y alias del año)"""
+    df = base_datos.consultar(año, """
+        SELECT siglas as nombre, color FROM partidos
+        UNION ALL
+        SELECT a.alias, p.color
+        FROM alias_partidos a
+        JOIN partidos p ON p.partido_id = a.partido_id
+        WHERE a.anno = ?
+    """, (int(año),))
+    return dict(df.itertuples(index=False, name=None))
+
+
+def miembros_coaliciones(conn):
+    """{coalicion_id: [partido_id, ...]} leído de la dimensión de una conexión"""
+    miembros = {}
+    for coalicion_id, partido_id in conn.execute(
+            "SELECT coalicion_id, partido_id FROM coaliciones_partidos ORDER BY coalicion_id, partido_id"):
+        miembros.setdefault(coalicion_id, []).append(partido_id)
+    return miembros
@@ -5,6 +5,9 @@ import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime
 
+import base_datos
+from estadisticas import estadisticas_generales
+
 # Configurar la página
 st.set_page_config(
     page_title="Dashboard Electoral NL 2021",
@@ -13,6 +16,13 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Las bases derivadas no se versionan: sin ellas la página no puede consultar nada
+faltantes = base_datos.bases_faltantes(['2021'])
+if faltantes:
+    for año in faltantes:
+        st.error(f"❌ {base_datos.mensaje_base_faltante(año)}")
+    st.stop()
+
 # CSS personalizado
 st.markdown("""
 <style>
@@ -46,17 +56,8 @@ class DashboardElectoral:
             return pd.read_sql_query(consulta, conn, params=params)
 
     def obtener_estadisticas_generales(self):
-        """Obtener estadísticas generales"""
-        consulta = """
-        SELECT 
-            COUNT(*) as total_registros,
-            COUNT(DISTINCT partido_ci) as partidos_unicos,
-            COUNT(DISTINCT tipo_eleccion) as tipos_eleccion,
-            COUNT(DISTINCT division_territorial) as divisiones_unicas,
-            SUM(numero_de_votos) as total_votos
-        FROM resultados_electorales;
-        """
-        return self.ejecutar_consulta(consulta).iloc[0]
+        """Obtener estadísticas generales (precalculadas en la carga, desde cache)"""
+        return estadisticas_generales(self.db_path, fuente='original')
 
 
 # Instanciar el dashboard
@@ -0,0 +1,177 @@
+"""Generar una réplica local estática de R02D.htm para probar el scraper sin red
+
+La réplica reproduce lo que usa Bien2o.py: los dropdowns dDistrito, dSeccion y
+dCasilla con opciones `a.dropdown-item`, y los resultados en `p.votos` y
+`p.col-12 cantidad`. Los datos salen de las casillas ya descargadas (almacén
+consolidado o CSV por casilla) más distritos sintéticos opcionales.
+
+Uso:
+    python replica_computo/generar_replica.py                     # solo los CSV descargados
+    python replica_computo/generar_replica.py --sinteticos 8      # + 8 distritos de prueba
+    python Bien2o.py --url file://$PWD/replica_computo/R02D.htm --workers 4
+"""
+import argparse
+import glob
+import json
+import sqlite3
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+DIRECTORIO = Path(__file__).resolve().parent
+TOTAL_PARTIDOS = 16
+TOTAL_EXTRAS = 3
+
+PLANTILLA = """<!DOCTYPE html>
+<html lang="es">
+<head>
+<meta charset="utf-8">
+<title>Réplica local - Cómputos 2024 Diputaciones</title>
+<style>
+  .dropdown-menu { display: none; border: 1px solid #ccc; max-height: 300px; overflow: auto; }
+  .dropdown-menu.show { display: block; }
+  .dropdown-item { display: block; padding: 2px 8px; cursor: pointer; }
+  #resultados p { display: inline-block; margin: 4px; }
+</style>
+</head>
+<body>
+<div class="dropdown"><button id="dDistrito" type="button">Distrito</button><div class="dropdown-menu"></div></div>
+<div class="dropdown"><button id="dSeccion" type="button" disabled>Sección</button><div class="dropdown-menu"></div></div>
+<div class="dropdown"><button id="dCasilla" type="button" disabled>Casilla</button><div class="dropdown-menu"></div></div>
+<div id="resultados"></div>
+<script>
+const DATOS = __DATOS__;
+const RETRASO_MS = __RETRASO__;
+const seleccion = {};
+
+function menu(id) { return document.getElementById(id).nextElementSibling; }
+
+function llenarMenu(id, opciones) {
+  const contenedor = menu(id);
+  contenedor.innerHTML = '';
+  for (const texto of opciones) {
+    const a = document.createElement('a');
+    a.className = 'dropdown-item';
+    a.textContent = texto;
+    a.onclick = () => elegir(id, texto);
+    contenedor.appendChild(a);
+  }
+}
+
+function habilitar(id, opciones) {
+  const boton = document.getElementById(id);
+  boton.disabled = opciones === null;
+  llenarMenu(id, opciones || []);
+}
+
+function mostrarResultados(registro) {
+  const div = document.getElementById('resultados');
+  div.innerHTML = '';
+  if (!registro) return;
+  for (const v of registro.votos) {
+    const p = document.createElement('p'); p.className = 'votos'; p.textContent = v; div.appendChild(p);
+  }
+  for (const v of registro.extras) {
+    const p = document.createElement('p'); p.className = 'col-12 cantidad'; p.textContent = v; div.appendChild(p);
+  }
+}
+
+function elegir(id, texto) {
+  document.getElementById(id).textContent = texto;
+  menu(id).classList.remove('show');
+  // Mientras cargan los datos los dropdowns dependientes quedan deshabilitados y sin resultados
+  if (id === 'dDistrito') habilitar('dSeccion', null);
+  if (id !== 'dCasilla') habilitar('dCasilla', null);
+  mostrarResultados(null);
+  // La página real carga datos después de cada selección; la réplica simula esa latencia
+  setTimeout(() => {
+    if (id === 'dDistrito') {
+      seleccion.distrito = texto;
+      habilitar('dSeccion', texto in DATOS ? Object.keys(DATOS[texto]) : null);
+    } else if (id === 'dSeccion') {
+      seleccion.seccion = texto;
+      habilitar('dCasilla', Object.keys(DATOS[seleccion.distrito][texto]));
+    } else {
+      mostrarResultados(DATOS[seleccion.distrito][seleccion.seccion][texto]);
+    }
+  }, RETRASO_MS);
+}
+
+for (const id of ['dDistrito', 'dSeccion', 'dCasilla']) {
+  document.getElementById(id).onclick = () => {
+    for (const otro of document.querySelectorAll('.dropdown-menu.show')) {
+      if (otro !== menu(id)) otro.classList.remove('show');
+    }
+    menu(id).classList.toggle('show');
+  };
+}
+llenarMenu('dDistrito', ['Todos'].concat(Object.keys(DATOS)));
+</script>
+</body>
+</html>
+"""
+
+
+def datos_descargados(almacen=DIRECTORIO.parent / 'casillas_2024_diputaciones.db',
+                      patron='Elecciones_2024_diputaciones_*.csv'):
+    """{distrito: {sección: {casilla: {votos, extras}}}} a partir de las casillas ya descargadas
+
+    Se leen del almacén consolidado si existe; si no, de los CSV por casilla.
+    """
+    if Path(almacen).exists():
+        with sqlite3.connect(almacen) as conn:
+            tabla = pd.read_sql_query("SELECT * FROM casillas_raspadas", conn).drop(columns='raspado_at')
+        # La página muestra los votos con separador de miles ("1,013")
+        votos = tabla.columns[3:]
+        tabla[votos] = tabla[votos].apply(lambda columna: columna.map('{:,}'.format))
+        tablas = [tabla]
+    else:
+        tablas = [pd.read_csv(archivo, dtype=str) for archivo in sorted(glob.glob(str(DIRECTORIO.parent / patron)))]
+
+    datos = {}
+    for tabla in tablas:
+        for valores in tabla.astype(str).itertuples(index=False, name=None):
+            datos.setdefault(valores[0], {}).setdefault(valores[1], {})[valores[2]] = {
+                'votos': list(valores[3:3 + TOTAL_PARTIDOS]),
+                'extras': list(valores[3 + TOTAL_PARTIDOS:3 + TOTAL_PARTIDOS + TOTAL_EXTRAS]),
+            }
+    return datos
+
+
+def datos_sinteticos(distritos, secciones=5, casillas=('Casilla Basica', 'Casilla Contigua 1'), semilla=0):
+    """Distritos de prueba con votos aleatorios"""
+    rng = np.random.default_rng(semilla)
+    datos = {}
+    for d in range(distritos):
+        distrito = f"{100 + d}. Distrito Sintético {d + 1}"
+        for s in range(secciones):
+            seccion = f"Sección {9000 + d * secciones + s}"
+            for casilla in casillas:
+                datos.setdefault(distrito, {}).setdefault(seccion, {})[casilla] = {
+                    'votos': [str(v) for v in rng.integers(0, 300, TOTAL_PARTIDOS)],
+                    'extras': [str(v) for v in rng.integers(0, 50, TOTAL_EXTRAS)],
+                }
+    return datos
+
+
+def generar_replica(sinteticos=0, retraso_ms=300, salida=DIRECTORIO / 'R02D.htm'):
+    """Escribir la réplica y devolver el número de casillas que contiene"""
+    datos = datos_descargados()
+    datos.update(datos_sinteticos(sinteticos))
+
+    html = PLANTILLA.replace('__DATOS__', json.dumps(datos, ensure_ascii=False)).replace(
+        '__RETRASO__', str(retraso_ms))
+    Path(salida).write_text(html, encoding='utf-8')
+
+    return sum(len(casillas) for secciones in datos.values() for casillas in secciones.values())
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Generar la réplica local de R02D.htm")
+    parser.add_argument('--sinteticos', type=int, default=0, help="Distritos sintéticos adicionales")
+    parser.add_argument('--retraso-ms', type=int, default=300, help="Latencia simulada por selección")
+    args = parser.parse_args()
+
+    casillas = generar_replica(args.sinteticos, args.retraso_ms)
+    print(f"✅ Réplica generada: {DIRECTORIO / 'R02D.htm'} ({casillas} casillas)")
@@ -0,0 +1,186 @@
+"""Snapshots columnares (Arrow IPC o Parquet) de las bases electorales
+
+Cada tabla se guarda como dataset particionado por anno/tipo_eleccion (cuando
+tiene esas columnas) con partido_ci, division_territorial y tipo_eleccion
+codificadas como diccionario. leer_tabla lee los snapshots Arrow con memory map,
+sin copiar los datos.
+
+Es un formato de exportación para análisis fuera de la plataforma (pandas,
+pyarrow, Spark...): los dashboards siguen consultando los archivos .db, porque
+todas sus consultas son SQL de SQLite.
+
+Uso:
+    python snapshots.py                                # snapshot Arrow de todas las bases en snapshots/
+    python snapshots.py --formato parquet --destino exportaciones/
+"""
+import argparse
+import base64
+import json
+import shutil
+from datetime import datetime
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.fs as pafs
+
+import base_datos
+
+DIRECTORIO_SNAPSHOTS = 'snapshots'
+VERSION_SNAPSHOT = 2
+ARCHIVO_MANIFIESTO = 'manifiesto.json'
+TAMAÑO_LOTE = 50_000
+
+# formato -> formato de pyarrow.dataset
+FORMATOS_SNAPSHOT = {'arrow': 'ipc', 'parquet': 'parquet'}
+COLUMNAS_DICCIONARIO = ['partido_ci', 'division_territorial', 'tipo_eleccion']
+COLUMNAS_PARTICION = ['anno', 'tipo_eleccion']
+
+# Tablas internas de SQLite o de la carga que no interesan fuera de la plataforma
+TABLAS_EXCLUIDAS = {'manifiesto_ingesta'}
+
+
+def _tablas_sqlite(conn):
+    """Tablas de la base, en el orden en que se crearon"""
+    return [fila[0] for fila in conn.execute("""
+        SELECT name FROM sqlite_master
+        WHERE type = 'table' AND name NOT LIKE 'sqlite_%'
+        ORDER BY rowid
+    """)]
+
+
+def leer_sqlite(conn, nombre, tamaño_lote=TAMAÑO_LOTE):
+    """Tabla Arrow con el contenido de una tabla SQLite
+
+    Se arma desde el cursor (no desde pandas): así los buffers son de Arrow y no
+    de NumPy, y los enteros con NULL no se vuelven float. Las filas se leen por
+    lotes, así que en Python solo vive un lote a la vez.
+    """
+    cursor = conn.execute(f'SELECT * FROM "{nombre}"')
+    columnas = [descripcion[0] for descripcion in cursor.description]
+    lotes = []
+    while filas := cursor.fetchmany(tamaño_lote):
+        lotes.append(pa.table(dict(zip(columnas, (pa.array(valores) for valores in zip(*filas))))))
+    if not lotes:
+        return pa.table({columna: pa.array([], type=pa.null()) for columna in columnas})
+    # Un lote con una columna toda NULL la infiere como null: se promueve al tipo de los demás
+    return pa.concat_tables(lotes, promote_options='permissive').combine_chunks()
+
+
+def codificar_diccionarios(tabla):
+    """Codificar como diccionario las columnas de baja cardinalidad"""
+    for columna in COLUMNAS_DICCIONARIO:
+        if columna in tabla.column_names:
+            indice = tabla.column_names.index(columna)
+            tabla = tabla.set_column(indice, columna, pc.dictionary_encode(tabla[columna]))
+    return tabla
+
+
+def _esquema_a_texto(esquema):
+    return base64.b64encode(esquema.serialize().to_pybytes()).decode('ascii')
+
+
+def _esquema_desde_texto(texto):
+    return pa.ipc.read_schema(pa.py_buffer(base64.b64decode(texto)))
+
+
+def escribir_snapshot(año, destino=DIRECTORIO_SNAPSHOTS, formato='arrow'):
+    """Escribir el snapshot de un año en destino/año; reemplaza el anterior al terminar"""
+    if formato not in FORMATOS_SNAPSHOT:
+        raise ValueError(f"Formato de snapshot no soportado: {formato}")
+
+    directorio = Path(destino) / str(año)
+    temporal = Path(destino) / f".{año}.tmp"
+    shutil.rmtree(temporal, ignore_errors=True)
+    temporal.mkdir(parents=True)
+
+    manifiesto = {
+        'version': VERSION_SNAPSHOT,
+        'año': str(año),
+        'formato': formato,
+        'fuente': list(base_datos.version_datos(año)),
+        'creado_at': datetime.now().isoformat(timespec='seconds'),
+        'tablas': {}
+    }
+
+    with base_datos.conectar(año) as conn:
+        manifiesto['version_esquema'] = conn.execute("PRAGMA user_version").fetchone()[0]
+
+        for nombre in _tablas_sqlite(conn):
+            if nombre in TABLAS_EXCLUIDAS:
+                continue
+
+            tabla = codificar_diccionarios(leer_sqlite(conn, nombre))
+            particiones = [c for c in COLUMNAS_PARTICION if c in tabla.column_names]
+            if len(particiones) != len(COLUMNAS_PARTICION):
+                particiones = []
+
+            ds.write_dataset(
+                tabla,
+                temporal / nombre,
+                format=FORMATOS_SNAPSHOT[formato],
+                partitioning=ds.partitioning(
+                    pa.schema([tabla.schema.field(c) for c in particiones]), flavor='hive'
+                ) if particiones else None,
+                existing_data_behavior='overwrite_or_ignore'
+            )
+            manifiesto['tablas'][nombre] = {
+                'filas': tabla.num_rows,
+                'particiones': particiones,
+                'esquema': _esquema_a_texto(tabla.schema)
+            }
+
+    with open(temporal / ARCHIVO_MANIFIESTO, 'w', encoding='utf-8') as archivo:
+        json.dump(manifiesto, archivo, ensure_ascii=False, indent=2)
+
+    shutil.rmtree(directorio, ignore_errors=True)
+    temporal.rename(directorio)
+    return directorio
+
+
+def leer_manifiesto(directorio, año):
+    with open(Path(directorio) / str(año) / ARCHIVO_MANIFIESTO, encoding='utf-8') as archivo:
+        manifiesto = json.load(archivo)
+    if manifiesto.get('version') != VERSION_SNAPSHOT:
+        raise ValueError(
+            f"Snapshot {año} con versión {manifiesto.get('version')}, se esperaba {VERSION_SNAPSHOT}: "
+            f"regenerarlo con python snapshots.py"
+        )
+    return manifiesto
+
+
+def leer_tabla(directorio, año, tabla, manifiesto=None):
+    """Tabla Arrow del snapshot (los archivos Arrow se leen con memory map, sin copia)"""
+    manifiesto = manifiesto or leer_manifiesto(directorio, año)
+    info = manifiesto['tablas'][tabla]
+    esquema = _esquema_desde_texto(info['esquema'])
+    if not info['filas']:
+        return esquema.empty_table()
+
+    dataset = ds.dataset(
+        Path(directorio) / str(año) / tabla,
+        format=FORMATOS_SNAPSHOT[manifiesto['formato']],
+        partitioning=ds.HivePartitioning.discover(infer_dictionary=True) if info['particiones'] else None,
+        filesystem=pafs.LocalFileSystem(use_mmap=True)
+    )
+    # Las columnas de partición vuelven al final y como diccionario: restaurar orden y tipos
+    return dataset.to_table().select(esquema.names).cast(esquema)
+
+
+def leer_dataframe(directorio, año, tabla):
+    """DataFrame del snapshot; las columnas de diccionario llegan como categorías"""
+    return leer_tabla(directorio, año, tabla).to_pandas()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Generar snapshots Arrow/Parquet de las bases electorales")
+    parser.add_argument('--formato', choices=list(FORMATOS_SNAPSHOT), default='arrow')
+    parser.add_argument('--destino', default=DIRECTORIO_SNAPSHOTS)
+    parser.add_argument('años', nargs='*', default=list(base_datos.BASES_DATOS))
+    args = parser.parse_args()
+
+    for año in args.años:
+        directorio = escribir_snapshot(año, args.destino, args.formato)
+        tamaño = sum(archivo.stat().st_size for archivo in directorio.rglob('*') if archivo.is_file())
+        print(f"✅ Snapshot {año} ({args.formato}) en {directorio}: {tamaño / 1024:.0f} KB")
@@ -0,0 +1,679 @@
+"""Tablas derivadas que se construyen durante la carga (nunca desde la UI)
+
+Cada tabla tiene una versión de definición registrada en `tablas_derivadas`; si
+la definición cambia se sube la versión y la tabla se reconstruye en la
+siguiente carga. La UI solo verifica versiones (tablas_pendientes).
+
+Uso:
+    python tablas_derivadas.py          # actualiza las tablas derivadas de todas las bases
+"""
+import sqlite3
+import zlib
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+import base_datos
+from coaliciones import distribuir_votos_casilla
+from participacion import COLUMNAS_PARTICIPACION, indicadores_participacion
+from partidos import miembros_coaliciones
+
+# Registro de versión de cada tabla derivada
+CREAR_TABLA_VERSIONES = """
+    CREATE TABLE IF NOT EXISTS tablas_derivadas (
+        tabla TEXT PRIMARY KEY,
+        version INTEGER NOT NULL,
+        firma TEXT,
+        actualizado_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+# Tabla materializada de ganadores por división (con segundo lugar, margen y total)
+CREAR_TABLA_GANADORES = """
+    CREATE TABLE IF NOT EXISTS ganadores (
+        tipo_eleccion VARCHAR(20) NOT NULL,
+        division_territorial VARCHAR(150) NOT NULL,
+        nombre_candidato VARCHAR(300),
+        partido_ci VARCHAR(150),
+        partido_id INTEGER,
+        numero_de_votos INTEGER,
+        segundo_candidato VARCHAR(300),
+        segundo_partido VARCHAR(150),
+        segundo_partido_id INTEGER,
+        votos_segundo INTEGER,
+        margen INTEGER,
+        total_votos INTEGER,
+        firma TEXT NOT NULL,
+        actualizado_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (tipo_eleccion, division_territorial)
+    )
+"""
+
+CREAR_INDICES_GANADORES = """
+    CREATE INDEX IF NOT EXISTS idx_ganadores_tipo_votos ON ganadores(tipo_eleccion, numero_de_votos DESC)
+"""
+
+# Firma por división: cambia si se agregan, eliminan o modifican registros de la división.
+# huella() cubre el texto que se copia a ganadores (un nombre corregido con el mismo largo también cuenta)
+FIRMAS_DIVISIONES = """
+    SELECT
+        tipo_eleccion,
+        division_territorial,
+        COUNT(*) || ':' || TOTAL(numero_de_votos) || ':' || TOTAL(id * numero_de_votos) || ':' ||
+            MAX(id) || ':' || TOTAL(id * partido_id) || ':' ||
+            SUM(huella(id, nombre_candidato, partido_ci)) as firma
+    FROM resultados_electorales
+    WHERE division_territorial IS NOT NULL
+    GROUP BY tipo_eleccion, division_territorial
+"""
+
+INSERTAR_GANADORES = """
+    INSERT INTO ganadores (
+        tipo_eleccion, division_territorial, nombre_candidato, partido_ci, partido_id, numero_de_votos,
+        segundo_candidato, segundo_partido, segundo_partido_id, votos_segundo, margen, total_votos, firma
+    )
+    WITH ranked_candidates AS (
+        SELECT
+            r.tipo_eleccion,
+            r.division_territorial,
+            r.nombre_candidato,
+            r.partido_ci,
+            r.partido_id,
+            r.numero_de_votos,
+            ROW_NUMBER() OVER (
+                PARTITION BY r.tipo_eleccion, r.division_territorial ORDER BY r.numero_de_votos DESC, r.id
+            ) as rank,
+            SUM(r.numero_de_votos) OVER (PARTITION BY r.tipo_eleccion, r.division_territorial) as total_votos
+        FROM resultados_electorales r
+        JOIN temp.divisiones_por_actualizar d
+            ON d.tipo_eleccion = r.tipo_eleccion AND d.division_territorial = r.division_territorial
+    )
+    SELECT
+        primero.tipo_eleccion,
+        primero.division_territorial,
+        primero.nombre_candidato,
+        primero.partido_ci,
+        primero.partido_id,
+        primero.numero_de_votos,
+        segundo.nombre_candidato,
+        segundo.partido_ci,
+        segundo.partido_id,
+        segundo.numero_de_votos,
+        primero.numero_de_votos - COALESCE(segundo.numero_de_votos, 0),
+        primero.total_votos,
+        d.firma
+    FROM ranked_candidates primero
+    JOIN temp.divisiones_por_actualizar d
+        ON d.tipo_eleccion = primero.tipo_eleccion AND d.division_territorial = primero.division_territorial
+    LEFT JOIN ranked_candidates segundo
+        ON segundo.tipo_eleccion = primero.tipo_eleccion
+        AND segundo.division_territorial = primero.division_territorial
+        AND segundo.rank = 2
+    WHERE primero.rank = 1
+"""
+
+
+def _huella(*valores):
+    """CRC32 del contenido de una fila, para las firmas"""
+    return zlib.crc32('\x1f'.join('' if valor is None else str(valor) for valor in valores).encode('utf-8'))
+
+
+def registrar_huella(conn):
+    """huella(...) como función SQL de la conexión de escritura"""
+    conn.create_function('huella', -1, _huella, deterministic=True)
+
+
+def actualizar_ganadores(conn):
+    """Crear o refrescar la tabla ganadores solo para las divisiones que cambiaron"""
+    registrar_huella(conn)
+    conn.execute(CREAR_TABLA_GANADORES)
+    conn.execute(CREAR_INDICES_GANADORES)
+
+    firmas_actuales = {(tipo, division): firma for tipo, division, firma in conn.execute(FIRMAS_DIVISIONES)}
+    firmas_guardadas = {
+        (tipo, division): firma
+        for tipo, division, firma in conn.execute(
+            "SELECT tipo_eleccion, division_territorial, firma FROM ganadores"
+        )
+    }
+
+    cambiadas = [clave for clave, firma in firmas_actuales.items() if firmas_guardadas.get(clave) != firma]
+    eliminadas = [clave for clave in firmas_guardadas if clave not in firmas_actuales]
+
+    if not cambiadas and not eliminadas:
+        return 0, 0
+
+    with conn:
+        conn.executemany(
+            "DELETE FROM ganadores WHERE tipo_eleccion = ? AND division_territorial = ?",
+            cambiadas + eliminadas
+        )
+
+        conn.execute("DROP TABLE IF EXISTS temp.divisiones_por_actualizar")
+        conn.execute("""
+            CREATE TEMP TABLE divisiones_por_actualizar (
+                tipo_eleccion TEXT, division_territorial TEXT, firma TEXT,
+                PRIMARY KEY (tipo_eleccion, division_territorial)
+            )
+        """)
+        conn.executemany(
+            "INSERT INTO temp.divisiones_por_actualizar VALUES (?, ?, ?)",
+            [(tipo, division, firmas_actuales[(tipo, division)]) for tipo, division in cambiadas]
+        )
+        conn.execute(INSERTAR_GANADORES)
+        conn.execute("DROP TABLE temp.divisiones_por_actualizar")
+
+    return len(cambiadas), len(eliminadas)
+
+
+# Gobernador consolidado: una fila por candidato con los votos de todos los distritos
+CREAR_TABLA_GOBERNADOR = """
+    CREATE TABLE IF NOT EXISTS gobernador_corregido (
+        candidato_id VARCHAR(100),
+        anno INTEGER NOT NULL,
+        nombre_candidato VARCHAR(300) PRIMARY KEY,
+        numero_de_votos INTEGER,
+        division_territorial VARCHAR(150),
+        nombre_normalizado VARCHAR(300),
+        partido_ci VARCHAR(150),
+        partido_id INTEGER,
+        tipo_eleccion VARCHAR(20) NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        longitud_nombre INTEGER,
+        cantidad_palabras INTEGER
+    )
+"""
+
+FIRMA_GOBERNADOR = """
+    SELECT COUNT(*) || ':' || TOTAL(numero_de_votos) || ':' || TOTAL(id * numero_de_votos) || ':' ||
+        COALESCE(MAX(id), 0) || ':' || TOTAL(id * partido_id) || ':' ||
+        COALESCE(SUM(huella(id, nombre_candidato, nombre_normalizado, partido_ci)), 0)
+    FROM resultados_electorales
+    WHERE tipo_eleccion = 'GOBERNADOR'
+"""
+
+INSERTAR_GOBERNADOR = """
+    INSERT INTO gobernador_corregido (
+        candidato_id, anno, nombre_candidato, numero_de_votos, division_territorial,
+        nombre_normalizado, partido_ci, partido_id, tipo_eleccion, longitud_nombre, cantidad_palabras
+    )
+    SELECT
+        {candidato_id},
+        MIN(anno),
+        nombre_candidato,
+        SUM(numero_de_votos),
+        'Nuevo León',
+        MIN(nombre_normalizado),
+        MIN(partido_ci),
+        MIN(partido_id),
+        'GOBERNADOR',
+        MIN(longitud_nombre),
+        MIN(cantidad_palabras)
+    FROM resultados_electorales
+    WHERE tipo_eleccion = 'GOBERNADOR'
+    GROUP BY nombre_candidato
+    ORDER BY SUM(numero_de_votos) DESC
+"""
+
+
+def actualizar_gobernador_corregido(conn, firma_guardada=None):
+    """Reconstruir gobernador_corregido si cambiaron los registros de gobernador; devuelve la firma"""
+    registrar_huella(conn)
+    conn.execute(CREAR_TABLA_GOBERNADOR)
+    firma = conn.execute(FIRMA_GOBERNADOR).fetchone()[0]
+    if firma == firma_guardada:
+        return firma
+
+    # Las bases 2024 identifican por casilla y no tienen candidato_id
+    columnas = {fila[1] for fila in conn.execute("PRAGMA table_info(resultados_electorales)")}
+    candidato_id = 'MIN(candidato_id)' if 'candidato_id' in columnas else 'NULL'
+
+    with conn:
+        conn.execute("DELETE FROM gobernador_corregido")
+        conn.execute(INSERTAR_GOBERNADOR.format(candidato_id=candidato_id))
+    return firma
+
+
+# Métricas generales por tipo de elección y totales, en dos variantes:
+# 'corregido' usa gobernador_corregido (un registro por candidato) y 'original' la tabla tal cual
+CREAR_TABLA_ESTADISTICAS = """
+    CREATE TABLE IF NOT EXISTS estadisticas_generales (
+        fuente VARCHAR(20) NOT NULL,
+        tipo_eleccion VARCHAR(20) NOT NULL,
+        registros INTEGER,
+        candidatos_unicos INTEGER,
+        total_votos INTEGER,
+        partidos_unicos INTEGER,
+        divisiones_unicas INTEGER,
+        PRIMARY KEY (fuente, tipo_eleccion)
+    ) WITHOUT ROWID
+"""
+
+# Con huella() del texto: un cambio de partido o de nombre de igual longitud también cuenta
+FIRMA_RESULTADOS = """
+    SELECT COUNT(*) || ':' || TOTAL(numero_de_votos) || ':' || TOTAL(id * numero_de_votos) || ':' ||
+        COALESCE(MAX(id), 0) || ':' ||
+        COALESCE(SUM(huella(id, tipo_eleccion, nombre_candidato, partido_ci, division_territorial)), 0)
+    FROM resultados_electorales
+"""
+
+FUENTES_ESTADISTICAS = {
+    'corregido': """
+        SELECT tipo_eleccion, nombre_candidato, numero_de_votos, partido_ci, division_territorial
+        FROM resultados_electorales WHERE tipo_eleccion != 'GOBERNADOR'
+        UNION ALL
+        SELECT tipo_eleccion, nombre_candidato, numero_de_votos, partido_ci, division_territorial
+        FROM gobernador_corregido
+    """,
+    'original': """
+        SELECT tipo_eleccion, nombre_candidato, numero_de_votos, partido_ci, division_territorial
+        FROM resultados_electorales
+    """,
+}
+
+# Un recorrido de los datos por fuente: agregados por tipo y la fila TOTAL
+CONSULTA_ESTADISTICAS = """
+    WITH datos AS MATERIALIZED ({fuente})
+    SELECT
+        '{nombre}' as fuente,
+        tipo_eleccion,
+        COUNT(*) as registros,
+        COUNT(DISTINCT nombre_candidato) as candidatos_unicos,
+        SUM(numero_de_votos) as total_votos,
+        COUNT(DISTINCT partido_ci) as partidos_unicos,
+        COUNT(DISTINCT division_territorial) as divisiones_unicas
+    FROM datos
+    GROUP BY tipo_eleccion
+    UNION ALL
+    SELECT
+        '{nombre}',
+        'TOTAL',
+        COUNT(*),
+        COUNT(DISTINCT nombre_candidato),
+        SUM(numero_de_votos),
+        COUNT(DISTINCT partido_ci),
+        COUNT(DISTINCT division_territorial)
+    FROM datos
+"""
+
+
+def consulta_estadisticas(fuente):
+    """SQL de las métricas generales de una fuente ('corregido' u 'original')"""
+    return CONSULTA_ESTADISTICAS.format(fuente=FUENTES_ESTADISTICAS[fuente], nombre=fuente)
+
+
+def actualizar_estadisticas(conn, firma_guardada=None):
+    """Recalcular estadisticas_generales si cambió resultados_electorales; devuelve la firma"""
+    conn.execute(CREAR_TABLA_ESTADISTICAS)
+    registrar_huella(conn)
+    firma = conn.execute(FIRMA_RESULTADOS).fetchone()[0] + ':' + conn.execute("""
+        SELECT COUNT(*) || ':' || TOTAL(numero_de_votos) || ':' ||
+            COALESCE(SUM(huella(nombre_candidato, partido_ci, division_territorial, numero_de_votos)), 0)
+        FROM gobernador_corregido
+    """).fetchone()[0]
+    if firma == firma_guardada:
+        return firma
+
+    with conn:
+        conn.execute("DELETE FROM estadisticas_generales")
+        for fuente in FUENTES_ESTADISTICAS:
+            conn.execute(f"INSERT INTO estadisticas_generales {consulta_estadisticas(fuente)}")
+    return firma
+
+
+# Cubo de votos por casilla (casillas_federales.py): sumas precalculadas por nivel
+# geográfico, cada nivel agregado desde el nivel inmediato inferior:
+# casilla -> sección -> distrito -> estado. cubo_votos_* guarda los votos por
+# partido y cubo_totales_* las casillas, votos a partidos, no registrados, nulos,
+# total y lista nominal, más participación, tasa de nulos y abstención
+# (participacion.py); cubo_distribuidos_* los votos por partido con las
+# coaliciones ya repartidas. Las bases sin votos_casilla quedan con el cubo vacío.
+FIRMA_CASILLAS = """
+    SELECT
+        (SELECT COUNT(*) || ':' || TOTAL(votos) || ':' || TOTAL(casilla_id * votos) || ':' ||
+            TOTAL(partido_id * votos) || ':' || TOTAL(distrito_id * seccion * votos) FROM votos_casilla)
+        || ':' ||
+        (SELECT COUNT(*) || ':' || TOTAL(casilla_id * no_registrados) || ':' || TOTAL(casilla_id * votos_nulos)
+            || ':' || TOTAL(casilla_id * total_votos) || ':' || TOTAL(casilla_id * lista_nominal) || ':' ||
+            TOTAL(casilla_id * (distrito_id + seccion)) FROM casillas_federales)
+"""
+
+# Integrantes de las coaliciones (dimensión de partidos): el reparto cambia si cambian
+FIRMA_MEMBRESIA = """
+    SELECT COALESCE(GROUP_CONCAT(coalicion_id || '-' || partido_id, ','), '')
+    FROM (SELECT coalicion_id, partido_id FROM coaliciones_partidos ORDER BY coalicion_id, partido_id)
+"""
+
+
+def _firma_casillas(conn, con_membresia=False):
+    """Firma de las casillas; con la membresía de coaliciones para lo que depende del reparto"""
+    firma = conn.execute(FIRMA_CASILLAS).fetchone()[0]
+    if con_membresia:
+        firma += '|' + conn.execute(FIRMA_MEMBRESIA).fetchone()[0]
+    return firma
+
+
+COLUMNAS_TOTALES_CUBO = """
+        casillas INTEGER NOT NULL,
+        votos_partidos INTEGER NOT NULL,
+        no_registrados INTEGER NOT NULL,
+        votos_nulos INTEGER NOT NULL,
+        total_votos INTEGER NOT NULL,
+        lista_nominal INTEGER NOT NULL,
+        participacion REAL,
+        tasa_nulos REAL,
+        abstencion REAL"""
+
+COLUMNAS_SUMAS_CUBO = "casillas, votos_partidos, no_registrados, votos_nulos, total_votos, lista_nominal"
+
+SUMAS_TOTALES_CUBO = """
+        SUM(casillas), SUM(votos_partidos), SUM(no_registrados),
+        SUM(votos_nulos), SUM(total_votos), SUM(lista_nominal)"""
+
+# tabla -> (versión, CREATE, INSERT), en orden de construcción
+CUBO = {
+    'cubo_votos_seccion': (1, """
+        CREATE TABLE IF NOT EXISTS cubo_votos_seccion (
+            distrito_id INTEGER NOT NULL,
+            seccion INTEGER NOT NULL,
+            partido_id INTEGER NOT NULL,
+            votos INTEGER NOT NULL,
+            PRIMARY KEY (distrito_id, seccion, partido_id)
+        ) WITHOUT ROWID
+    """, """
+        INSERT INTO cubo_votos_seccion
+        SELECT distrito_id, seccion, partido_id, SUM(votos)
+        FROM votos_casilla
+        GROUP BY distrito_id, seccion, partido_id
+    """),
+    'cubo_votos_distrito': (1, """
+        CREATE TABLE IF NOT EXISTS cubo_votos_distrito (
+            distrito_id INTEGER NOT NULL,
+            partido_id INTEGER NOT NULL,
+            votos INTEGER NOT NULL,
+            PRIMARY KEY (distrito_id, partido_id)
+        ) WITHOUT ROWID
+    """, """
+        INSERT INTO cubo_votos_distrito
+        SELECT distrito_id, partido_id, SUM(votos)
+        FROM cubo_votos_seccion
+        GROUP BY distrito_id, partido_id
+    """),
+    'cubo_votos_estado': (1, """
+        CREATE TABLE IF NOT EXISTS cubo_votos_estado (
+            partido_id INTEGER PRIMARY KEY,
+            votos INTEGER NOT NULL
+        )
+    """, """
+        INSERT INTO cubo_votos_estado
+        SELECT partido_id, SUM(votos)
+        FROM cubo_votos_distrito
+        GROUP BY partido_id
+    """),
+    'cubo_totales_seccion': (2, f"""
+        CREATE TABLE IF NOT EXISTS cubo_totales_seccion (
+            distrito_id INTEGER NOT NULL,
+            seccion INTEGER NOT NULL,{COLUMNAS_TOTALES_CUBO},
+            PRIMARY KEY (distrito_id, seccion)
+        ) WITHOUT ROWID
+    """, f"""
+        INSERT INTO cubo_totales_seccion (distrito_id, seccion, {COLUMNAS_SUMAS_CUBO})
+        SELECT
+            c.distrito_id, c.seccion, COUNT(*), v.votos_partidos, SUM(c.no_registrados),
+            SUM(c.votos_nulos), SUM(c.total_votos), SUM(c.lista_nominal)
+        FROM casillas_federales c
+        JOIN (
+            SELECT distrito_id, seccion, SUM(votos) as votos_partidos
+            FROM cubo_votos_seccion
+            GROUP BY distrito_id, seccion
+        ) v ON v.distrito_id = c.distrito_id AND v.seccion = c.seccion
+        GROUP BY c.distrito_id, c.seccion
+    """),
+    'cubo_totales_distrito': (2, f"""
+        CREATE TABLE IF NOT EXISTS cubo_totales_distrito (
+            distrito_id INTEGER PRIMARY KEY,{COLUMNAS_TOTALES_CUBO}
+        )
+    """, f"""
+        INSERT INTO cubo_totales_distrito (distrito_id, {COLUMNAS_SUMAS_CUBO})
+        SELECT distrito_id,{SUMAS_TOTALES_CUBO}
+        FROM cubo_totales_seccion
+        GROUP BY distrito_id
+    """),
+    'cubo_totales_estado': (2, f"""
+        CREATE TABLE IF NOT EXISTS cubo_totales_estado ({COLUMNAS_TOTALES_CUBO}
+        )
+    """, f"""
+        INSERT INTO cubo_totales_estado ({COLUMNAS_SUMAS_CUBO})
+        SELECT{SUMAS_TOTALES_CUBO}
+        FROM cubo_totales_distrito
+        HAVING COUNT(*) > 0
+    """),
+    # Votos con las coaliciones repartidas entre sus partidos (votos_casilla_distribuidos)
+    'cubo_distribuidos_seccion': (1, """
+        CREATE TABLE IF NOT EXISTS cubo_distribuidos_seccion (
+            distrito_id INTEGER NOT NULL,
+            seccion INTEGER NOT NULL,
+            partido_id INTEGER NOT NULL,
+            votos_propios INTEGER NOT NULL,
+            votos_coalicion INTEGER NOT NULL,
+            votos INTEGER NOT NULL,
+            PRIMARY KEY (distrito_id, seccion, partido_id)
+        ) WITHOUT ROWID
+    """, """
+        INSERT INTO cubo_distribuidos_seccion
+        SELECT distrito_id, seccion, partido_id, SUM(votos_propios), SUM(votos_coalicion), SUM(votos)
+        FROM votos_casilla_distribuidos
+        GROUP BY distrito_id, seccion, partido_id
+    """),
+    'cubo_distribuidos_distrito': (1, """
+        CREATE TABLE IF NOT EXISTS cubo_distribuidos_distrito (
+            distrito_id INTEGER NOT NULL,
+            partido_id INTEGER NOT NULL,
+            votos_propios INTEGER NOT NULL,
+            votos_coalicion INTEGER NOT NULL,
+            votos INTEGER NOT NULL,
+            PRIMARY KEY (distrito_id, partido_id)
+        ) WITHOUT ROWID
+    """, """
+        INSERT INTO cubo_distribuidos_distrito
+        SELECT distrito_id, partido_id, SUM(votos_propios), SUM(votos_coalicion), SUM(votos)
+        FROM cubo_distribuidos_seccion
+        GROUP BY distrito_id, partido_id
+    """),
+    'cubo_distribuidos_estado': (1, """
+        CREATE TABLE IF NOT EXISTS cubo_distribuidos_estado (
+            partido_id INTEGER PRIMARY KEY,
+            votos_propios INTEGER NOT NULL,
+            votos_coalicion INTEGER NOT NULL,
+            votos INTEGER NOT NULL
+        )
+    """, """
+        INSERT INTO cubo_distribuidos_estado
+        SELECT partido_id, SUM(votos_propios), SUM(votos_coalicion), SUM(votos)
+        FROM cubo_distribuidos_distrito
+        GROUP BY partido_id
+    """),
+}
+
+
+# Totales del cubo -> columnas de su clave (para guardar la participación)
+CLAVES_TOTALES_CUBO = {
+    'cubo_totales_seccion': ['distrito_id', 'seccion'],
+    'cubo_totales_distrito': ['distrito_id'],
+    'cubo_totales_estado': [],
+}
+
+
+def _guardar_participacion(conn, tabla):
+    """Calcular con participacion.py los indicadores de cada fila de un nivel de totales"""
+    claves = CLAVES_TOTALES_CUBO[tabla]
+    totales = pd.read_sql_query(
+        f"SELECT {''.join(c + ', ' for c in claves)}total_votos, votos_nulos, lista_nominal FROM {tabla}", conn)
+    indicadores = indicadores_participacion(totales['total_votos'], totales['votos_nulos'], totales['lista_nominal'])
+
+    # NaN (sin lista nominal o sin votos) se guarda como NULL
+    valores = [np.where(np.isnan(indicador), None, indicador).tolist() for indicador in indicadores]
+    where = f" WHERE {' AND '.join(f'{c} = ?' for c in claves)}" if claves else ''
+    conn.executemany(
+        f"UPDATE {tabla} SET {', '.join(f'{c} = ?' for c in COLUMNAS_PARTICIPACION)}{where}",
+        zip(*valores, *(totales[c].tolist() for c in claves))
+    )
+
+
+def _existen_tablas(conn, tablas):
+    encontradas = conn.execute(
+        f"SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name IN ({', '.join('?' * len(tablas))})",
+        tablas
+    ).fetchone()[0]
+    return encontradas == len(tablas)
+
+
+def actualizar_cubo(tabla, conn, firma_guardada=None):
+    """Recalcular un nivel del cubo si cambiaron las casillas (o el reparto de coaliciones); devuelve la firma"""
+    _, crear, insertar = CUBO[tabla]
+    with conn:
+        conn.execute(crear)
+
+    distribuidos = tabla.startswith('cubo_distribuidos_')
+    fuentes = ['votos_casilla', 'casillas_federales'] + (['coaliciones_partidos'] if distribuidos else [])
+    if not _existen_tablas(conn, fuentes):
+        return None
+
+    firma = _firma_casillas(conn, con_membresia=distribuidos)
+    if firma == firma_guardada:
+        return firma
+
+    with conn:
+        conn.execute(f"DELETE FROM {tabla}")
+        conn.execute(insertar)
+        if tabla in CLAVES_TOTALES_CUBO:
+            _guardar_participacion(conn, tabla)
+    return firma
+
+
+# Votos por casilla y partido con las coaliciones repartidas (coaliciones.py)
+CREAR_TABLA_DISTRIBUIDOS = """
+    CREATE TABLE IF NOT EXISTS votos_casilla_distribuidos (
+        casilla_id INTEGER NOT NULL,
+        partido_id INTEGER NOT NULL,
+        distrito_id INTEGER NOT NULL,
+        seccion INTEGER NOT NULL,
+        votos_propios INTEGER NOT NULL,
+        votos_coalicion INTEGER NOT NULL,
+        votos INTEGER NOT NULL,
+        PRIMARY KEY (casilla_id, partido_id)
+    ) WITHOUT ROWID
+"""
+
+CREAR_INDICE_DISTRIBUIDOS = """
+    CREATE INDEX IF NOT EXISTS idx_votos_distribuidos_distrito_seccion
+    ON votos_casilla_distribuidos(distrito_id, seccion, partido_id, votos)
+"""
+
+
+def actualizar_votos_distribuidos(conn, firma_guardada=None):
+    """Repartir los votos de coalición de cada casilla si cambiaron las casillas o las coaliciones; da la firma"""
+    with conn:
+        conn.execute(CREAR_TABLA_DISTRIBUIDOS)
+        conn.execute(CREAR_INDICE_DISTRIBUIDOS)
+
+    if not _existen_tablas(conn, ['votos_casilla', 'casillas_federales', 'coaliciones_partidos']):
+        return None
+
+    firma = _firma_casillas(conn, con_membresia=True)
+    if firma == firma_guardada:
+        return firma
+
+    votos = pd.read_sql_query("SELECT casilla_id, partido_id, distrito_id, seccion, votos FROM votos_casilla", conn)
+    distribuidos = distribuir_votos_casilla(votos, miembros_coaliciones(conn))
+
+    columnas = list(distribuidos.columns)
+    with conn:
+        conn.execute("DELETE FROM votos_casilla_distribuidos")
+        conn.executemany(
+            f"INSERT INTO votos_casilla_distribuidos ({', '.join(columnas)}) "
+            f"VALUES ({', '.join('?' * len(columnas))})",
+            zip(*(distribuidos[columna].tolist() for columna in columnas))
+        )
+    return firma
+
+
+def _actualizar_ganadores(conn, firma_guardada=None):
+    actualizadas, eliminadas = actualizar_ganadores(conn)
+    print(f"🏆 Ganadores: {actualizadas} divisiones actualizadas, {eliminadas} eliminadas")
+    return None  # ganadores lleva sus propias firmas por división
+
+
+# tabla -> (versión de la definición, función que la crea o refresca)
+# Subir la versión cuando cambie la definición: la tabla se borra y se reconstruye.
+TABLAS_DERIVADAS = {
+    'ganadores': (2, _actualizar_ganadores),  # v2: partido_id de la dimensión de partidos
+    'gobernador_corregido': (3, actualizar_gobernador_corregido),  # v2: características del nombre; v3: partido_id
+    # Después de gobernador_corregido, que es una de sus fuentes
+    'estadisticas_generales': (1, actualizar_estadisticas),
+    # Antes del cubo, que agrega sus votos por nivel
+    'votos_casilla_distribuidos': (1, actualizar_votos_distribuidos),
+    # Cada nivel del cubo después del nivel del que se agrega
+    **{tabla: (version, partial(actualizar_cubo, tabla)) for tabla, (version, _, _) in CUBO.items()},
+}
+
+
+def actualizar_derivadas(conn):
+    """Crear, migrar o refrescar todas las tablas derivadas de una conexión de escritura"""
+    conn.execute(CREAR_TABLA_VERSIONES)
+    registradas = {
+        tabla: (version, firma)
+        for tabla, version, firma in conn.execute("SELECT tabla, version, firma FROM tablas_derivadas")
+    }
+
+    for tabla, (version, actualizar) in TABLAS_DERIVADAS.items():
+        version_guardada, firma_guardada = registradas.get(tabla, (None, None))
+        if version_guardada != version:
+            # Tabla nueva o de una definición anterior (incluye las creadas desde la UI)
+            with conn:
+                conn.execute(f"DROP TABLE IF EXISTS {tabla}")
+            firma_guardada = None
+            print(f"🔧 {tabla}: versión {version_guardada} -> {version}, reconstruyendo")
+
+        firma = actualizar(conn, firma_guardada)
+        with conn:
+            conn.execute("""
+                INSERT INTO tablas_derivadas (tabla, version, firma) VALUES (?, ?, ?)
+                ON CONFLICT(tabla) DO UPDATE SET
+                    version = excluded.version, firma = excluded.firma, actualizado_at = CURRENT_TIMESTAMP
+                WHERE tablas_derivadas.version IS NOT excluded.version
+                    OR tablas_derivadas.firma IS NOT excluded.firma
+            """, (tabla, version, firma))
+
+
+def tablas_pendientes(año, tablas=None):
+    """Tablas derivadas que faltan o no están en la versión actual (verificación de solo lectura para la UI)"""
+    tablas = list(tablas or TABLAS_DERIVADAS)
+    registro = base_datos.consultar(
+        año, "SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'tablas_derivadas'", usar_cache=False
+    )
+    if registro.empty:
+        return tablas
+
+    versiones = dict(base_datos.consultar(
+        año, "SELECT tabla, version FROM tablas_derivadas", usar_cache=False
+    ).itertuples(index=False, name=None))
+    return [tabla for tabla in tablas if versiones.get(tabla) != TABLAS_DERIVADAS[tabla][0]]
+
+
+def actualizar_tablas_derivadas(año):
+    """Refrescar todas las tablas derivadas de la base de un año"""
+    conn = sqlite3.connect(base_datos.ruta_db(año))
+    try:
+        print(f"📐 Tablas derivadas {año}")
+        actualizar_derivadas(conn)
+    finally:
+        conn.close()
+
+    base_datos.limpiar_cache(año)
+
+
+if __name__ == '__main__':
+    for año in base_datos.BASES_DATOS:
+        actualizar_tablas_derivadas(año)